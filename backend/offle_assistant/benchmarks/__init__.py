@@ -0,0 +1,13 @@
+from ._length_bucketing import benchmark_length_bucketing
+from ._embedding import run_embedding_benchmark
+from ._inference_drift import measure_inference_drift
+from ._search import benchmark_search
+from ._search_tuning import tune_search_profile
+
+__all__ = [
+    "benchmark_length_bucketing",
+    "run_embedding_benchmark",
+    "measure_inference_drift",
+    "benchmark_search",
+    "tune_search_profile",
+]
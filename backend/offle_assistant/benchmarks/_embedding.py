@@ -0,0 +1,231 @@
+from datetime import datetime, timezone
+from importlib import metadata
+import os
+import pathlib
+import platform
+import random
+import resource
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import torch
+
+from offle_assistant.text_processing import split_on_lines
+from offle_assistant.vectorizer import (
+    Vectorizer,
+    vectorizer_registry,
+    embedding_settings
+)
+
+
+"""
+    Synthetic chunks come in three lengths (in words) so that the effect
+    of text length on throughput shows up separately.
+"""
+SYNTHETIC_LENGTHS: Dict[str, int] = {
+    "short": 8,
+    "medium": 64,
+    "long": 256,
+}
+
+SYNTHETIC_VOCABULARY: List[str] = (
+    "the a model vector query document paragraph collection server embed "
+    "latency throughput cluster index search result context answer user "
+    "password reset error code config install network storage memory "
+    "thread batch token length qdrant ollama persona latex section figure"
+).split()
+
+
+def synthetic_corpus(
+    chunks_per_length: int = 128,
+    seed: int = 0,
+) -> Dict[str, List[str]]:
+    """
+        Deterministic filler text, {length name: chunks}.
+    """
+    rng = random.Random(seed)
+    return {
+        length_name: [
+            " ".join(rng.choices(SYNTHETIC_VOCABULARY, k=word_count))
+            for _ in range(chunks_per_length)
+        ]
+        for length_name, word_count in SYNTHETIC_LENGTHS.items()
+    }
+
+
+def load_markdown_corpus(corpus_path: pathlib.Path) -> List[str]:
+    """
+        Paragraphs from a markdown file, or every .md file under a
+        directory, split the same way documents are at ingestion.
+    """
+    corpus_path = corpus_path.expanduser()
+    md_files: List[pathlib.Path] = (
+        sorted(corpus_path.rglob("*.md")) if corpus_path.is_dir()
+        else [corpus_path]
+    )
+
+    paragraphs: List[str] = []
+    for md_file in md_files:
+        paragraphs += split_on_lines(text=md_file.read_text(encoding="utf-8"))
+    return paragraphs
+
+
+def count_tokens(
+    vectorizer: Vectorizer,
+    chunks: List[str],
+) -> int:
+    """
+        Uses the model's tokenizer when the vectorizer has one, otherwise
+        falls back to whitespace tokens.
+    """
+    model = getattr(vectorizer, "model", None)
+    tokenizer = getattr(model, "tokenizer", None)
+    if tokenizer is None:
+        return sum(len(chunk.split()) for chunk in chunks)
+
+    return sum(
+        len(input_ids) for input_ids in tokenizer(
+            chunks,
+            truncation=True,
+            max_length=model.max_seq_length
+        )["input_ids"]
+    )
+
+
+def get_peak_rss_mb() -> float:
+    # ru_maxrss is in KB on Linux and bytes on macOS.
+    peak_rss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if platform.system() == "Darwin":
+        return peak_rss / (1024 * 1024)
+    return peak_rss / 1024
+
+
+def measure_throughput(
+    vectorizer: Vectorizer,
+    chunks: List[str],
+    batch_size: int,
+) -> dict:
+    token_count: int = count_tokens(vectorizer, chunks)
+
+    start: float = time.perf_counter()
+    for batch_start in range(0, len(chunks), batch_size):
+        vectorizer.embed_chunks(
+            chunks=chunks[batch_start:batch_start + batch_size]
+        )
+    seconds: float = time.perf_counter() - start
+
+    return {
+        "batch_size": batch_size,
+        "chunks": len(chunks),
+        "tokens": token_count,
+        "seconds": seconds,
+        "sentences_per_second": len(chunks) / seconds,
+        "tokens_per_second": token_count / seconds,
+    }
+
+
+def measure_latency(
+    vectorizer: Vectorizer,
+    queries: List[str],
+) -> dict:
+    latencies_ms: List[float] = []
+    for query in queries:
+        start: float = time.perf_counter()
+        vectorizer.embed_sentence(sentence=query)
+        latencies_ms.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "queries": len(queries),
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p95_ms": float(np.percentile(latencies_ms, 95)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "mean_ms": float(np.mean(latencies_ms)),
+    }
+
+
+def get_environment() -> dict:
+    try:
+        version: str = metadata.version("offle_assistant")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+
+    return {
+        "offle_assistant_version": version,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "torch": torch.__version__,
+    }
+
+
+def run_embedding_benchmark(
+    vectorizer_string: str,
+    model_string: Optional[str] = None,
+    corpus_path: Optional[pathlib.Path] = None,
+    batch_sizes: Sequence[int] = (1, 8, 32, 128),
+    thread_counts: Sequence[Optional[int]] = (None,),
+    latency_queries: int = 200,
+) -> dict:
+    """
+        Benchmarks any registered Vectorizer over a synthetic corpus (and a
+        real markdown corpus if corpus_path is given) for every combination
+        of torch thread count and batch size. A thread count of None leaves
+        torch's default. Returns a JSON-serializable dict.
+    """
+    # Cached chunks would make every run after the first meaningless.
+    chunk_cache_enabled: bool = embedding_settings.chunk_cache_enabled
+    embedding_settings.chunk_cache_enabled = False
+
+    default_threads: int = torch.get_num_threads()
+    try:
+        load_start: float = time.perf_counter()
+        vectorizer: Vectorizer = vectorizer_registry.get_vectorizer(
+            vectorizer_string=vectorizer_string,
+            model_string=model_string
+        )
+        load_seconds: float = time.perf_counter() - load_start
+
+        corpora: Dict[str, List[str]] = {
+            f"synthetic_{length_name}": chunks
+            for length_name, chunks in synthetic_corpus().items()
+        }
+        if corpus_path is not None:
+            corpora["markdown"] = load_markdown_corpus(corpus_path)
+
+        queries: List[str] = synthetic_corpus(
+            chunks_per_length=latency_queries, seed=1
+        )["short"]
+
+        # Keep one-off first-inference costs out of the numbers.
+        vectorizer.embed_chunks(chunks=queries[:8])
+
+        runs: List[dict] = []
+        for thread_count in thread_counts:
+            torch.set_num_threads(thread_count or default_threads)
+            run: dict = {
+                "threads": torch.get_num_threads(),
+                "throughput": {
+                    corpus_name: [
+                        measure_throughput(vectorizer, chunks, batch_size)
+                        for batch_size in batch_sizes
+                    ]
+                    for corpus_name, chunks in corpora.items()
+                },
+                "latency": measure_latency(vectorizer, queries),
+            }
+            runs.append(run)
+    finally:
+        torch.set_num_threads(default_threads)
+        embedding_settings.chunk_cache_enabled = chunk_cache_enabled
+
+    return {
+        "vectorizer": vectorizer.get_vectorizer_string(),
+        "model": vectorizer.get_model_string(),
+        "environment": get_environment(),
+        "load_seconds": load_seconds,
+        "runs": runs,
+        "peak_rss_mb": get_peak_rss_mb(),
+    }
@@ -0,0 +1,109 @@
+import pathlib
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from offle_assistant.vectorizer import (
+    SentenceTransformerVectorizer,
+    InferenceMode,
+    embedding_settings,
+    join_inference_mode,
+    vectorizer_registry
+)
+from ._embedding import load_markdown_corpus, synthetic_corpus
+
+
+def _normalize(embeddings: np.array) -> np.array:
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+
+def _timed_embed(
+    vectorizer: SentenceTransformerVectorizer,
+    chunks: List[str],
+) -> tuple:
+    start: float = time.perf_counter()
+    embeddings: np.array = vectorizer.embed_chunks(chunks=chunks)
+    return _normalize(embeddings), time.perf_counter() - start
+
+
+def measure_inference_drift(
+    model_string: str = "all-mpnet-base-v2",
+    inference_mode: InferenceMode = "int8",
+    corpus_path: Optional[pathlib.Path] = None,
+    sample_size: int = 256,
+    top_k: int = 5,
+) -> dict:
+    """
+        Embeds a sample corpus with the fp32 model and with the given
+        inference mode, and reports how far the embeddings moved: the
+        cosine between each pair of embeddings, and how often the top_k
+        nearest neighbours of a query stay the same. Timings are included
+        so the accuracy loss can be weighed against the speedup.
+    """
+    # Cached fp32 chunks would otherwise be served for the other mode.
+    chunk_cache_enabled: bool = embedding_settings.chunk_cache_enabled
+    embedding_settings.chunk_cache_enabled = False
+
+    try:
+        chunks: List[str] = (
+            load_markdown_corpus(corpus_path) if corpus_path is not None
+            else [
+                chunk for length_chunks in synthetic_corpus().values()
+                for chunk in length_chunks
+            ]
+        )[:sample_size]
+        queries: List[str] = synthetic_corpus(
+            chunks_per_length=32, seed=1
+        )["short"]
+
+        vectorizers = {
+            mode: vectorizer_registry.get_vectorizer(
+                vectorizer_string="sentence-transformer",
+                model_string=join_inference_mode(model_string, mode)
+            )
+            for mode in ("fp32", inference_mode)
+        }
+        for vectorizer in vectorizers.values():
+            vectorizer.embed_chunks(chunks=chunks[:8])
+
+        reference, reference_seconds = _timed_embed(
+            vectorizers["fp32"], chunks
+        )
+        candidate, candidate_seconds = _timed_embed(
+            vectorizers[inference_mode], chunks
+        )
+        reference_queries, _ = _timed_embed(vectorizers["fp32"], queries)
+        candidate_queries, _ = _timed_embed(
+            vectorizers[inference_mode], queries
+        )
+    finally:
+        embedding_settings.chunk_cache_enabled = chunk_cache_enabled
+
+    cosine: np.array = np.sum(reference * candidate, axis=1)
+
+    k: int = min(top_k, len(chunks))
+    reference_top = np.argsort(-(reference_queries @ reference.T), axis=1)
+    candidate_top = np.argsort(-(candidate_queries @ candidate.T), axis=1)
+    top_k_overlap: float = float(np.mean([
+        len(set(expected[:k]) & set(actual[:k])) / k
+        for expected, actual in zip(reference_top, candidate_top)
+    ]))
+
+    return {
+        "model": model_string,
+        "inference_mode": inference_mode,
+        "chunks": len(chunks),
+        "queries": len(queries),
+        "mean_cosine": float(np.mean(cosine)),
+        "min_cosine": float(np.min(cosine)),
+        "max_cosine_drift": float(1 - np.min(cosine)),
+        "top1_agreement": float(np.mean(
+            reference_top[:, 0] == candidate_top[:, 0]
+        )),
+        f"top{k}_overlap": top_k_overlap,
+        "fp32_seconds": reference_seconds,
+        f"{inference_mode}_seconds": candidate_seconds,
+        "speedup": reference_seconds / candidate_seconds,
+    }
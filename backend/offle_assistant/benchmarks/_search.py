@@ -0,0 +1,98 @@
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from offle_assistant.vector_db import QdrantDB
+from offle_assistant.vectorizer import Vectorizer
+from ._embedding import synthetic_corpus
+
+
+def benchmark_search(
+    vector_db: QdrantDB,
+    collection_name: str,
+    queries: Optional[List[str]] = None,
+    top_k: int = 3,
+    repeats: int = 10,
+) -> dict:
+    """
+        Compares the lean search path (payloads and scores only) against
+        fetching every hit's vector and recomputing its distances in
+        Python, which is what debug_vectors does. Queries are embedded up
+        front so only the search itself is timed.
+
+        Response bytes are the serialized size of the returned points,
+        which tracks what crosses the wire.
+    """
+    if queries is None:
+        queries = synthetic_corpus(chunks_per_length=32, seed=1)["short"]
+
+    metadata: dict = vector_db.get_collection_metadata(
+        collection_name=collection_name
+    )
+    vectorizer: Vectorizer = vector_db.get_metadata_vectorizer(
+        metadata=metadata
+    )
+    query_vectors: List[np.array] = [
+        np.asarray(vectorizer.embed_sentence(sentence=query))
+        for query in queries
+    ]
+
+    debug_vectors: bool = vector_db.debug_vectors
+    modes: Dict[str, dict] = {}
+    try:
+        for mode, with_vectors in (("with_vectors", True), ("lean", False)):
+            vector_db.debug_vectors = with_vectors
+
+            response_bytes: List[int] = [
+                sum(
+                    len(point.model_dump_json())
+                    for point in vector_db.client.query_points(
+                        collection_name=collection_name,
+                        query=query_vector,
+                        with_vectors=with_vectors,
+                        limit=top_k
+                    ).points
+                )
+                for query_vector in query_vectors
+            ]
+
+            latencies_ms: List[float] = []
+            for _ in range(repeats):
+                for query_vector in query_vectors:
+                    start: float = time.perf_counter()
+                    vector_db.search_collection(
+                        collection_name=collection_name,
+                        query_vector=query_vector,
+                        metadata=metadata,
+                        top_k=top_k
+                    )
+                    latencies_ms.append(
+                        (time.perf_counter() - start) * 1000
+                    )
+
+            modes[mode] = {
+                "mean_response_bytes": float(np.mean(response_bytes)),
+                "p50_ms": float(np.percentile(latencies_ms, 50)),
+                "p95_ms": float(np.percentile(latencies_ms, 95)),
+                "mean_ms": float(np.mean(latencies_ms)),
+            }
+    finally:
+        vector_db.debug_vectors = debug_vectors
+
+    return {
+        "collection": collection_name,
+        "vectorizer": metadata["vectorizer"],
+        "model": metadata["model"],
+        "queries": len(queries),
+        "top_k": top_k,
+        "repeats": repeats,
+        **modes,
+        "response_bytes_saved": (
+            1 - modes["lean"]["mean_response_bytes"]
+            / modes["with_vectors"]["mean_response_bytes"]
+        ),
+        "latency_speedup": (
+            modes["with_vectors"]["mean_ms"] / modes["lean"]["mean_ms"]
+        ),
+    }
@@ -0,0 +1,219 @@
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from qdrant_client.models import QuantizationSearchParams, SearchParams
+
+from offle_assistant.vector_db import QdrantDB, SearchProfile
+from offle_assistant.vectorizer import Vectorizer
+
+
+def sample_collection_queries(
+    vector_db: QdrantDB,
+    collection_name: str,
+    sample_size: int = 50,
+) -> List[str]:
+    """
+        Uses the collection's own chunks as queries. Each one's nearest
+        neighbour is itself, but the rest of its top_k is a realistic
+        mix of near and far points.
+    """
+    points, _ = vector_db.client.scroll(
+        collection_name=collection_name,
+        scroll_filter=vector_db.get_search_filter(),
+        limit=sample_size,
+        with_payload=["embedded_text"],
+        with_vectors=False
+    )
+    return [
+        point.payload["embedded_text"] for point in points
+        if point.payload.get("embedded_text")
+    ]
+
+
+def run_timed_searches(
+    vector_db: QdrantDB,
+    collection_name: str,
+    query_vectors: List[np.array],
+    search_params: SearchParams,
+    top_k: int,
+    repeats: int,
+) -> Tuple[List[List], List[float]]:
+    """
+        Returns the hit ids of every query, from the first run, and the
+        latency of every search across all runs.
+    """
+    hit_ids: List[List] = []
+    latencies_ms: List[float] = []
+    for repeat in range(repeats):
+        for query_vector in query_vectors:
+            start: float = time.perf_counter()
+            points = vector_db.client.query_points(
+                collection_name=collection_name,
+                query=query_vector,
+                query_filter=vector_db.get_search_filter(),
+                limit=top_k,
+                search_params=search_params,
+                with_payload=False
+            ).points
+            latencies_ms.append((time.perf_counter() - start) * 1000)
+            if repeat == 0:
+                hit_ids.append([point.id for point in points])
+    return hit_ids, latencies_ms
+
+
+def get_recall(
+    hit_ids: List[List],
+    exact_hit_ids: List[List],
+) -> float:
+    """
+        The fraction of the exact search's hits the approximate search
+        found too, averaged over the queries.
+    """
+    recalls: List[float] = [
+        len(set(hits) & set(exact_hits)) / len(exact_hits)
+        for hits, exact_hits in zip(hit_ids, exact_hit_ids)
+        if exact_hits
+    ]
+    return float(np.mean(recalls)) if recalls else 1.0
+
+
+def tune_search_profile(
+    vector_db: QdrantDB,
+    collection_name: str,
+    queries: Optional[List[str]] = None,
+    top_k: int = 3,
+    recall_target: float = 0.95,
+    latency_budget_ms: Optional[float] = None,
+    ef_candidates: Sequence[int] = (16, 32, 64, 128, 256, 512),
+    sample_size: int = 50,
+    repeats: int = 3,
+) -> dict:
+    """
+        Finds the cheapest way to search a collection that is still
+        accurate enough. Every ef in ef_candidates is measured for recall
+        against an exact search over the full precision vectors, and for
+        p95 latency, over the same queries. The pick is the smallest ef
+        whose recall meets recall_target and whose p95 fits
+        latency_budget_ms.
+
+        If no ef does, exact search is picked when it meets both. On a
+        quantized collection exact search still compares quantized
+        vectors first, so its recall is measured too. Otherwise the pick
+        is the ef with the best recall that fits the budget, or failing
+        that, the fastest one. "meets_target" says whether the pick met
+        both.
+
+        Queries default to a sample of the collection's own chunks.
+    """
+    if queries is None:
+        queries = sample_collection_queries(
+            vector_db=vector_db,
+            collection_name=collection_name,
+            sample_size=sample_size
+        )
+    if not queries:
+        raise ValueError(f"No queries to tune {collection_name} with.")
+
+    metadata: dict = vector_db.get_collection_metadata(
+        collection_name=collection_name
+    )
+    vectorizer: Vectorizer = vector_db.get_metadata_vectorizer(
+        metadata=metadata
+    )
+    query_vectors: List[np.array] = [
+        np.asarray(vectorizer.embed_sentence(sentence=query))
+        for query in queries
+    ]
+    storage_profile: str = metadata.get("storage_profile", "float32")
+
+    # The reference skips quantization, or it would only be as accurate
+    # as the quantized vectors.
+    reference_hit_ids, _ = run_timed_searches(
+        vector_db=vector_db,
+        collection_name=collection_name,
+        query_vectors=query_vectors,
+        search_params=SearchParams(
+            exact=True,
+            quantization=QuantizationSearchParams(ignore=True)
+        ),
+        top_k=top_k,
+        repeats=1
+    )
+
+    def measure(search_profile: SearchProfile) -> dict:
+        hit_ids, latencies_ms = run_timed_searches(
+            vector_db=vector_db,
+            collection_name=collection_name,
+            query_vectors=query_vectors,
+            search_params=vector_db.get_search_params(
+                storage_profile=storage_profile,
+                search_profile=search_profile
+            ),
+            top_k=top_k,
+            repeats=repeats
+        )
+        return {
+            "p50_ms": float(np.percentile(latencies_ms, 50)),
+            "p95_ms": float(np.percentile(latencies_ms, 95)),
+            "recall": get_recall(
+                hit_ids=hit_ids,
+                exact_hit_ids=reference_hit_ids
+            ),
+        }
+
+    def fits_budget(result: dict) -> bool:
+        return (
+            latency_budget_ms is None
+            or result["p95_ms"] <= latency_budget_ms
+        )
+
+    def meets_target(result: dict) -> bool:
+        return result["recall"] >= recall_target and fits_budget(result)
+
+    exact_result: dict = measure(SearchProfile(exact=True))
+    ef_results: Dict[int, dict] = {
+        hnsw_ef: measure(SearchProfile(hnsw_ef=hnsw_ef))
+        for hnsw_ef in sorted(ef_candidates)
+    }
+
+    passing: List[int] = [
+        hnsw_ef for hnsw_ef, result in ef_results.items()
+        if meets_target(result)
+    ]
+    within_budget: List[int] = [
+        hnsw_ef for hnsw_ef, result in ef_results.items()
+        if fits_budget(result)
+    ]
+    if passing:
+        search_profile = SearchProfile(hnsw_ef=passing[0])
+    elif meets_target(exact_result):
+        search_profile = SearchProfile(exact=True)
+    elif within_budget:
+        search_profile = SearchProfile(hnsw_ef=max(
+            within_budget,
+            key=lambda hnsw_ef: ef_results[hnsw_ef]["recall"]
+        ))
+    else:
+        search_profile = SearchProfile(hnsw_ef=min(
+            ef_results,
+            key=lambda hnsw_ef: ef_results[hnsw_ef]["p95_ms"]
+        ))
+
+    return {
+        "collection": collection_name,
+        "vectorizer": metadata["vectorizer"],
+        "model": metadata["model"],
+        "storage_profile": storage_profile,
+        "queries": len(queries),
+        "top_k": top_k,
+        "repeats": repeats,
+        "recall_target": recall_target,
+        "latency_budget_ms": latency_budget_ms,
+        "exact": exact_result,
+        "hnsw_ef": {
+            str(hnsw_ef): result for hnsw_ef, result in ef_results.items()
+        },
+        "search_profile": search_profile.model_dump(),
+        "meets_target": bool(passing) or search_profile.exact,
+    }
@@ -0,0 +1,104 @@
+import json
+import pathlib
+
+from offle_assistant.config import OffleConfig
+from offle_assistant.vector_db import QdrantDB, SearchProfile
+from offle_assistant.benchmarks import (
+    benchmark_length_bucketing,
+    benchmark_search,
+    measure_inference_drift,
+    run_embedding_benchmark,
+    tune_search_profile
+)
+
+
+def bench_command(
+    args,
+    config: OffleConfig
+):
+    if args.length_bucketing is not None:
+        results: dict = benchmark_length_bucketing(
+            doc_path=pathlib.Path(args.length_bucketing).expanduser(),
+            model_string=args.model or "all-mpnet-base-v2",
+            repeats=args.repeats
+        )
+        write_results("length_bucketing", results, args.output)
+
+    if args.embedding:
+        results: dict = run_embedding_benchmark(
+            vectorizer_string=args.vectorizer,
+            model_string=args.model,
+            corpus_path=(
+                pathlib.Path(args.corpus) if args.corpus is not None
+                else None
+            ),
+            batch_sizes=args.batch_sizes,
+            thread_counts=args.threads or [None]
+        )
+        write_results("embedding", results, args.output)
+
+    if args.inference_drift is not None:
+        results: dict = measure_inference_drift(
+            model_string=args.model or "all-mpnet-base-v2",
+            inference_mode=args.inference_drift,
+            corpus_path=(
+                pathlib.Path(args.corpus) if args.corpus is not None
+                else None
+            )
+        )
+        write_results("inference_drift", results, args.output)
+
+    if args.search is not None:
+        results: dict = benchmark_search(
+            vector_db=QdrantDB(config.settings.vector_db_server),
+            collection_name=args.search,
+            top_k=args.top_k,
+            repeats=args.repeats
+        )
+        write_results("search", results, args.output)
+
+    if args.tune_search is not None:
+        vector_db = QdrantDB(config.settings.vector_db_server)
+        results: dict = tune_search_profile(
+            vector_db=vector_db,
+            collection_name=args.tune_search,
+            top_k=args.top_k,
+            recall_target=args.recall_target,
+            latency_budget_ms=args.latency_budget_ms,
+            repeats=args.repeats
+        )
+        write_results("tune_search", results, args.output)
+        if args.save:
+            vector_db.save_search_profile(
+                collection_name=args.tune_search,
+                search_profile=SearchProfile(**results["search_profile"])
+            )
+            print(f"Saved search profile for {args.tune_search}")
+
+
+def write_results(
+    benchmark_name: str,
+    results: dict,
+    output: str = None
+):
+    """
+        Results are keyed by benchmark name. An existing output file is
+        updated in place, so running several benchmarks into one file
+        keeps all of their results.
+    """
+    if output is None:
+        print(json.dumps({benchmark_name: results}, indent=2))
+        return
+
+    output_path: pathlib.Path = pathlib.Path(output).expanduser()
+    all_results: dict = {}
+    if output_path.exists():
+        try:
+            all_results = json.loads(output_path.read_text())
+        except json.JSONDecodeError:
+            all_results = {}
+        if not isinstance(all_results, dict):
+            all_results = {}
+    all_results[benchmark_name] = results
+    output_path.write_text(json.dumps(all_results, indent=2))
+    print(f"Wrote {benchmark_name} results to {output_path}")
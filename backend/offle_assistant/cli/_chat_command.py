@@ -1,4 +1,4 @@
-from typing import Generator
+from typing import Generator, List
 
 from prompt_toolkit import print_formatted_text as fprint
 from prompt_toolkit import prompt
@@ -8,7 +8,6 @@ from prompt_toolkit.validation import Validator, ValidationError
 from offle_assistant.config import (
     OffleConfig,
     LLMServerConfig,
-    VectorDbServerConfig
 )
 from offle_assistant.persona import (
     Persona,
@@ -33,12 +32,7 @@ def chat_command(
     persona_dict = config.personas
     persona_model: PersonaModel = persona_dict[persona_id]
 
-    qdrant_db: VectorDB = QdrantDB(
-        VectorDbServerConfig(
-            hostname=config.settings.vector_db_server.hostname,
-            port=config.settings.vector_db_server.port
-        )
-    )
+    qdrant_db: VectorDB = QdrantDB(config.settings.vector_db_server)
 
     ollama_server_config: LLMServerConfig = LLMServerConfig(
         hostname=config.settings.llm_server.hostname,
@@ -101,20 +95,22 @@ def chat_command(
                 vector_db=qdrant_db,
                 llm_client=llm_client,
             )
-            rag_response: DbReturnObj = chat_response.rag_response
-            if rag_response.get_hit_success():
+            rag_hits: List[DbReturnObj] = chat_response.rag_hits
+            if rag_hits:
                 fprint("RAG prompt given to LLM: ")
                 fprint("---" * 10)
-                fprint(persona.get_RAG_prompt(rag_response))
+                fprint(persona.get_RAG_prompt(rag_hits))
                 fprint("---" * 10)
                 fprint("End prompt")
-                fprint(
-                    f"Distance from query: {rag_response.euclidean_distance}"
-                )
-                fprint(
-                    f"Cosine Similarity: {rag_response.cosine_similarity}"
-                )
-                fprint(f"Document path: {rag_response.doc_path}")
+                for rag_hit in rag_hits:
+                    fprint(
+                        f"Distance from query: {rag_hit.euclidean_distance}"
+                    )
+                    fprint(
+                        f"Cosine Similarity: {rag_hit.cosine_similarity}"
+                    )
+                    fprint(f"Document path: {rag_hit.doc_path}")
+                    fprint(f"Collection: {rag_hit.collection_name}")
                 fprint("\n")
 
             fprint(ralph_prompt, end='', flush=True)
@@ -6,8 +6,17 @@ from ._chat_command import chat_command
 from ._persona_command import persona_command
 from ._config_command import config_command
 from ._rag_command import rag_command
+from ._bench_command import bench_command
+from ._sidecar_command import sidecar_command
+from ._maintenance_command import maintenance_command
 
 from offle_assistant.config import load_config, OffleConfig
+from offle_assistant.vectorizer import (
+    configure_embedding,
+    configure_inference,
+    configure_ollama_server,
+    vectorizer_lookup_table
+)
 
 
 # This may need to be handled more elegantly later.
@@ -31,6 +40,9 @@ class CLI:
         self.add_chat_parser()
         self.add_config_parser()
         self.add_rag_parser()
+        self.add_bench_parser()
+        self.add_sidecar_parser()
+        self.add_maintenance_parser()
 
         # Parse arguments
         self.args = self.parser.parse_args()
@@ -77,8 +89,236 @@ class CLI:
             action="store_true",
         )
 
+        parser_rag.add_argument(
+            "--vectorizer",
+            type=str,
+            choices=list(vectorizer_lookup_table.keys()),
+            default="sentence-transformer",
+            help="Which vectorizer to embed with when a new collection is "
+            "created. 'hashing' needs no model download and is meant for "
+            "benchmarks and load tests only."
+        )
+
+        parser_rag.add_argument(
+            "--model", "-m",
+            type=str,
+            default=None,
+            help="Which model the vectorizer should use when a new "
+            "collection is created. Defaults to the vectorizer's default."
+        )
+
+        parser_rag.add_argument(
+            "--storage_profile",
+            type=str,
+            choices=["float32", "int8", "binary"],
+            default="float32",
+            help="How vectors are stored when a new collection is created. "
+            "int8 and binary keep quantized vectors in RAM and the full "
+            "precision originals on disk for rescoring."
+        )
+
+        parser_rag.add_argument(
+            "--inference_mode",
+            type=str,
+            choices=["fp32", "int8", "onnx"],
+            default="fp32",
+            help="How the sentence-transformer model runs when a new "
+            "collection is created. int8 quantizes the linear layers, onnx "
+            "runs an exported graph from settings.embedding.onnx_model_dir. "
+            "Both are CPU only. Check the drift with "
+            "'bench --inference_drift' first."
+        )
+
+        parser_rag.add_argument(
+            "--workers", "-w",
+            type=int,
+            default=None,
+            help="Number of embedding worker processes to use while adding "
+            "documents. Overrides settings.embedding.embedding_workers. "
+            "0 embeds in-process."
+        )
+
+        parser_rag.add_argument(
+            "--torch_threads",
+            type=int,
+            default=None,
+            help="Torch intra-op threads per embedding worker. Overrides "
+            "settings.embedding.worker_torch_threads."
+        )
+
         parser_rag.set_defaults(func=rag_command)
 
+    def add_bench_parser(self):
+        # Subcommand: bench
+        parser_bench = self.subparsers.add_parser(
+            "bench",
+            help="Subcommand related to benchmarking the embedding pipeline."
+        )
+
+        parser_bench.add_argument(
+            "--length_bucketing",
+            type=str,
+            help="A LaTeX project directory to benchmark length-bucketed "
+            "encoding against unsorted encoding on."
+        )
+
+        parser_bench.add_argument(
+            "--embedding", "-e",
+            action="store_true",
+            help="Benchmark embedding throughput and query latency."
+        )
+
+        parser_bench.add_argument(
+            "--inference_drift",
+            type=str,
+            choices=["int8", "onnx"],
+            help="Report the cosine drift of this inference mode's "
+            "embeddings against fp32."
+        )
+
+        parser_bench.add_argument(
+            "--search",
+            type=str,
+            help="A collection to compare lean searches (payload and score "
+            "only) against searches that fetch vectors on."
+        )
+
+        parser_bench.add_argument(
+            "--top_k",
+            type=int,
+            default=3,
+            help="How many hits each --search or --tune_search query asks "
+            "for."
+        )
+
+        parser_bench.add_argument(
+            "--tune_search",
+            type=str,
+            help="A collection to find the smallest hnsw_ef for that meets "
+            "--recall_target within --latency_budget_ms."
+        )
+
+        parser_bench.add_argument(
+            "--recall_target",
+            type=float,
+            default=0.95,
+            help="The recall against exact search --tune_search must reach."
+        )
+
+        parser_bench.add_argument(
+            "--latency_budget_ms",
+            type=float,
+            default=None,
+            help="The p95 search latency --tune_search must stay within."
+        )
+
+        parser_bench.add_argument(
+            "--save",
+            action="store_true",
+            help="Save the profile --tune_search picks on the collection, "
+            "so searches use it by default."
+        )
+
+        parser_bench.add_argument(
+            "--vectorizer",
+            type=str,
+            default="sentence-transformer",
+            choices=list(vectorizer_lookup_table.keys()),
+            help="The vectorizer to benchmark with --embedding."
+        )
+
+        parser_bench.add_argument(
+            "--model", "-m",
+            type=str,
+            default=None,
+            help="The model to benchmark. Defaults to all-mpnet-base-v2 "
+            "for --length_bucketing and the vectorizer's default for "
+            "--embedding."
+        )
+
+        parser_bench.add_argument(
+            "--corpus",
+            type=str,
+            help="A markdown file or directory to benchmark --embedding or "
+            "--inference_drift on in addition to the synthetic corpus."
+        )
+
+        parser_bench.add_argument(
+            "--batch_sizes",
+            type=int,
+            nargs="+",
+            default=[1, 8, 32, 128],
+            help="The batch sizes to measure --embedding throughput at."
+        )
+
+        parser_bench.add_argument(
+            "--threads",
+            type=int,
+            nargs="+",
+            default=None,
+            help="The torch thread counts to measure --embedding at."
+        )
+
+        parser_bench.add_argument(
+            "--output", "-o",
+            type=str,
+            help="Write the results as JSON to this file instead of stdout, "
+            "keyed by benchmark name. Results already in the file from "
+            "other benchmarks are kept."
+        )
+
+        parser_bench.add_argument(
+            "--repeats",
+            type=int,
+            default=3,
+            help="How many timed runs to take the best of, or for "
+            "--search and --tune_search, how many times to run every "
+            "query."
+        )
+
+        parser_bench.set_defaults(func=bench_command)
+
+    def add_sidecar_parser(self):
+        # Subcommand: sidecar
+        parser_sidecar = self.subparsers.add_parser(
+            "sidecar",
+            help="Run the embedding sidecar, which serves embeddings to "
+            "every API worker on this host so that each model is only "
+            "loaded once."
+        )
+
+        parser_sidecar.add_argument(
+            "--socket", "-s",
+            type=str,
+            help="The Unix socket to listen on. Defaults to "
+            "settings.embedding.sidecar_socket."
+        )
+
+        parser_sidecar.set_defaults(func=sidecar_command)
+
+    def add_maintenance_parser(self):
+        # Subcommand: maintenance
+        parser_maintenance = self.subparsers.add_parser(
+            "maintenance",
+            help="Subcommand related to maintaining the vector database."
+        )
+
+        parser_maintenance.add_argument(
+            "--create_indexes",
+            action="store_true",
+            help="Add the payload indexes new collections are created with "
+            "to existing collections. Indexes that exist are left alone."
+        )
+
+        parser_maintenance.add_argument(
+            "--collection", "-c",
+            type=str,
+            default=None,
+            help="Which collection to operate over. Defaults to all of them."
+        )
+
+        parser_maintenance.set_defaults(func=maintenance_command)
+
     def add_persona_parser(self):
         # Subcommand: persona
         parser_persona = self.subparsers.add_parser(
@@ -147,6 +387,10 @@ class CLI:
             print("ERROR: no valid config")
             sys.exit(1)
 
+        configure_embedding(self.config.settings.embedding)
+        configure_inference(self.config.settings.inference)
+        configure_ollama_server(self.config.settings.llm_server)
+
         # Call the appropriate function
         self.args.func(
             args=self.args,
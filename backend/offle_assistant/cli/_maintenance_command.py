@@ -0,0 +1,27 @@
+from typing import List
+
+from offle_assistant.config import OffleConfig
+from offle_assistant.vector_db import QdrantDB
+
+
+def maintenance_command(
+    args,
+    config: OffleConfig
+):
+    qdrant_db: QdrantDB = QdrantDB(config.settings.vector_db_server)
+
+    if args.create_indexes is True:
+        collection_names: List[str] = (
+            [args.collection] if args.collection is not None
+            else list(qdrant_db.list_collection_metadata().keys())
+        )
+        for collection_name in collection_names:
+            created: List[str] = qdrant_db.create_payload_indexes(
+                collection_name=collection_name
+            )
+            if created:
+                print(f"{collection_name}: indexed {', '.join(created)}")
+            else:
+                print(f"{collection_name}: all indexes present")
+    else:
+        print("Nothing to do. See 'maintenance --help'.")
@@ -1,27 +1,48 @@
 import pathlib
+import sys
 
 from prompt_toolkit import print_formatted_text as fprint
 
-from offle_assistant.config import OffleConfig, VectorDbServerConfig
+from offle_assistant.config import OffleConfig
 from offle_assistant.vector_db import QdrantDB
+from offle_assistant.vectorizer import (
+    check_inference_mode,
+    embedding_settings,
+    vectorizer_lookup_table
+)
 
 
 def rag_command(
     args,
     config: OffleConfig
 ):
-    qdrant_db = QdrantDB(
-        VectorDbServerConfig(
-            hostname="localhost",
-            port=6333
-        )
-    )
+    qdrant_db: QdrantDB = QdrantDB(config.settings.vector_db_server)
+    if args.workers is not None:
+        embedding_settings.embedding_workers = args.workers
+    if args.torch_threads is not None:
+        embedding_settings.worker_torch_threads = args.torch_threads
+
     if args.add is not None:
         doc_path: pathlib.Path = pathlib.Path(args.add).expanduser()
 
         collection_name: str = args.collection
 
-        qdrant_db.add_collection(collection_name=collection_name)
+        try:
+            check_inference_mode(
+                vectorizer_class=vectorizer_lookup_table[args.vectorizer],
+                inference_mode=args.inference_mode
+            )
+        except ValueError as e:
+            print(e)
+            sys.exit(1)
+
+        qdrant_db.add_collection(
+            collection_name=collection_name,
+            vectorizer_class=vectorizer_lookup_table[args.vectorizer],
+            model_string=args.model,
+            storage_profile=args.storage_profile,
+            inference_mode=args.inference_mode
+        )
         qdrant_db.add_document(
             doc_path=doc_path,
             collection_name=collection_name
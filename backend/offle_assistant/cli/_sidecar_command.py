@@ -0,0 +1,25 @@
+import pathlib
+import sys
+from typing import Optional
+
+from offle_assistant.config import OffleConfig
+from offle_assistant.vectorizer import run_embedding_sidecar
+
+
+def sidecar_command(
+    args,
+    config: OffleConfig
+):
+    socket_path: Optional[str] = (
+        args.socket or config.settings.embedding.sidecar_socket
+    )
+    if socket_path is None:
+        print(
+            "ERROR: no socket given. Pass --socket or set "
+            "settings.embedding.sidecar_socket."
+        )
+        sys.exit(1)
+
+    socket_path = pathlib.Path(socket_path).expanduser()
+    print(f"Embedding sidecar listening on {socket_path}")
+    run_embedding_sidecar(socket_path=socket_path)
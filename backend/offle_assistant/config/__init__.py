@@ -4,6 +4,8 @@ from ._config import (
     SettingsConfig,
     LLMServerConfig,
     VectorDbServerConfig,
+    EmbeddingConfig,
+    InferenceConfig,
     StrictBaseModel
 )
 
@@ -13,5 +15,7 @@ __all__ = [
     "SettingsConfig",
     "LLMServerConfig",
     "VectorDbServerConfig",
+    "EmbeddingConfig",
+    "InferenceConfig",
     "StrictBaseModel"
 ]
@@ -1,5 +1,5 @@
 import pathlib
-from typing import Dict, List
+from typing import Dict, List, Optional
 import sys
 
 from pydantic import BaseModel, Field, ValidationError
@@ -40,6 +40,86 @@ class LLMServerConfig(StrictBaseModel):
 class VectorDbServerConfig(StrictBaseModel):
     hostname: str = "localhost"
     port: int = 6333
+    # Searches only fetch payloads and scores. Turn this on to also fetch
+    # each hit's vector and recompute its distances from it.
+    debug_vectors: bool = False
+    # Connections the API's async client keeps open to the server, shared
+    # by every request.
+    pool_size: int = 16
+    # Documents are upserted in batches of this many points, with up to
+    # upsert_parallelism batches in flight at once.
+    upsert_batch_size: int = 256
+    upsert_parallelism: int = 4
+    # How long a collection's vectorizer, dimension and existence are
+    # cached before Qdrant is asked again. Creating or deleting a
+    # collection through the same client updates the cache at once.
+    collection_info_ttl_seconds: float = 60.0
+
+
+class EmbeddingConfig(StrictBaseModel):
+    # How many embedding models a single process keeps loaded at once.
+    max_resident_models: int = 2
+    # Concurrent query embeddings are collected for up to this long, or
+    # until max_batch_size of them are waiting, and encoded together.
+    batch_window_ms: float = 5.0
+    max_batch_size: int = 32
+    # Repeated queries are served from an in-memory embedding cache.
+    query_cache_max_bytes: int = 64 * 1024 * 1024
+    query_cache_ttl_seconds: float = 3600.0
+    # Chunk embeddings are cached on disk so that re-ingesting an edited
+    # document only embeds the paragraphs that changed. Defaults to the
+    # user cache dir, which the CLI and the API share.
+    chunk_cache_enabled: bool = True
+    chunk_cache_dir: Optional[str] = None
+    chunk_cache_max_bytes: int = 2 * 1024 * 1024 * 1024
+    # Large ingestion jobs can shard chunk lists over worker processes,
+    # each holding its own copy of the model. 0 embeds in-process.
+    embedding_workers: int = 0
+    worker_torch_threads: int = 1
+    # Each worker encodes this many chunks per task.
+    worker_shard_size: int = 64
+    # Documents are embedded and upserted this many chunks at a time. With
+    # embedding_workers set, this rounds up to a whole number of shards
+    # per worker so that every worker gets some of each batch.
+    ingest_batch_size: int = 256
+    # Async callers embed on a dedicated thread pool of this size.
+    async_max_concurrency: int = 2
+    # Chunks are bucketed by token length before encoding. Each batch
+    # holds at most encode_token_budget tokens including padding.
+    length_bucketing: bool = True
+    encode_token_budget: int = 8192
+    encode_max_batch_size: int = 128
+    # Collections using the onnx inference mode load
+    # <onnx_model_dir>/<model name>, a sentence-transformers model
+    # directory with an exported onnx/model.onnx. When unset the graph is
+    # exported from the published model on first load.
+    onnx_model_dir: Optional[str] = None
+    # The ollama vectorizer embeds on the LLM server. Inputs are sent
+    # ollama_batch_size at a time over a pool of at most
+    # ollama_max_connections connections, and transient failures are
+    # retried with exponential backoff.
+    ollama_batch_size: int = 64
+    ollama_max_connections: int = 8
+    ollama_timeout_seconds: float = 60.0
+    ollama_max_retries: int = 3
+    ollama_retry_backoff_seconds: float = 0.5
+    # When set, models are not loaded in this process. Embedding requests
+    # go to the embedding sidecar listening on this Unix socket, which
+    # holds one copy of each model for every API worker on the host. If
+    # the sidecar can't be reached the model is loaded locally instead,
+    # and the sidecar is tried again after sidecar_retry_seconds.
+    sidecar_socket: Optional[str] = None
+    sidecar_timeout_seconds: float = 60.0
+    sidecar_retry_seconds: float = 30.0
+
+
+class InferenceConfig(StrictBaseModel):
+    # Torch thread pools for every model in the process. None leaves
+    # torch's own choice, which is usually every core.
+    intra_op_threads: Optional[int] = None
+    inter_op_threads: Optional[int] = None
+    # How many model.encode calls may run at once in one process.
+    max_concurrent_encodes: int = 1
 
 
 class SettingsConfig(StrictBaseModel):
@@ -51,6 +131,8 @@ class SettingsConfig(StrictBaseModel):
     formatting: FormattingConfig = FormattingConfig()
     llm_server: LLMServerConfig = LLMServerConfig()
     vector_db_server: VectorDbServerConfig = VectorDbServerConfig()
+    embedding: EmbeddingConfig = EmbeddingConfig()
+    inference: InferenceConfig = InferenceConfig()
 
 
 # ----- Persona-related Models -----
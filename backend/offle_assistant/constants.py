@@ -6,8 +6,13 @@ import appdirs
 
 OFFLE_ENV = os.getenv("OFFLE_ENV", "development")
 
+# Unix socket of the embedding sidecar. API workers started with this set
+# embed through the sidecar instead of loading their own models.
+OFFLE_EMBEDDING_SIDECAR = os.getenv("OFFLE_EMBEDDING_SIDECAR")
+
 __all__ = [
     "OFFLE_ENV",
+    "OFFLE_EMBEDDING_SIDECAR",
 ]
 
 
@@ -13,6 +13,7 @@ from ._personas import (
     update_persona_by_id,
     get_personas_by_creator_id,
     get_persona_by_id,
+    get_persona_language_models,
     delete_persona_by_id
 )
 
@@ -61,6 +62,7 @@ __all__ = [
     "create_persona",
     "get_persona_by_id",
     "get_personas_by_creator_id",
+    "get_persona_language_models",
     "update_persona_by_id",
     "delete_persona_by_id",
     "add_model",
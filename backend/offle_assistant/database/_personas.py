@@ -1,5 +1,5 @@
 import logging
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from bson import ObjectId
 from motor.motor_asyncio import (
@@ -72,6 +72,13 @@ async def get_personas_by_creator_id(
     return persona_dict
 
 
+async def get_persona_language_models(
+    db: AsyncIOMotorDatabase
+) -> List[str]:
+    """Return every distinct language model used by a persona."""
+    return await db.personas.distinct("model")
+
+
 ############################
 # Update
 ############################
@@ -14,7 +14,7 @@ def get_llm_client():
 
 
 def get_vector_db():
-    """Retrieve the immutable LLM server config from FastAPI's app state."""
+    """Retrieve the shared AsyncVectorDB from FastAPI's app state."""
     return get_app().state.vector_db
 
 
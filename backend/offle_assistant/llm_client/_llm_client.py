@@ -56,6 +56,16 @@ class LLMClient:
                         return False  # failure
         return True  # success
 
+    def preload_model(
+        self,
+        model: str,
+    ):
+        """
+            Asks the Ollama server to load a model into memory without
+            generating anything, so the first real chat doesn't pay for it.
+        """
+        self.ollama_client.generate(model=model, prompt="")
+
     def chat(
         self,
         model: str,
@@ -1,6 +1,8 @@
+import asyncio
 import logging
 
 from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from contextlib import asynccontextmanager
@@ -9,8 +11,8 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from offle_assistant.custom_logging import logging_config
 from offle_assistant.llm_client import LLMClient
 from offle_assistant.vector_db import (
-    VectorDB,
-    QdrantDB,
+    AsyncVectorDB,
+    AsyncQdrantDB,
 )
 from offle_assistant.config import (
     LLMServerConfig,
@@ -33,6 +35,12 @@ from offle_assistant.database import (
 from offle_assistant.models import (UserModel)
 from offle_assistant.auth import hash_password
 from offle_assistant.dependencies import get_db
+from offle_assistant.warmup import WarmupState, warm_up
+from offle_assistant.vectorizer import (
+    configure_ollama_server,
+    embedding_settings
+)
+from offle_assistant.constants import OFFLE_EMBEDDING_SIDECAR
 
 
 async def create_default_admin():
@@ -77,9 +85,21 @@ async def lifespan(app: FastAPI):
     # This is where we ensure that group names are unique
     await create_indexes(get_db())
 
+    # Warm models in the background so /ready can report progress.
+    app.state.warmup_state = WarmupState()
+    warmup_task = asyncio.create_task(
+        warm_up(
+            state=app.state.warmup_state,
+            vector_db=app.state.vector_db,
+            llm_client=app.state.llm_server,
+            db=get_db()
+        )
+    )
+
     yield
 
-    pass
+    warmup_task.cancel()
+    await app.state.vector_db.aclose()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -90,6 +110,22 @@ async def root():
     return {"message": "FastAPI is running!"}
 
 
+@app.get("/ready")
+async def ready():
+    """
+        Readiness probe for load balancers. Returns 503 until the startup
+        warm-up has loaded every collection's vectorizer and preloaded the
+        persona models, with the warm-up progress in the body either way.
+    """
+    warmup_state: WarmupState = getattr(
+        app.state, "warmup_state", WarmupState()
+    )
+    return JSONResponse(
+        status_code=200 if warmup_state.is_ready() else 503,
+        content=warmup_state.model_dump()
+    )
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -122,14 +158,20 @@ app.include_router(
 )
 
 # Store in `app.state`
-app.state.llm_server: LLMClient = LLMClient(
-    LLMServerConfig(
-        hostname="localhost",
-        port=11435,
-    )
+llm_server_config: LLMServerConfig = LLMServerConfig(
+    hostname="localhost",
+    port=11435,
 )
+app.state.llm_server: LLMClient = LLMClient(llm_server_config)
+
+# Collections using the ollama vectorizer embed on the same server.
+configure_ollama_server(llm_server_config)
+
+if OFFLE_EMBEDDING_SIDECAR is not None:
+    embedding_settings.sidecar_socket = OFFLE_EMBEDDING_SIDECAR
 
-app.state.vector_db: VectorDB = QdrantDB(
+# The CLI uses the blocking QdrantDB; the API must not block its event loop.
+app.state.vector_db: AsyncVectorDB = AsyncQdrantDB(
     VectorDbServerConfig(
         hostname="localhost",
         port=6333
@@ -2,7 +2,7 @@ from ._user import UserModel, Role
 from ._persona import PersonaModel, PersonaUpdateModel
 from ._common_utils import PyObjectId
 from ._messages import MessageHistoryModel, MessageContent
-from ._rag import RAGConfig, QueryMetric
+from ._rag import RAGConfig, QueryMetric, MergeStrategy, RetrievalMode
 from ._files import FileMetadata
 from ._groups import GroupModel, GroupUpdateModel
 from ._language_models import LanguageModelsCollection, TagInfo, ModelDetails
@@ -18,6 +18,8 @@ __all__ = [
     "MessageContent",
     "RAGConfig",
     "QueryMetric",
+    "MergeStrategy",
+    "RetrievalMode",
     "FileMetadata",
     "GroupModel",
     "GroupUpdateModel",
@@ -8,6 +8,27 @@ QueryMetric = Literal[
     "euclidean_distance"
 ]
 
+"""
+    How hits from a persona's collections are merged into one ranked list.
+    "score" compares each hit's cosine similarity to the query, "rrf" uses
+    reciprocal rank fusion.
+"""
+MergeStrategy = Literal[
+    "score",
+    "rrf"
+]
+
+"""
+    How each collection is searched. "dense" compares embeddings only.
+    "hybrid" also matches the query's terms against the collection's
+    lexical vectors, and fuses both rankings with reciprocal rank fusion,
+    which helps with identifiers and error codes embeddings miss.
+"""
+RetrievalMode = Literal[
+    "dense",
+    "hybrid"
+]
+
 
 class RAGConfig(BaseModel):
     """Configuration for Retrieval-Augmented Generation (RAG)."""
@@ -28,7 +49,41 @@ class RAGConfig(BaseModel):
         ...,
         description="Distance metric for retrieval (cosine, euclidean, etc)"
     )
+    top_k: int = Field(
+        default=3,
+        ge=1,
+        le=20,
+        description="Number of paragraphs retrieved per query"
+    )
+    mmr_lambda: Optional[float] = Field(
+        default=None,
+        ge=0.0,
+        le=1.0,
+        description="When set, retrieved paragraphs are diversified with "
+        "maximal marginal relevance. 1.0 is pure relevance, lower values "
+        "drop near-duplicate paragraphs more aggressively"
+    )
+    merge_strategy: MergeStrategy = Field(
+        default="score",
+        description="How hits from several collections are merged"
+    )
+    retrieval_mode: RetrievalMode = Field(
+        default="dense",
+        description="Whether collections are searched by embedding only, "
+        "or by embedding and lexical term match combined"
+    )
+    query_deadline_seconds: Optional[float] = Field(
+        default=10.0,
+        gt=0.0,
+        description="Collections that haven't answered within this many "
+        "seconds are left out of the query's context. None waits for all"
+    )
     additional_settings: Optional[Dict[str, str]] = Field(
         default_factory=dict,
-        description="Optional extra settings for different vector databases"
+        description=(
+            "Optional extra settings for different vector databases. "
+            "hnsw_ef, exact and oversampling tune how collections are "
+            "searched; prefix one with '<collection>.' to tune only that "
+            "collection"
+        )
     )
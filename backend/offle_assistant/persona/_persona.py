@@ -1,5 +1,5 @@
 import pathlib
-from typing import Union, Generator, List, Optional
+from typing import Union, Generator, List, Optional, Dict
 import yaml
 
 from offle_assistant.config import (
@@ -7,19 +7,24 @@ from offle_assistant.config import (
 )
 from offle_assistant.vector_db import (
     VectorDB,
+    AsyncVectorDB,
     DbReturnObj,
+    SearchProfile,
+    parse_search_profiles,
 )
 from offle_assistant.llm_client import LLMClient
 from offle_assistant.models import (
     PersonaModel,
     MessageContent,
     QueryMetric,
+    MergeStrategy,
+    RetrievalMode,
 )
 
 
 class PersonaChatResponse(StrictBaseModel):
     chat_response: Union[str, Generator[str, None, None]] = ""
-    rag_response: DbReturnObj = DbReturnObj()
+    rag_hits: List[DbReturnObj] = []
 
 
 class Persona:
@@ -51,14 +56,37 @@ class Persona:
             )
             self.db_collections: List[str] = persona_model.rag.db_collections
             self.query_metric: QueryMetric = persona_model.rag.query_metric
+            self.top_k: int = persona_model.rag.top_k
+            self.mmr_lambda: Optional[float] = persona_model.rag.mmr_lambda
+            self.merge_strategy: MergeStrategy = (
+                persona_model.rag.merge_strategy
+            )
+            self.query_deadline_seconds: Optional[float] = (
+                persona_model.rag.query_deadline_seconds
+            )
+            self.retrieval_mode: RetrievalMode = (
+                persona_model.rag.retrieval_mode
+            )
             self.additional_rag_settings = (
                 persona_model.rag.additional_settings
             )
+            self.search_profiles: Dict[str, SearchProfile] = (
+                parse_search_profiles(
+                    additional_settings=self.additional_rag_settings,
+                    collection_names=self.db_collections
+                )
+            )
         else:
             self.query_threshold = None
             self.db_collections = None
             self.query_metric = None
+            self.top_k = None
+            self.mmr_lambda = None
+            self.merge_strategy = None
+            self.query_deadline_seconds = None
+            self.retrieval_mode = None
             self.additional_rag_settings = None
+            self.search_profiles = {}
 
         self.message_chain: List[MessageContent] = message_chain
 
@@ -78,7 +106,7 @@ class Persona:
 
     def get_RAG_prompt(
         self,
-        RAG_hit: DbReturnObj = None,
+        RAG_hits: Optional[List[DbReturnObj]] = None,
         # rag_template: Optional[] = None,
     ):
         """
@@ -92,17 +120,25 @@ class Persona:
         will be a method on it that will return a dictionary
         in a specific format that we can use to fill in fields
         in the prompt.
+
+        Hits are expected best first, and are numbered in that order.
         """
-        if RAG_hit.get_hit_success() is True:
-            rag_prompt = (
-                "Given the following context, answer the user's query:\n\n"
-            )
+        RAG_hits = RAG_hits or []
+        successful_hits: List[DbReturnObj] = [
+            hit for hit in RAG_hits if hit.get_hit_success() is True
+        ]
+        if not successful_hits:
+            return ""
+
+        rag_prompt = (
+            "Given the following context, answer the user's query:\n\n"
+        )
+        for hit_number, hit in enumerate(successful_hits, start=1):
             rag_prompt += (
-                f"Context: {RAG_hit.get_hit_document_string()}\n"
+                f"Context {hit_number} ({hit.file_name}):\n"
+                f"{hit.get_hit_document_string()}\n\n"
             )
-            return rag_prompt
-        else:
-            return ""
+        return rag_prompt
 
     def chat(
         self,
@@ -114,26 +150,96 @@ class Persona:
         api_string: str = "ollama",
         # collection_name: str = ""
     ) -> PersonaChatResponse:
+        """
+            With perform_rag, every one of the persona's collections is
+            searched and the hits are merged into one ranked context.
+        """
+        rag_hits: List[DbReturnObj] = []
+        if perform_rag is True and self.can_perform_rag(vector_db):
+            rag_hits = vector_db.query_collections(
+                collection_names=self.db_collections,
+                query_string=user_response,
+                score_threshold=self.query_threshold,
+                top_k=self.top_k,
+                mmr_lambda=self.mmr_lambda,
+                merge_strategy=self.merge_strategy,
+                deadline_seconds=self.query_deadline_seconds,
+                search_profiles=self.search_profiles,
+                retrieval_mode=self.retrieval_mode,
+            )
+
+        return self.respond(
+            user_response=user_response,
+            rag_hits=rag_hits,
+            llm_client=llm_client,
+            stream=stream,
+            api_string=api_string
+        )
+
+    async def achat(
+        self,
+        user_response,
+        llm_client: LLMClient,
+        vector_db: Union[AsyncVectorDB, VectorDB],
+        stream: bool = False,
+        perform_rag: bool = False,
+        api_string: str = "ollama",
+    ) -> PersonaChatResponse:
+        """
+            Same as chat, but the RAG lookup is awaited, so neither
+            embedding the query nor the search blocks the event loop. The
+            API passes an AsyncVectorDB; a VectorDB works too.
+        """
+        rag_hits: List[DbReturnObj] = []
+        if perform_rag is True and self.can_perform_rag(vector_db):
+            rag_hits = await vector_db.aquery_collections(
+                collection_names=self.db_collections,
+                query_string=user_response,
+                score_threshold=self.query_threshold,
+                top_k=self.top_k,
+                mmr_lambda=self.mmr_lambda,
+                merge_strategy=self.merge_strategy,
+                deadline_seconds=self.query_deadline_seconds,
+                search_profiles=self.search_profiles,
+                retrieval_mode=self.retrieval_mode,
+            )
+
+        return self.respond(
+            user_response=user_response,
+            rag_hits=rag_hits,
+            llm_client=llm_client,
+            stream=stream,
+            api_string=api_string
+        )
+
+    def can_perform_rag(
+        self,
+        vector_db: Union[AsyncVectorDB, VectorDB],
+    ) -> bool:
         print("THRESHOLD: ", self.query_threshold)
-        rag_prompt = ""
-        rag_response: DbReturnObj = DbReturnObj()
-        if perform_rag is True:
-            if vector_db is None:
-                print("Cannot perform RAG without a vectorDB.")
-            elif len(self.db_collections) <= 0:
-                print("Cannot perform RAG without a specified collection.")
-            else:
-                rag_response: Optional[DbReturnObj] = (
-                    vector_db.query_collection(
-                        collection_name=self.db_collections[0],
-                        query_string=user_response,
-                        score_threshold=self.query_threshold,
-                    )
-                )
+        if vector_db is None:
+            print("Cannot perform RAG without a vectorDB.")
+            return False
+        elif not self.db_collections:
+            print("Cannot perform RAG without a specified collection.")
+            return False
+        return True
 
-                rag_prompt += self.get_RAG_prompt(
-                    RAG_hit=rag_response,
-                )
+    def respond(
+        self,
+        user_response,
+        rag_hits: List[DbReturnObj],
+        llm_client: LLMClient,
+        stream: bool = False,
+        api_string: str = "ollama",
+    ) -> PersonaChatResponse:
+        """
+            Sends the user's message, with any RAG context prepended, to
+            the LLM and records both sides in the message chain.
+        """
+        rag_prompt = self.get_RAG_prompt(
+            RAG_hits=rag_hits,
+        )
 
         user_message = {
             "role": "user",
@@ -166,7 +272,7 @@ class Persona:
 
             persona_chat_response: PersonaChatResponse = PersonaChatResponse(
                 chat_response=response_generator(),
-                rag_response=rag_response
+                rag_hits=rag_hits
             )
 
             return persona_chat_response
@@ -180,7 +286,7 @@ class Persona:
 
             persona_chat_response: PersonaChatResponse = PersonaChatResponse(
                 chat_response=response_text,
-                rag_response=rag_response
+                rag_hits=rag_hits
             )
 
             # print("CHAT_RESPONSE:", persona_chat_response)
@@ -9,6 +9,8 @@ from prompt_toolkit import print_formatted_text as fprint
 import pymupdf4llm
 from sentence_transformers import SentenceTransformer
 
+from offle_assistant.vectorizer import apply_inference_settings, encode_slot
+
 
 def preprocess_docs(
     rag_dir: pathlib.Path,
@@ -103,8 +105,10 @@ def compute_embeddings(
         This is only intended for use through one of the
         interfaces: embed_chunks or embed_sentence
     """
+    apply_inference_settings()
     model = SentenceTransformer(model_string)
-    embeddings = model.encode(text)
+    with encode_slot():
+        embeddings = model.encode(text)
     return embeddings
 
 
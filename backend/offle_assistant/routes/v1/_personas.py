@@ -19,7 +19,8 @@ import offle_assistant.database as database
 from offle_assistant.session_manager import SessionManager
 from offle_assistant.llm_client import LLMClient
 from offle_assistant.vector_db import (
-    VectorDB,
+    AsyncVectorDB,
+    DbReturnObj,
 )
 from offle_assistant.dependencies import (
     get_vector_db,
@@ -191,7 +192,7 @@ async def chat_with_persona(
     chat_request: ChatRequest,
     user_model: UserModel = Depends(get_current_user),
     llm_client: LLMClient = Depends(get_llm_client),
-    vector_db: VectorDB = Depends(get_vector_db),
+    vector_db: AsyncVectorDB = Depends(get_vector_db),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Allows any user to chat with a persona."""
@@ -253,7 +254,7 @@ async def chat_with_persona(
             status_code=500, detail="Could not update message history"
         )
 
-    chat_response: PersonaChatResponse = persona.chat(
+    chat_response: PersonaChatResponse = await persona.achat(
         user_response=user_message,
         stream=False,
         perform_rag=False,
@@ -286,5 +287,9 @@ async def chat_with_persona(
         "persona_id": persona_id,
         "message_history_id": str(message_history_id),
         "response": chat_response.chat_response,
-        "rag_hit": chat_response.rag_response,
+        "rag_hit": (
+            chat_response.rag_hits[0] if chat_response.rag_hits
+            else DbReturnObj()
+        ),
+        "rag_hits": chat_response.rag_hits,
     }
@@ -1,8 +1,33 @@
 from ._qdrant_db import QdrantDB
-from ._vector_db import VectorDB, DbReturnObj
+from ._async_qdrant_db import AsyncQdrantDB
+from ._async_vector_db import AsyncVectorDB
+from ._vector_db import VectorDB, StorageProfile
+from ._db_return_obj import DbReturnObj
+from ._fan_out import merge_hit_lists, RRF_K
+from ._qdrant_common import PAYLOAD_INDEX_FIELDS
+from ._collection_info_cache import CollectionInfo, CollectionInfoCache
+from ._search_profile import (
+    SearchProfile,
+    parse_search_profiles,
+    resolve_search_profile
+)
+from ._lexical_encoder import LexicalEncoder, LEXICAL_VECTOR_NAME
 
 __all__ = [
     "QdrantDB",
+    "AsyncQdrantDB",
+    "AsyncVectorDB",
     "VectorDB",
     "DbReturnObj",
+    "StorageProfile",
+    "merge_hit_lists",
+    "RRF_K",
+    "PAYLOAD_INDEX_FIELDS",
+    "CollectionInfo",
+    "CollectionInfoCache",
+    "SearchProfile",
+    "parse_search_profiles",
+    "resolve_search_profile",
+    "LexicalEncoder",
+    "LEXICAL_VECTOR_NAME",
 ]
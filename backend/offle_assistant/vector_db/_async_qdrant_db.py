@@ -0,0 +1,563 @@
+import asyncio
+import logging
+import pathlib
+from typing import Optional, Type, List, Dict, Iterator, Tuple
+
+import numpy as np
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import (
+    PointStruct,
+    PayloadSchemaType,
+    SparseVector,
+)
+
+from offle_assistant.vectorizer import (
+    Vectorizer,
+    SentenceTransformerVectorizer,
+    vectorizer_registry,
+    get_vectorizer_string,
+    get_default_model_string,
+    InferenceMode,
+    join_inference_mode
+)
+from ._vector_db import StorageProfile
+from ._async_vector_db import AsyncVectorDB
+from ._db_return_obj import DbReturnObj
+from ._qdrant_common import QdrantBase
+from ._collection_info_cache import CollectionInfo, CollectionInfoCache
+from ._search_profile import SearchProfile, resolve_search_profile
+from ._fan_out import (
+    get_deadline,
+    arun_before_deadline,
+    merge_hit_lists
+)
+from offle_assistant.config import (
+    VectorDbServerConfig
+)
+from offle_assistant.models import MergeStrategy, RetrievalMode
+
+
+class AsyncQdrantDB(QdrantBase, AsyncVectorDB):
+    """
+
+        QdrantDB on Qdrant's async client. Requests share the client's
+        connection pool of vector_db_server_config.pool_size connections,
+        so concurrent searches don't each open a connection of their own.
+        Embedding still runs in worker threads, or through the
+        vectorizers' async API.
+
+    """
+
+    def __init__(
+        self,
+        vector_db_server_config: VectorDbServerConfig,
+    ):
+        host: str = vector_db_server_config.hostname
+        port: int = vector_db_server_config.port
+
+        self.client: AsyncQdrantClient = AsyncQdrantClient(
+            host=host,
+            port=port,
+            pool_size=vector_db_server_config.pool_size
+        )
+        self.metadata_id = 0
+        self.debug_vectors: bool = vector_db_server_config.debug_vectors
+        self.upsert_batch_size: int = (
+            vector_db_server_config.upsert_batch_size
+        )
+        self.upsert_parallelism: int = (
+            vector_db_server_config.upsert_parallelism
+        )
+        self.collection_info_cache: CollectionInfoCache = (
+            CollectionInfoCache(
+                ttl_seconds=vector_db_server_config.collection_info_ttl_seconds
+            )
+        )
+
+    async def aclose(self):
+        await self.client.close()
+
+    async def aadd_collection(
+        self,
+        collection_name: str,
+        vectorizer_class: Type[Vectorizer] = SentenceTransformerVectorizer,
+        model_string: Optional[str] = None,
+        storage_profile: StorageProfile = "float32",
+        inference_mode: InferenceMode = "fp32"
+    ):
+        if await self.client.collection_exists(
+            collection_name=collection_name
+        ):
+            logging.info(f"Collection '{collection_name}' exists.")
+            return
+
+        vectorizer: Vectorizer = await asyncio.to_thread(
+            vectorizer_registry.get_vectorizer,
+            vectorizer_string=get_vectorizer_string(vectorizer_class),
+            model_string=join_inference_mode(
+                model_string=(
+                    model_string or get_default_model_string(vectorizer_class)
+                ),
+                inference_mode=inference_mode,
+                vectorizer_class=vectorizer_class
+            )
+        )
+        logging.info(
+            f"Collection '{collection_name}' does not exist. Creating..."
+        )
+
+        size_test: str = "this sentence is intended for size detection."
+        vectorized_sentence: np.array = await vectorizer.aembed_sentence(
+            size_test
+        )
+
+        # Diff embeddings have diff dims.
+        vector_dim: int = np.asarray(vectorized_sentence).shape[0]
+
+        await self.client.create_collection(
+            collection_name=collection_name,
+            vectors_config=self.get_vectors_config(
+                vector_dim=vector_dim,
+                storage_profile=storage_profile
+            ),
+            sparse_vectors_config=self.get_sparse_vectors_config(),
+            quantization_config=self.get_quantization_config(
+                storage_profile=storage_profile
+            ),
+        )
+
+        await self.client.upsert(
+            collection_name=collection_name,
+            points=[
+                self.get_metadata_point(
+                    vectorizer=vectorizer,
+                    vector_dim=vector_dim,
+                    storage_profile=storage_profile
+                )
+            ],
+        )
+        await self.acreate_payload_indexes(collection_name=collection_name)
+        self.collection_info_cache.invalidate(collection_name)
+
+    async def acreate_payload_indexes(
+        self,
+        collection_name: str
+    ) -> List[str]:
+        """
+            Async counterpart of QdrantDB.create_payload_indexes.
+        """
+        missing_fields: List[str] = self.get_missing_payload_indexes(
+            payload_schema=(
+                await self.client.get_collection(
+                    collection_name=collection_name
+                )
+            ).payload_schema
+        )
+        for field_name in missing_fields:
+            await self.client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field_name,
+                field_schema=PayloadSchemaType.KEYWORD,
+                wait=True
+            )
+        return missing_fields
+
+    async def adelete_collection(
+        self,
+        collection_name: str
+    ):
+        try:
+            return await self.client.delete_collection(
+                collection_name=collection_name
+            )
+        finally:
+            self.collection_info_cache.invalidate(collection_name)
+
+    async def aadd_document(
+        self,
+        doc_path: pathlib.Path,
+        collection_name: str,
+    ):
+        doc_path = doc_path.expanduser()
+        doc_hash: str = await asyncio.to_thread(
+            self.compute_doc_hash, doc_path
+        )
+
+        existing_doc_path: Optional[pathlib.Path] = (
+            await self.asearch_collection_by_doc_id(
+                doc_id=doc_hash,
+                collection_name=collection_name
+            )
+        )
+        if existing_doc_path:
+            logging.info(
+                f"Skipping document {doc_path.name}, it already exists in "
+                f"{collection_name} as {existing_doc_path}"
+            )
+            return
+
+        metadata: dict = await self.aget_collection_metadata(
+            collection_name=collection_name
+        )
+        vectorizer: Vectorizer = await self.aget_metadata_vectorizer(
+            metadata=metadata
+        )
+        await self.aupsert_batches(
+            collection_name=collection_name,
+            batches=self.iter_upsert_batches(
+                doc_id=doc_hash,
+                doc_path=doc_path,
+                subset_id="all",
+                vectorizer=vectorizer,
+                lexical=bool(metadata.get("lexical_vector"))
+            )
+        )
+
+    async def aupsert_batches(
+        self,
+        collection_name: str,
+        batches: Iterator[List[PointStruct]],
+    ):
+        """
+            Async counterpart of QdrantDB.upsert_batches. Chunking and
+            embedding the next batch runs in a worker thread while earlier
+            batches are being sent.
+        """
+        in_flight: List[asyncio.Task] = []
+        last_batch: Optional[List[PointStruct]] = await asyncio.to_thread(
+            next, batches, None
+        )
+        try:
+            while True:
+                batch: Optional[List[PointStruct]] = await asyncio.to_thread(
+                    next, batches, None
+                )
+                if batch is None:
+                    break
+                in_flight.append(asyncio.create_task(self.client.upsert(
+                    collection_name=collection_name,
+                    points=last_batch,
+                    wait=False
+                )))
+                if len(in_flight) >= self.upsert_parallelism:
+                    await in_flight.pop(0)
+                last_batch = batch
+
+            await asyncio.gather(*in_flight)
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+        if last_batch is not None:
+            await self.client.upsert(
+                collection_name=collection_name,
+                points=last_batch,
+                wait=True
+            )
+
+    async def asearch_collection_by_doc_id(
+        self,
+        doc_id: str,
+        collection_name: str
+    ) -> Optional[pathlib.Path]:
+        """
+            See QdrantDB.search_collection_by_doc_id.
+        """
+        points, _ = await self.client.scroll(
+            collection_name=collection_name,
+            scroll_filter=self.get_doc_id_filter(doc_id=doc_id),
+            limit=1,
+            with_payload=["doc_path"],
+            with_vectors=False
+        )
+        if points:
+            return pathlib.Path(points[0].payload["doc_path"])
+        return None
+
+    async def aget_entry_count(self, collection_name: str) -> int:
+        return (
+            await self.client.count(collection_name=collection_name)
+        ).count
+
+    async def afind_collection_metadata(
+        self,
+        collection_name: str
+    ) -> Optional[dict]:
+        """
+            The payload of the collection's metadata point, or None if the
+            collection doesn't exist or has no metadata point.
+        """
+        try:
+            collection_info: CollectionInfo = await self.aget_collection_info(
+                collection_name=collection_name
+            )
+        except Exception as e:
+            logging.warning(
+                f"Couldn't read metadata of collection {collection_name}: {e}"
+            )
+            return None
+
+        if collection_info.metadata is None:
+            logging.warning(f"Collection {collection_name} has no metadata.")
+            return None
+
+        return collection_info.metadata
+
+    async def aget_collection_info(
+        self,
+        collection_name: str
+    ) -> CollectionInfo:
+        """
+            See QdrantDB.get_collection_info.
+        """
+        collection_info: Optional[CollectionInfo] = (
+            self.collection_info_cache.get(collection_name)
+        )
+        if collection_info is None:
+            if await self.client.collection_exists(
+                collection_name=collection_name
+            ):
+                collection, metadata_points = await asyncio.gather(
+                    self.client.get_collection(
+                        collection_name=collection_name
+                    ),
+                    self.client.retrieve(
+                        collection_name=collection_name,
+                        ids=[self.metadata_id]
+                    )
+                )
+                collection_info = self.make_collection_info(
+                    collection=collection,
+                    metadata_points=metadata_points
+                )
+            else:
+                collection_info = CollectionInfo(exists=False)
+            self.collection_info_cache.put(collection_name, collection_info)
+        return collection_info
+
+    async def aget_collection_metadata(
+        self,
+        collection_name: str
+    ) -> dict:
+        metadata: Optional[dict] = await self.afind_collection_metadata(
+            collection_name=collection_name
+        )
+        if metadata is None:
+            raise ValueError(
+                f"Cannot determine the vectorizer of collection "
+                f"{collection_name}. No metadata entry in database."
+            )
+        return metadata
+
+    async def alist_collection_metadata(self) -> Dict[str, dict]:
+        collection_names: List[str] = [
+            collection.name for collection in
+            (await self.client.get_collections()).collections
+        ]
+        metadata: List[Optional[dict]] = await asyncio.gather(*(
+            self.afind_collection_metadata(collection_name=collection_name)
+            for collection_name in collection_names
+        ))
+        return {
+            collection_name: collection_metadata
+            for collection_name, collection_metadata
+            in zip(collection_names, metadata)
+            if collection_metadata is not None
+        }
+
+    async def aget_metadata_vectorizer(
+        self,
+        metadata: dict
+    ) -> Vectorizer:
+        vectorizer_string, model_string = self.get_metadata_vectorizer_key(
+            metadata=metadata
+        )
+        return await asyncio.to_thread(
+            vectorizer_registry.get_vectorizer,
+            vectorizer_string=vectorizer_string,
+            model_string=model_string
+        )
+
+    async def aget_collection_vectorizer(
+        self,
+        collection_name: str
+    ) -> Vectorizer:
+        metadata: dict = await self.aget_collection_metadata(
+            collection_name=collection_name
+        )
+        return await self.aget_metadata_vectorizer(metadata=metadata)
+
+    async def aquery_collection(
+        self,
+        collection_name: str,
+        query_string: str,
+        score_threshold: Optional[float] = None,
+        top_k: int = 3,
+        mmr_lambda: Optional[float] = None,
+        search_profile: Optional[SearchProfile] = None,
+        retrieval_mode: RetrievalMode = "dense"
+    ) -> List[DbReturnObj]:
+        """
+            See QdrantDB.query_collection for how score_threshold behaves.
+        """
+        metadata: dict = await self.aget_collection_metadata(
+            collection_name=collection_name
+        )
+        query_vector: np.array = await self.aembed_query(
+            vectorizer_key=self.get_metadata_vectorizer_key(metadata),
+            query_string=query_string
+        )
+
+        return await self.asearch_collection(
+            collection_name=collection_name,
+            query_vector=query_vector,
+            metadata=metadata,
+            score_threshold=score_threshold,
+            top_k=top_k,
+            mmr_lambda=mmr_lambda,
+            search_profile=search_profile,
+            lexical_vector=self.get_lexical_query(
+                query_string=query_string,
+                retrieval_mode=retrieval_mode
+            )
+        )
+
+    async def aquery_collections(
+        self,
+        collection_names: List[str],
+        query_string: str,
+        score_threshold: Optional[float] = None,
+        top_k: int = 3,
+        mmr_lambda: Optional[float] = None,
+        merge_strategy: MergeStrategy = "score",
+        deadline_seconds: Optional[float] = None,
+        search_profiles: Optional[Dict[str, SearchProfile]] = None,
+        retrieval_mode: RetrievalMode = "dense"
+    ) -> List[DbReturnObj]:
+        """
+            Same steps as QdrantDB.query_collections: read the metadata,
+            embed the query once per distinct vectorizer, then search,
+            all under one deadline.
+        """
+        search_profiles = search_profiles or {}
+        lexical_vector: Optional[SparseVector] = self.get_lexical_query(
+            query_string=query_string,
+            retrieval_mode=retrieval_mode
+        )
+        deadline: Optional[float] = get_deadline(deadline_seconds)
+        collection_metadata: Dict[str, dict] = await arun_before_deadline(
+            awaitables={
+                collection_name: self.afind_collection_metadata(
+                    collection_name=collection_name
+                )
+                for collection_name in collection_names
+            },
+            deadline=deadline
+        )
+        vectorizer_keys: Dict[str, Tuple[str, str]] = {
+            collection_name: self.get_metadata_vectorizer_key(metadata)
+            for collection_name, metadata in collection_metadata.items()
+            if metadata is not None
+        }
+        query_vectors: Dict[Tuple[str, str], np.array] = (
+            await arun_before_deadline(
+                awaitables={
+                    vectorizer_key: self.aembed_query(
+                        vectorizer_key=vectorizer_key,
+                        query_string=query_string
+                    )
+                    for vectorizer_key in set(vectorizer_keys.values())
+                },
+                deadline=deadline
+            )
+        )
+        hit_lists: Dict[str, List[DbReturnObj]] = await arun_before_deadline(
+            awaitables={
+                collection_name: self.asearch_collection(
+                    collection_name=collection_name,
+                    query_vector=query_vectors[vectorizer_key],
+                    metadata=collection_metadata[collection_name],
+                    score_threshold=score_threshold,
+                    top_k=top_k,
+                    mmr_lambda=mmr_lambda,
+                    search_profile=search_profiles.get(collection_name),
+                    lexical_vector=lexical_vector
+                )
+                for collection_name, vectorizer_key in vectorizer_keys.items()
+                if vectorizer_key in query_vectors
+            },
+            deadline=deadline
+        )
+
+        return merge_hit_lists(
+            hit_lists=hit_lists,
+            top_k=top_k,
+            merge_strategy=merge_strategy
+        )
+
+    async def asearch_collection(
+        self,
+        collection_name: str,
+        query_vector: np.array,
+        metadata: dict,
+        score_threshold: Optional[float] = None,
+        top_k: int = 3,
+        mmr_lambda: Optional[float] = None,
+        search_profile: Optional[SearchProfile] = None,
+        lexical_vector: Optional[SparseVector] = None
+    ) -> List[DbReturnObj]:
+        """
+            Async counterpart of QdrantDB.search_collection.
+        """
+        search_params = self.get_search_params(
+            storage_profile=metadata.get("storage_profile", "float32"),
+            search_profile=resolve_search_profile(
+                metadata=metadata,
+                search_profile=search_profile
+            )
+        )
+        with_vectors: bool = self.get_with_vectors(mmr_lambda=mmr_lambda)
+        limit: int = self.get_search_limit(top_k=top_k, mmr_lambda=mmr_lambda)
+
+        if not self.is_hybrid_search(
+            metadata=metadata,
+            lexical_vector=lexical_vector
+        ):
+            search_results = (await self.client.query_points(
+                collection_name=collection_name,
+                query=query_vector,
+                query_filter=self.get_search_filter(),
+                with_vectors=with_vectors,
+                limit=limit,
+                search_params=search_params,
+                score_threshold=score_threshold  # by cosine similarity
+            )).points
+            return self.get_search_hits(
+                query_vector=query_vector,
+                search_results=search_results,
+                top_k=top_k,
+                mmr_lambda=mmr_lambda
+            )
+
+        dense_response, lexical_response = (
+            await self.client.query_batch_points(
+                collection_name=collection_name,
+                requests=self.get_hybrid_requests(
+                    query_vector=query_vector,
+                    lexical_vector=lexical_vector,
+                    limit=limit,
+                    with_vectors=with_vectors,
+                    search_params=search_params,
+                    score_threshold=score_threshold
+                )
+            )
+        )
+        return self.get_hybrid_hits(
+            query_vector=query_vector,
+            dense_points=dense_response.points,
+            lexical_points=lexical_response.points,
+            limit=limit,
+            top_k=top_k,
+            mmr_lambda=mmr_lambda,
+            score_threshold=score_threshold
+        )
@@ -0,0 +1,128 @@
+from abc import ABC, abstractmethod
+import pathlib
+from typing import Optional, Type, List, Dict
+
+from offle_assistant.vectorizer import Vectorizer, InferenceMode
+from offle_assistant.models import MergeStrategy, RetrievalMode
+from ._vector_db import StorageProfile
+from ._db_return_obj import DbReturnObj
+from ._search_profile import SearchProfile
+from ._fan_out import (
+    get_deadline,
+    arun_before_deadline,
+    merge_hit_lists
+)
+
+
+class AsyncVectorDB(ABC):
+    """
+
+        The async counterpart of VectorDB, for code that runs on an event
+        loop, like the API. Every call that reaches the database is a
+        coroutine, so a slow search or upsert never blocks other requests.
+        The CLI keeps using the blocking VectorDB.
+
+        Errors are raised rather than ending the process.
+
+    """
+
+    @abstractmethod
+    async def aadd_collection(
+        self,
+        collection_name: str,
+        vectorizer_class: Type[Vectorizer],
+        model_string: Optional[str] = None,
+        storage_profile: StorageProfile = "float32",
+        inference_mode: InferenceMode = "fp32"
+    ):
+        pass
+
+    @abstractmethod
+    async def adelete_collection(
+        self,
+        collection_name: str
+    ):
+        pass
+
+    @abstractmethod
+    async def aadd_document(
+        self,
+        doc_path: pathlib.Path,
+        collection_name: str,
+    ):
+        pass
+
+    @abstractmethod
+    async def alist_collection_metadata(self) -> Dict[str, dict]:
+        pass
+
+    @abstractmethod
+    async def aget_collection_vectorizer(
+        self,
+        collection_name: str
+    ) -> Vectorizer:
+        pass
+
+    @abstractmethod
+    async def aquery_collection(
+        self,
+        collection_name: str,
+        query_string: str,
+        score_threshold: Optional[float] = None,
+        top_k: int = 3,
+        mmr_lambda: Optional[float] = None,
+        search_profile: Optional[SearchProfile] = None,
+        retrieval_mode: RetrievalMode = "dense"
+    ) -> List[DbReturnObj]:
+        """
+            Returns up to top_k hits, best first. When mmr_lambda is set the
+            hits are diversified with maximal marginal relevance.
+            search_profile overrides how the collection's index is searched.
+            With retrieval_mode "hybrid", dense and lexical search results
+            are fused where the collection supports it.
+        """
+        pass
+
+    async def aquery_collections(
+        self,
+        collection_names: List[str],
+        query_string: str,
+        score_threshold: Optional[float] = None,
+        top_k: int = 3,
+        mmr_lambda: Optional[float] = None,
+        merge_strategy: MergeStrategy = "score",
+        deadline_seconds: Optional[float] = None,
+        search_profiles: Optional[Dict[str, SearchProfile]] = None,
+        retrieval_mode: RetrievalMode = "dense"
+    ) -> List[DbReturnObj]:
+        """
+            See VectorDB.query_collections.
+        """
+        search_profiles = search_profiles or {}
+        hit_lists: Dict[str, List[DbReturnObj]] = await arun_before_deadline(
+            awaitables={
+                collection_name: self.aquery_collection(
+                    collection_name=collection_name,
+                    query_string=query_string,
+                    score_threshold=score_threshold,
+                    top_k=top_k,
+                    mmr_lambda=mmr_lambda,
+                    search_profile=search_profiles.get(collection_name),
+                    retrieval_mode=retrieval_mode
+                )
+                for collection_name in collection_names
+            },
+            deadline=get_deadline(deadline_seconds)
+        )
+
+        return merge_hit_lists(
+            hit_lists=hit_lists,
+            top_k=top_k,
+            merge_strategy=merge_strategy
+        )
+
+    async def aclose(self):
+        """
+            Releases the connections to the database.
+        """
+        pass
@@ -0,0 +1,107 @@
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from offle_assistant.config import StrictBaseModel
+
+
+class CollectionInfo(StrictBaseModel):
+    """
+        What the query and ingest paths need to know about a collection.
+        metadata is the payload of its metadata point, which names the
+        vectorizer and model. None when the collection doesn't exist or
+        has no metadata point.
+    """
+    exists: bool = False
+    metadata: Optional[dict] = None
+    vector_dim: Optional[int] = None
+    distance: Optional[str] = None
+
+
+class CollectionInfoCache:
+    """
+
+        Every query and ingest used to read the collection's metadata point
+        from Qdrant, and every add_collection listed all collections just
+        to see whether one existed. This keeps a CollectionInfo per
+        collection for ttl_seconds instead, including the fact that a
+        collection doesn't exist.
+
+        The cache only sees changes made through the QdrantDB that owns
+        it, which invalidates a collection's entry as soon as it creates
+        or deletes it. Changes made by other processes show up once the
+        entry expires.
+
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 60.0,
+    ):
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[CollectionInfo, float]] = {}
+
+        self.hit_count: int = 0
+        self.miss_count: int = 0
+        self.invalidation_count: int = 0
+
+    def get(
+        self,
+        collection_name: str,
+    ) -> Optional[CollectionInfo]:
+        with self._lock:
+            entry = self._entries.get(collection_name)
+            if entry is None:
+                self.miss_count += 1
+                return None
+
+            collection_info, created_at = entry
+            if time.monotonic() - created_at > self.ttl_seconds:
+                del self._entries[collection_name]
+                self.miss_count += 1
+                return None
+
+            self.hit_count += 1
+            return collection_info
+
+    def put(
+        self,
+        collection_name: str,
+        collection_info: CollectionInfo,
+    ):
+        with self._lock:
+            self._entries[collection_name] = (
+                collection_info, time.monotonic()
+            )
+
+    def invalidate(
+        self,
+        collection_name: Optional[str] = None,
+    ):
+        """
+            Drops the collection's entry, or every entry when no
+            collection is given.
+        """
+        with self._lock:
+            if collection_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(collection_name, None)
+            self.invalidation_count += 1
+
+    def get_hit_ratio(self) -> float:
+        lookups: int = self.hit_count + self.miss_count
+        return self.hit_count / lookups if lookups else 0.0
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "ttl_seconds": self.ttl_seconds,
+                "hit_count": self.hit_count,
+                "miss_count": self.miss_count,
+                "invalidation_count": self.invalidation_count,
+                "hit_ratio": self.get_hit_ratio(),
+            }
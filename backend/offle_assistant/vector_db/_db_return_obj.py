@@ -0,0 +1,28 @@
+import pathlib
+from typing import List, Optional
+
+from offle_assistant.config import StrictBaseModel
+
+
+class DbReturnObj(StrictBaseModel):
+    file_name: str = ""
+    doc_path: pathlib.Path = pathlib.Path("")
+    document_string: str = ""
+    euclidean_distance: float = 0
+    cosine_similarity: float = 0
+    # The score the vector database ranked this hit by.
+    score: float = 0
+    # Only filled in when the vector db is in debug_vectors mode.
+    vector: Optional[List[float]] = None
+    # Filled in when hits from several collections are merged.
+    collection_name: str = ""
+    fused_score: float = 0
+    # Set on hybrid hits that only the lexical search found.
+    lexical_only: bool = False
+    success: bool = False
+
+    def get_hit_document_string(self):
+        return self.document_string
+
+    def get_hit_success(self):
+        return self.success
@@ -0,0 +1,146 @@
+import asyncio
+from concurrent.futures import Executor, Future, wait
+import logging
+import time
+from typing import (
+    Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+)
+
+from offle_assistant.models import MergeStrategy
+from ._db_return_obj import DbReturnObj
+
+
+"""
+    The k in reciprocal rank fusion, 1 / (k + rank). 60 is the value from
+    the original paper; larger values flatten the difference between the
+    top ranks and the rest.
+"""
+RRF_K: int = 60
+
+
+def get_rrf_score(rank: int) -> float:
+    """
+        A hit's reciprocal rank fusion contribution for its 1-based rank.
+    """
+    return 1 / (RRF_K + rank)
+
+
+def get_deadline(deadline_seconds: Optional[float]) -> Optional[float]:
+    if deadline_seconds is None:
+        return None
+    return time.monotonic() + deadline_seconds
+
+
+def get_remaining(deadline: Optional[float]) -> Optional[float]:
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def run_before_deadline(
+    executor: Executor,
+    calls: Dict[Hashable, Callable],
+    deadline: Optional[float],
+) -> Dict[Hashable, object]:
+    """
+        Runs every call on the executor and returns {key: result} for the
+        calls that finished in time without raising. The rest are logged
+        and left out; calls that haven't started yet are cancelled.
+    """
+    futures: Dict[Hashable, Future] = {
+        key: executor.submit(call) for key, call in calls.items()
+    }
+    wait(futures.values(), timeout=get_remaining(deadline))
+
+    results: Dict[Hashable, object] = {}
+    for key, future in futures.items():
+        if not future.done():
+            future.cancel()
+            logging.warning(f"{key} missed the query deadline; skipping.")
+        elif future.exception() is not None:
+            logging.warning(f"{key} failed: {future.exception()}")
+        else:
+            results[key] = future.result()
+    return results
+
+
+async def arun_before_deadline(
+    awaitables: Dict[Hashable, Awaitable],
+    deadline: Optional[float],
+) -> Dict[Hashable, object]:
+    """
+        Async counterpart of run_before_deadline. Awaitables still pending
+        at the deadline are cancelled.
+    """
+    tasks: Dict[Hashable, asyncio.Task] = {
+        key: asyncio.ensure_future(awaitable)
+        for key, awaitable in awaitables.items()
+    }
+    if not tasks:
+        return {}
+    await asyncio.wait(tasks.values(), timeout=get_remaining(deadline))
+
+    results: Dict[Hashable, object] = {}
+    for key, task in tasks.items():
+        if not task.done():
+            task.cancel()
+            logging.warning(f"{key} missed the query deadline; skipping.")
+        elif task.exception() is not None:
+            logging.warning(f"{key} failed: {task.exception()}")
+        else:
+            results[key] = task.result()
+    return results
+
+
+def merge_hit_lists(
+    hit_lists: Dict[str, List[DbReturnObj]],
+    top_k: int = 3,
+    merge_strategy: MergeStrategy = "score",
+) -> List[DbReturnObj]:
+    """
+        Merges per collection hit lists, each best first, into one ranked
+        list of at most top_k hits. Hits are tagged with the collection
+        they came from and the fused score they were ranked by.
+
+        "score" ranks by each hit's cosine similarity to the query, which
+        is on the same scale whatever the collection's distance metric,
+        so a collection whose best hit is a poor match stays behind
+        stronger hits from the others. "rrf" ranks by reciprocal rank
+        fusion, which ignores the scores and only looks at where each
+        collection ranked the hit. The same paragraph found in several
+        collections is returned once; under "rrf" its contributions add
+        up, under "score" the best one counts.
+    """
+    merged: Dict[Tuple[str, str], DbReturnObj] = {}
+    for collection_name, hits in hit_lists.items():
+        if merge_strategy == "rrf":
+            fused_scores: List[float] = [
+                get_rrf_score(rank) for rank in range(1, len(hits) + 1)
+            ]
+        else:
+            fused_scores = [hit.cosine_similarity for hit in hits]
+
+        for hit, fused_score in zip(hits, fused_scores):
+            key: Tuple[str, str] = (str(hit.doc_path), hit.document_string)
+            existing: Optional[DbReturnObj] = merged.get(key)
+            if existing is None:
+                merged[key] = hit.model_copy(update={
+                    "collection_name": collection_name,
+                    "fused_score": fused_score,
+                })
+            elif merge_strategy == "rrf":
+                existing.fused_score += fused_score
+            elif fused_score > existing.fused_score:
+                merged[key] = hit.model_copy(update={
+                    "collection_name": collection_name,
+                    "fused_score": fused_score,
+                })
+
+    # sorted() is stable, so ties keep the order the collections were
+    # configured in.
+    ranked: List[DbReturnObj] = sorted(
+        merged.values(),
+        key=lambda hit: (hit.fused_score, hit.score),
+        reverse=True
+    )
+    return ranked[:top_k]
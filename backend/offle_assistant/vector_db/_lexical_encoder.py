@@ -0,0 +1,88 @@
+from collections import Counter
+import re
+from typing import Dict, List
+import zlib
+
+from qdrant_client.models import SparseVector
+
+
+"""
+    Name of the sparse vector collections keep their lexical term weights
+    in, next to the unnamed dense vector.
+"""
+LEXICAL_VECTOR_NAME: str = "lexical"
+
+"""
+    Identifiers like ERR_CONN_42 or 0x1f are single terms. Joined ones
+    like pkg.module, std::vector or ssl-timeout are kept whole, and their
+    parts are indexed as well. LaTeX commands lose their backslash.
+"""
+TOKEN_PATTERN: re.Pattern = re.compile(r"\w+(?:[.:/-]+\w+)*")
+TOKEN_PART_PATTERN: re.Pattern = re.compile(r"[.:/-]+")
+
+
+class LexicalEncoder:
+    """
+
+        Turns text into BM25 style sparse vectors. Documents get their
+        terms' saturated term frequencies, queries get a weight of one
+        per distinct term. The inverse document frequency half of BM25
+        depends on the whole collection, so Qdrant applies it at query
+        time (the sparse vector is created with the IDF modifier).
+
+        Terms are hashed into the sparse vector's index space, so there
+        is no vocabulary to store or keep in sync between ingest and
+        query. Collisions only merge the weights of two rare terms.
+
+        k1 and b are the usual BM25 parameters. Document lengths are
+        normalized against avg_doc_length, in tokens, which is fixed
+        rather than measured so a chunk's weights don't depend on what
+        else is in the collection.
+
+    """
+
+    def __init__(
+        self,
+        k1: float = 1.2,
+        b: float = 0.75,
+        avg_doc_length: float = 128.0,
+    ):
+        self.k1 = k1
+        self.b = b
+        self.avg_doc_length = avg_doc_length
+
+    def tokenize(self, text: str) -> List[str]:
+        tokens: List[str] = []
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            tokens.append(token)
+            parts: List[str] = TOKEN_PART_PATTERN.split(token)
+            if len(parts) > 1:
+                tokens.extend(parts)
+        return tokens
+
+    def get_term_index(self, term: str) -> int:
+        # crc32 is stable across processes, unlike hash().
+        return zlib.crc32(term.encode("utf-8"))
+
+    def encode_document(self, text: str) -> SparseVector:
+        tokens: List[str] = self.tokenize(text)
+        length_norm: float = 1 - self.b + self.b * (
+            len(tokens) / self.avg_doc_length
+        )
+        term_counts: Counter = Counter(
+            self.get_term_index(token) for token in tokens
+        )
+        weights: Dict[int, float] = {
+            index: count * (self.k1 + 1) / (count + self.k1 * length_norm)
+            for index, count in term_counts.items()
+        }
+        return SparseVector(
+            indices=list(weights.keys()),
+            values=list(weights.values())
+        )
+
+    def encode_query(self, text: str) -> SparseVector:
+        indices: List[int] = sorted({
+            self.get_term_index(token) for token in self.tokenize(text)
+        })
+        return SparseVector(indices=indices, values=[1.0] * len(indices))
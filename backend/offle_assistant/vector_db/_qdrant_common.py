@@ -0,0 +1,713 @@
+import asyncio
+import hashlib
+import os
+import pathlib
+import uuid
+from typing import Dict, FrozenSet, Generator, List, Optional, Tuple, Union
+
+import numpy as np
+from qdrant_client.models import (
+    Distance,
+    VectorParams,
+    PointStruct,
+    ScoredPoint,
+    SearchParams,
+    QuantizationConfig,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    Filter,
+    FieldCondition,
+    MatchValue,
+    IsEmptyCondition,
+    PayloadField,
+    SparseVector,
+    SparseVectorParams,
+    Modifier,
+    QueryRequest,
+    ExtendedPointId,
+)
+
+from offle_assistant.vectorizer import (
+    Vectorizer,
+    vectorizer_registry,
+    query_embedding_cache,
+    get_ingest_batch_size,
+    join_inference_mode,
+    split_inference_mode
+)
+from offle_assistant.models import RetrievalMode
+from offle_assistant.vector_math import (
+    cosine_similarity,
+    euclidean_distance,
+    cosine_to_euclidean,
+    maximal_marginal_relevance
+)
+from ._vector_db import StorageProfile
+from ._db_return_obj import DbReturnObj
+from ._collection_info_cache import CollectionInfo
+from ._search_profile import SearchProfile
+from ._lexical_encoder import LexicalEncoder, LEXICAL_VECTOR_NAME
+from ._fan_out import get_rrf_score
+
+
+"""
+    Quantized searches fetch this many times the requested number of
+    candidates and rescore them against the full precision vectors.
+    Binary quantization loses more, so it needs a wider net.
+"""
+STORAGE_PROFILE_OVERSAMPLING: Dict[str, float] = {
+    "int8": 2.0,
+    "binary": 3.0,
+}
+
+"""
+    Payload fields that get a keyword index, so that filtering on them
+    (finding a document's points, excluding the metadata point) is a
+    lookup rather than a scan of the collection.
+"""
+PAYLOAD_INDEX_FIELDS: Tuple[str, ...] = (
+    "doc_id",
+    "file_name",
+    "subset_id",
+    "type",
+)
+
+"""
+    Namespace of the UUIDv5 point IDs. Changing it changes every ID.
+"""
+POINT_ID_NAMESPACE: uuid.UUID = uuid.UUID(
+    "5b1f0a3e-7c1d-5f8e-9a4b-2f6d3c8e1a70"
+)
+
+"""
+    MMR picks its top_k hits out of this many times top_k candidates.
+"""
+MMR_CANDIDATE_MULTIPLIER: int = 4
+
+
+class QdrantBase:
+    """
+
+        What QdrantDB and AsyncQdrantDB have in common: how collections,
+        points and searches are laid out, and how search results become
+        DbReturnObjs. Nothing here talks to Qdrant, so both the blocking
+        and the async client can share it.
+
+    """
+
+    metadata_id: int = 0
+    debug_vectors: bool = False
+    upsert_batch_size: int = 256
+    upsert_parallelism: int = 4
+    lexical_encoder: LexicalEncoder = LexicalEncoder()
+
+    def get_vectors_config(
+        self,
+        vector_dim: int,
+        storage_profile: StorageProfile
+    ) -> VectorParams:
+        return VectorParams(
+            size=vector_dim,
+            distance=Distance.COSINE,
+            # Quantized profiles only keep the quantized copy in RAM
+            on_disk=storage_profile != "float32"
+        )
+
+    def get_sparse_vectors_config(self) -> Dict[str, SparseVectorParams]:
+        """
+            The lexical vectors hold term frequencies only. Qdrant weighs
+            the query's terms by their inverse document frequency in the
+            collection, which completes BM25.
+        """
+        return {
+            LEXICAL_VECTOR_NAME: SparseVectorParams(modifier=Modifier.IDF)
+        }
+
+    def get_metadata_point(
+        self,
+        vectorizer: Vectorizer,
+        vector_dim: int,
+        storage_profile: StorageProfile
+    ) -> PointStruct:
+        """
+            The point that records how the collection was built. The
+            inference mode is recorded too, so every later ingest and
+            query against the collection embeds the same way.
+        """
+        model_name, inference_mode = split_inference_mode(
+            vectorizer.get_model_string()
+        )
+        return PointStruct(
+            id=self.metadata_id,
+            vector=[0.0] * vector_dim,  # Dummy vector
+            payload={
+                "type": "metadata",
+                "vectorizer": vectorizer.get_vectorizer_string(),
+                "model": model_name,
+                "inference_mode": inference_mode,
+                "storage_profile": storage_profile,
+                "lexical_vector": LEXICAL_VECTOR_NAME,
+                "notes": "Initial embedding model for this collection"
+            }
+        )
+
+    def get_missing_payload_indexes(
+        self,
+        payload_schema: Dict[str, object]
+    ) -> List[str]:
+        return [
+            field_name for field_name in PAYLOAD_INDEX_FIELDS
+            if field_name not in payload_schema
+        ]
+
+    def make_collection_info(
+        self,
+        collection,
+        metadata_points: List[PointStruct],
+    ) -> CollectionInfo:
+        """
+            Builds a CollectionInfo from get_collection's response and the
+            result of retrieving the metadata point.
+        """
+        vectors = collection.config.params.vectors
+        if isinstance(vectors, dict):  # Named vectors
+            vectors = next(iter(vectors.values()), None)
+
+        metadata: Optional[dict] = None
+        if metadata_points and (
+            metadata_points[0].payload.get("type") == "metadata"
+        ):
+            metadata = metadata_points[0].payload
+
+        return CollectionInfo(
+            exists=True,
+            metadata=metadata,
+            vector_dim=vectors.size if vectors is not None else None,
+            distance=(
+                Distance(vectors.distance).value if vectors is not None
+                else None
+            )
+        )
+
+    def get_search_filter(self) -> Filter:
+        """
+            Keeps the metadata point out of search results.
+        """
+        return Filter(
+            must_not=[
+                FieldCondition(
+                    key="type",
+                    match=MatchValue(value="metadata")
+                )
+            ]
+        )
+
+    def get_doc_id_filter(self, doc_id: str) -> Filter:
+        """
+            Matches a document's last chunk, which is only written once
+            the rest of the document is in, so a half finished ingest
+            doesn't count. Points written before last_chunk existed don't
+            have the field and match too.
+        """
+        return Filter(
+            must=[
+                FieldCondition(
+                    key="doc_id",                 # Payload key
+                    match=MatchValue(value=doc_id)  # The value to match
+                )
+            ],
+            should=[
+                FieldCondition(
+                    key="last_chunk",
+                    match=MatchValue(value=True)
+                ),
+                IsEmptyCondition(is_empty=PayloadField(key="last_chunk")),
+            ]
+        )
+
+    def get_search_limit(
+        self,
+        top_k: int,
+        mmr_lambda: Optional[float] = None
+    ) -> int:
+        if mmr_lambda is not None:
+            return top_k * MMR_CANDIDATE_MULTIPLIER
+        return top_k
+
+    def get_with_vectors(self, mmr_lambda: Optional[float] = None) -> bool:
+        """
+            Vectors are only transferred when MMR needs them or
+            debug_vectors is on. Otherwise a search returns payloads and
+            scores only.
+        """
+        return self.debug_vectors or mmr_lambda is not None
+
+    def get_search_hits(
+        self,
+        query_vector: np.array,
+        search_results: List[ScoredPoint],
+        top_k: int,
+        mmr_lambda: Optional[float] = None,
+        similarities: Optional[Dict[ExtendedPointId, float]] = None,
+        lexical_only_ids: FrozenSet[ExtendedPointId] = frozenset()
+    ) -> List[DbReturnObj]:
+        """
+            With mmr_lambda set, the search fetched
+            MMR_CANDIDATE_MULTIPLIER * top_k candidates, and top_k of them
+            are picked by maximal marginal relevance, so that
+            near-duplicate paragraphs don't crowd out the rest of the
+            context.
+
+            similarities and lexical_only_ids are only given for fused
+            hybrid results, whose scores aren't cosine similarities. See
+            get_hybrid_hits.
+        """
+        if mmr_lambda is not None:
+            selected: List[int] = maximal_marginal_relevance(
+                query_vector=query_vector,
+                candidate_vectors=[
+                    self.get_dense_vector(hit) for hit in search_results
+                ],
+                top_k=top_k,
+                lambda_mult=mmr_lambda
+            )
+            search_results = [search_results[i] for i in selected]
+
+        return [
+            self.get_hit_return_obj(
+                query_vector=query_vector,
+                hit=hit,
+                similarity=(
+                    similarities[hit.id]
+                    if similarities is not None else None
+                ),
+                lexical_only=hit.id in lexical_only_ids
+            )
+            for hit in search_results
+        ]
+
+    def get_dense_vector(
+        self,
+        hit: ScoredPoint
+    ) -> Optional[List[float]]:
+        """
+            Points of collections with lexical vectors come back with
+            {"": dense, LEXICAL_VECTOR_NAME: sparse}.
+        """
+        if isinstance(hit.vector, dict):
+            return hit.vector.get("")
+        return hit.vector
+
+    def get_lexical_query(
+        self,
+        query_string: str,
+        retrieval_mode: RetrievalMode = "dense"
+    ) -> Optional[SparseVector]:
+        """
+            The query's lexical vector, or None when the search should
+            be dense only.
+        """
+        if retrieval_mode != "hybrid":
+            return None
+        lexical_vector: SparseVector = self.lexical_encoder.encode_query(
+            query_string
+        )
+        return lexical_vector if lexical_vector.indices else None
+
+    def is_hybrid_search(
+        self,
+        metadata: dict,
+        lexical_vector: Optional[SparseVector]
+    ) -> bool:
+        """
+            Collections built before lexical vectors existed have none to
+            search, so they are searched dense only.
+        """
+        return lexical_vector is not None and bool(
+            metadata.get("lexical_vector")
+        )
+
+    def get_hybrid_requests(
+        self,
+        query_vector: np.array,
+        lexical_vector: SparseVector,
+        limit: int,
+        with_vectors: bool,
+        search_params: SearchParams,
+        score_threshold: Optional[float] = None
+    ) -> List[QueryRequest]:
+        """
+            The dense and the lexical search, to be sent as one batch.
+            Lexical scores are on a different scale, so score_threshold
+            only goes to the dense search, and the lexical search brings
+            its hits' dense vectors along for get_hybrid_hits to compare.
+        """
+        return [
+            QueryRequest(
+                query=np.asarray(query_vector).tolist(),
+                filter=self.get_search_filter(),
+                params=search_params,
+                limit=limit,
+                with_vector=with_vectors,
+                with_payload=True,
+                score_threshold=score_threshold
+            ),
+            QueryRequest(
+                query=lexical_vector,
+                using=LEXICAL_VECTOR_NAME,
+                filter=self.get_search_filter(),
+                limit=limit,
+                with_vector=True if with_vectors else [""],
+                with_payload=True
+            ),
+        ]
+
+    def fuse_search_results(
+        self,
+        result_lists: List[List[ScoredPoint]],
+        limit: int
+    ) -> List[ScoredPoint]:
+        """
+            Fuses the hybrid searches' rankings with reciprocal rank
+            fusion. The fused points are scored by their summed RRF
+            contributions, best first.
+        """
+        fused_scores: Dict[ExtendedPointId, float] = {}
+        points: Dict[ExtendedPointId, ScoredPoint] = {}
+        for search_results in result_lists:
+            for rank, point in enumerate(search_results, start=1):
+                fused_scores[point.id] = (
+                    fused_scores.get(point.id, 0.0) + get_rrf_score(rank)
+                )
+                points.setdefault(point.id, point)
+
+        # sorted() is stable, so ties keep the dense search's order.
+        ranked: List[ExtendedPointId] = sorted(
+            points, key=lambda point_id: fused_scores[point_id], reverse=True
+        )
+        return [
+            points[point_id].model_copy(
+                update={"score": fused_scores[point_id]}
+            )
+            for point_id in ranked[:limit]
+        ]
+
+    def get_hybrid_hits(
+        self,
+        query_vector: np.array,
+        dense_points: List[ScoredPoint],
+        lexical_points: List[ScoredPoint],
+        limit: int,
+        top_k: int,
+        mmr_lambda: Optional[float] = None,
+        score_threshold: Optional[float] = None
+    ) -> List[DbReturnObj]:
+        """
+            Fuses the results of get_hybrid_requests into hits. Every hit
+            carries its real cosine similarity: the dense search's score,
+            or for hits only the lexical search found, one computed from
+            their dense vector. Those are marked lexical_only.
+
+            score_threshold is applied to the fused ranking by that cosine
+            similarity, so it filters hybrid hits exactly as it does dense
+            ones, whichever search found them.
+        """
+        similarities: Dict[ExtendedPointId, float] = {
+            point.id: point.score for point in dense_points
+        }
+        lexical_only_ids: FrozenSet[ExtendedPointId] = frozenset(
+            point.id for point in lexical_points
+            if point.id not in similarities
+        )
+        for point in lexical_points:
+            if point.id in lexical_only_ids:
+                similarities[point.id] = float(cosine_similarity(
+                    query_vector, np.asarray(self.get_dense_vector(point))
+                ))
+
+        search_results: List[ScoredPoint] = [
+            point for point in self.fuse_search_results(
+                result_lists=[dense_points, lexical_points],
+                limit=len(similarities)
+            )
+            if score_threshold is None
+            or similarities[point.id] >= score_threshold
+        ]
+        return self.get_search_hits(
+            query_vector=query_vector,
+            search_results=search_results[:limit],
+            top_k=top_k,
+            mmr_lambda=mmr_lambda,
+            similarities=similarities,
+            lexical_only_ids=lexical_only_ids
+        )
+
+    def embed_query(
+        self,
+        vectorizer_key: Tuple[str, str],
+        query_string: str
+    ) -> np.array:
+        vectorizer_string, model_string = vectorizer_key
+        vectorizer: Vectorizer = vectorizer_registry.get_vectorizer(
+            vectorizer_string=vectorizer_string,
+            model_string=model_string
+        )
+        return query_embedding_cache.get_or_embed(
+            vectorizer=vectorizer,
+            query_string=query_string
+        )
+
+    async def aembed_query(
+        self,
+        vectorizer_key: Tuple[str, str],
+        query_string: str
+    ) -> np.array:
+        vectorizer_string, model_string = vectorizer_key
+        vectorizer: Vectorizer = await asyncio.to_thread(
+            vectorizer_registry.get_vectorizer,
+            vectorizer_string=vectorizer_string,
+            model_string=model_string
+        )
+        return await query_embedding_cache.aget_or_embed(
+            vectorizer=vectorizer,
+            query_string=query_string
+        )
+
+    def get_hit_return_obj(
+        self,
+        query_vector: np.array,
+        hit: PointStruct,
+        similarity: Optional[float] = None,
+        lexical_only: bool = False,
+    ) -> DbReturnObj:
+        """
+            Collections are created with cosine distance, so Qdrant's score
+            already is the cosine similarity, and the euclidean distance
+            follows from it as the distance between the normalized
+            vectors. Only with debug_vectors on are both recomputed from
+            the stored vector, which is then returned too.
+
+            Fused hybrid hits are scored by RRF, so their cosine
+            similarity is given separately.
+        """
+        file_name: pathlib.Path = hit.payload["file_name"]
+        doc_path: pathlib.Path = hit.payload["doc_path"]
+        hit_text: str = hit.payload["embedded_text"]
+
+        hit_vector: Optional[List[float]] = None
+        dense_vector: Optional[List[float]] = self.get_dense_vector(hit)
+        if self.debug_vectors and dense_vector is not None:
+            hit_vector = list(dense_vector)
+            euclidean_dist = euclidean_distance(
+                query_vector, np.array(hit_vector)
+            )
+            cosine_sim = cosine_similarity(query_vector, np.array(hit_vector))
+        else:
+            cosine_sim = hit.score if similarity is None else similarity
+            euclidean_dist = cosine_to_euclidean(cosine_sim)
+
+        db_return_obj: DbReturnObj = DbReturnObj(
+            file_name=file_name,
+            doc_path=doc_path,
+            document_string=hit_text,
+            euclidean_distance=euclidean_dist,
+            cosine_similarity=cosine_sim,
+            score=hit.score,
+            vector=hit_vector,
+            lexical_only=lexical_only,
+            success=True
+        )
+
+        return db_return_obj
+
+    def get_point_id(self, doc_id: str, chunk_id: int) -> str:
+        """
+            Point IDs are derived from the document's hash and the chunk's
+            index, so ingesting a document twice, or retrying a failed
+            ingest, overwrites the same points instead of adding new ones,
+            and concurrent ingests can't collide.
+        """
+        return str(uuid.uuid5(POINT_ID_NAMESPACE, f"{doc_id}:{chunk_id}"))
+
+    def iter_document_points(
+        self,
+        doc_id: str,
+        doc_path: pathlib.Path,
+        vectorizer,
+        subset_id: str = "all",
+        lexical: bool = False,
+    ) -> Generator[List[PointStruct], None, None]:
+        """
+            Yields the document's points one embedding batch at a time.
+            With lexical set, every point also gets its paragraph's
+            lexical vector.
+        """
+        chunk_id: int = 0
+        for paragraphs, embeddings in vectorizer.chunk_and_embed_batches(
+            doc_path=doc_path,
+            batch_size=get_ingest_batch_size()
+        ):
+            points: List[PointStruct] = []
+            for embedding, paragraph in zip(embeddings, paragraphs):
+                vector: Union[List[float], dict] = (
+                    np.asarray(embedding).tolist()
+                )
+                if lexical:
+                    vector = {
+                        "": vector,
+                        LEXICAL_VECTOR_NAME: (
+                            self.lexical_encoder.encode_document(paragraph)
+                        ),
+                    }
+                new_point: PointStruct = PointStruct(
+                    id=self.get_point_id(doc_id=doc_id, chunk_id=chunk_id),
+                    vector=vector,
+                    payload={
+                        "doc_id": doc_id,
+                        "chunk_id": chunk_id,
+                        "file_name": doc_path.name,
+                        "doc_path": str(doc_path),
+                        "embedded_text": paragraph,
+                        "subset_id": subset_id,
+                        "last_chunk": False,
+                    }
+                )
+                points.append(new_point)
+                chunk_id += 1
+
+            yield points
+
+    def iter_upsert_batches(
+        self,
+        doc_id: str,
+        doc_path: pathlib.Path,
+        vectorizer,
+        subset_id: str = "all",
+        lexical: bool = False,
+    ) -> Generator[List[PointStruct], None, None]:
+        """
+            Regroups the document's points into batches of
+            upsert_batch_size. The document's final point is flagged as
+            its last_chunk. It is always in the final batch, which is
+            written last, so a document only counts as ingested once all
+            of it is there.
+        """
+        pending: List[PointStruct] = []
+        for points in self.iter_document_points(
+            doc_id=doc_id,
+            doc_path=doc_path,
+            vectorizer=vectorizer,
+            subset_id=subset_id,
+            lexical=lexical
+        ):
+            pending.extend(points)
+            # Always hold something back, so the final point is known.
+            while len(pending) > self.upsert_batch_size:
+                yield pending[:self.upsert_batch_size]
+                pending = pending[self.upsert_batch_size:]
+
+        if pending:
+            pending[-1].payload["last_chunk"] = True
+            yield pending
+
+    def get_metadata_vectorizer_key(
+        self,
+        metadata: dict
+    ) -> Tuple[str, str]:
+        """
+            The (vectorizer, model) pair the registry knows the
+            collection's vectorizer by. Collections with equal keys embed
+            queries identically.
+        """
+        return (
+            metadata["vectorizer"],
+            join_inference_mode(
+                model_string=metadata["model"],
+                inference_mode=metadata.get("inference_mode", "fp32")
+            )
+        )
+
+    def get_quantization_config(
+        self,
+        storage_profile: StorageProfile
+    ) -> Optional[QuantizationConfig]:
+        if storage_profile == "int8":
+            return ScalarQuantization(
+                scalar=ScalarQuantizationConfig(
+                    type=ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=True
+                )
+            )
+        elif storage_profile == "binary":
+            return BinaryQuantization(
+                binary=BinaryQuantizationConfig(always_ram=True)
+            )
+        return None
+
+    def get_search_params(
+        self,
+        storage_profile: StorageProfile,
+        search_profile: SearchProfile
+    ) -> SearchParams:
+        """
+            Quantized collections search the quantized vectors, then
+            oversample and rescore against the full precision originals.
+        """
+        quantization: Optional[QuantizationSearchParams] = None
+        if storage_profile in STORAGE_PROFILE_OVERSAMPLING:
+            quantization = QuantizationSearchParams(
+                rescore=True,
+                oversampling=(
+                    search_profile.oversampling
+                    or STORAGE_PROFILE_OVERSAMPLING[storage_profile]
+                )
+            )
+        return SearchParams(
+            hnsw_ef=search_profile.hnsw_ef,
+            exact=search_profile.exact,
+            quantization=quantization
+        )
+
+    def compute_doc_hash(self, doc_path: pathlib.Path) -> str:
+        """
+            This is complicated, I know. But basically, we have a situation
+            where when we have a single file, we want to create a hash from
+            the contents of that single file. But when we have a directory
+            with multiple files/directories in it, we want to create a
+            unique hash somehow. I've opted to just take the files in the
+            provided path, sort them, and read them into memory in 64KB
+            chunks one after another and generate a hash of each chunk.
+        """
+
+        # Populated depending on whether doc_path is a dir or a file
+        file_list = []
+        if os.path.isdir(doc_path):
+            # Get all file names in the directory, ignoring subdirectories
+            child_files = [
+                f for f in os.listdir(doc_path)
+                if os.path.isfile(os.path.join(doc_path, f))
+            ]
+
+            # Sort files alphabetically
+            child_files.sort()
+            file_list += child_files
+        else:
+            file_list += [doc_path]
+
+        chunk_size: int = 65536  # 64KB chunks
+        sha = hashlib.sha256()
+        for file_name in file_list:
+            file_path = os.path.join(doc_path, file_name)
+            with open(file_path, "rb") as f:
+                while True:
+                    data = f.read(chunk_size)
+                    if not data:
+                        break
+                    sha.update(data)
+
+        return sha.hexdigest()
@@ -1,41 +1,47 @@
-import hashlib
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+import logging
 import pathlib
-import os
-from typing import Optional, Type, List
+from typing import Optional, Type, List, Dict, Iterator, Tuple
 import sys
 
 import numpy as np
 from qdrant_client import QdrantClient
 from qdrant_client.models import (
-    Distance,
-    VectorParams,
     PointStruct,
-    SearchParams
-)
-from qdrant_client.models import (
-    Filter,
-    FieldCondition,
-    MatchValue,
+    PayloadSchemaType,
+    SparseVector,
 )
 
 from offle_assistant.vectorizer import (
     Vectorizer,
     SentenceTransformerVectorizer,
-    vectorizer_lookup_table
-)
-from ._vector_db import (
-    VectorDB, DbReturnObj
+    vectorizer_registry,
+    query_embedding_cache,
+    get_vectorizer_string,
+    get_default_model_string,
+    InferenceMode,
+    join_inference_mode
 )
-from offle_assistant.vector_math import (
-    cosine_similarity,
-    euclidean_distance
+from ._vector_db import VectorDB, StorageProfile
+from ._db_return_obj import DbReturnObj
+from ._qdrant_common import QdrantBase
+from ._collection_info_cache import CollectionInfo, CollectionInfoCache
+from ._search_profile import SearchProfile, resolve_search_profile
+from ._fan_out import (
+    get_deadline,
+    run_before_deadline,
+    arun_before_deadline,
+    merge_hit_lists
 )
 from offle_assistant.config import (
     VectorDbServerConfig
 )
+from offle_assistant.models import MergeStrategy, RetrievalMode
 
 
-class QdrantDB(VectorDB):
+class QdrantDB(QdrantBase, VectorDB):
     def __init__(
         self,
         vector_db_server_config: VectorDbServerConfig,
@@ -45,20 +51,48 @@ class QdrantDB(VectorDB):
 
         self.client: QdrantClient = QdrantClient(host=host, port=port)
         self.metadata_id = 0
+        self.debug_vectors: bool = vector_db_server_config.debug_vectors
+        self.upsert_batch_size: int = (
+            vector_db_server_config.upsert_batch_size
+        )
+        self.upsert_parallelism: int = (
+            vector_db_server_config.upsert_parallelism
+        )
+        self.collection_info_cache: CollectionInfoCache = (
+            CollectionInfoCache(
+                ttl_seconds=vector_db_server_config.collection_info_ttl_seconds
+            )
+        )
 
     def add_collection(
         self,
         collection_name: str,
         vectorizer_class: Type[Vectorizer] = SentenceTransformerVectorizer,
-        model_string: Optional[str] = None
+        model_string: Optional[str] = None,
+        storage_profile: StorageProfile = "float32",
+        inference_mode: InferenceMode = "fp32"
     ):
-        existing_collections = self.client.get_collections().collections
-        if collection_name not in [
-            col.name for col in existing_collections
-        ]:
-            vectorizer: Vectorizer = (
-                vectorizer_class() if model_string is None else
-                vectorizer_class(model_string=model_string)
+        """
+            The inference mode is recorded in the metadata point, so every
+            later ingest and query against the collection embeds the same
+            way.
+        """
+        # Asked directly rather than through collection_info_cache, since
+        # another process may have created the collection since a cached
+        # "doesn't exist".
+        if not self.client.collection_exists(
+            collection_name=collection_name
+        ):
+            vectorizer: Vectorizer = vectorizer_registry.get_vectorizer(
+                vectorizer_string=get_vectorizer_string(vectorizer_class),
+                model_string=join_inference_mode(
+                    model_string=(
+                        model_string or
+                        get_default_model_string(vectorizer_class)
+                    ),
+                    inference_mode=inference_mode,
+                    vectorizer_class=vectorizer_class
+                )
             )
             print(
                 f"Collection '{collection_name}' "
@@ -73,37 +107,67 @@ class QdrantDB(VectorDB):
             # Diff embeddings have diff dims.
             vector_dim: int = vectorized_sentence.shape[0]
 
-            self.client.recreate_collection(
+            self.client.create_collection(
                 collection_name=collection_name,
-                vectors_config=VectorParams(
-                    size=vector_dim, distance=Distance.COSINE
+                vectors_config=self.get_vectors_config(
+                    vector_dim=vector_dim,
+                    storage_profile=storage_profile
+                ),
+                sparse_vectors_config=self.get_sparse_vectors_config(),
+                quantization_config=self.get_quantization_config(
+                    storage_profile=storage_profile
                 ),
-            )
-
-            model_metadata = PointStruct(
-                id=self.metadata_id,
-                vector=[0.0] * vector_dim,  # Dummy vector
-                payload={
-                    "type": "metadata",
-                    "vectorizer": vectorizer.get_vectorizer_string(),
-                    "model": vectorizer.get_model_string(),
-                    "notes": "Initial embedding model for this collection"
-                }
             )
 
             self.client.upsert(
                 collection_name=collection_name,
-                points=[model_metadata],
+                points=[
+                    self.get_metadata_point(
+                        vectorizer=vectorizer,
+                        vector_dim=vector_dim,
+                        storage_profile=storage_profile
+                    )
+                ],
             )
+            self.create_payload_indexes(collection_name=collection_name)
+            self.collection_info_cache.invalidate(collection_name)
         else:
             print("Collection exists.")
 
+    def create_payload_indexes(
+        self,
+        collection_name: str
+    ) -> List[str]:
+        """
+            Creates whichever of the PAYLOAD_INDEX_FIELDS keyword indexes
+            the collection doesn't have yet, and returns their names.
+            Collections created before the indexes existed can be brought
+            up to date with 'offle-assistant maintenance --create_indexes'.
+        """
+        missing_fields: List[str] = self.get_missing_payload_indexes(
+            payload_schema=self.client.get_collection(
+                collection_name=collection_name
+            ).payload_schema
+        )
+        for field_name in missing_fields:
+            self.client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field_name,
+                field_schema=PayloadSchemaType.KEYWORD,
+                wait=True
+            )
+        return missing_fields
+
     def query_collection(
         self,
         query_string: str,
         collection_name: str,
-        score_threshold: Optional[float] = None
-    ) -> Optional[DbReturnObj]:
+        score_threshold: Optional[float] = None,
+        top_k: int = 3,
+        mmr_lambda: Optional[float] = None,
+        search_profile: Optional[SearchProfile] = None,
+        retrieval_mode: RetrievalMode = "dense"
+    ) -> List[DbReturnObj]:
         """
 
             The score_threshold is directly affected by which metric for
@@ -123,43 +187,308 @@ class QdrantDB(VectorDB):
 
         """
 
-        vectorizer: Vectorizer = self.get_collection_vectorizer(
+        metadata: dict = self.get_collection_metadata(
             collection_name=collection_name
         )
-        query_vector = vectorizer.embed_sentence(query_string)
+        vectorizer: Vectorizer = self.get_metadata_vectorizer(
+            metadata=metadata
+        )
+        query_vector = query_embedding_cache.get_or_embed(
+            vectorizer=vectorizer,
+            query_string=query_string
+        )
 
-        search_params = SearchParams(hnsw_ef=512)
-        search_results = self.client.search(
+        return self.search_collection(
             collection_name=collection_name,
             query_vector=query_vector,
-            with_vectors=True,
-            limit=1,
-            search_params=search_params,
-            score_threshold=score_threshold  # by cosine similarity
+            metadata=metadata,
+            score_threshold=score_threshold,
+            top_k=top_k,
+            mmr_lambda=mmr_lambda,
+            search_profile=search_profile,
+            lexical_vector=self.get_lexical_query(
+                query_string=query_string,
+                retrieval_mode=retrieval_mode
+            )
+        )
+
+    async def aquery_collection(
+        self,
+        query_string: str,
+        collection_name: str,
+        score_threshold: Optional[float] = None,
+        top_k: int = 3,
+        mmr_lambda: Optional[float] = None,
+        search_profile: Optional[SearchProfile] = None,
+        retrieval_mode: RetrievalMode = "dense"
+    ) -> List[DbReturnObj]:
+        """
+            Async counterpart of query_collection. The query is embedded
+            through the vectorizer's async API, and the blocking Qdrant
+            calls run in a worker thread so the event loop stays free.
+        """
+        metadata: dict = await asyncio.to_thread(
+            self.get_collection_metadata,
+            collection_name=collection_name
+        )
+        vectorizer: Vectorizer = await asyncio.to_thread(
+            self.get_metadata_vectorizer,
+            metadata=metadata
+        )
+        query_vector = await query_embedding_cache.aget_or_embed(
+            vectorizer=vectorizer,
+            query_string=query_string
+        )
+
+        return await asyncio.to_thread(
+            self.search_collection,
+            collection_name=collection_name,
+            query_vector=query_vector,
+            metadata=metadata,
+            score_threshold=score_threshold,
+            top_k=top_k,
+            mmr_lambda=mmr_lambda,
+            search_profile=search_profile,
+            lexical_vector=self.get_lexical_query(
+                query_string=query_string,
+                retrieval_mode=retrieval_mode
+            )
+        )
+
+    def query_collections(
+        self,
+        collection_names: List[str],
+        query_string: str,
+        score_threshold: Optional[float] = None,
+        top_k: int = 3,
+        mmr_lambda: Optional[float] = None,
+        merge_strategy: MergeStrategy = "score",
+        deadline_seconds: Optional[float] = None,
+        search_profiles: Optional[Dict[str, SearchProfile]] = None,
+        retrieval_mode: RetrievalMode = "dense"
+    ) -> List[DbReturnObj]:
+        """
+            Fans the query out in three concurrent steps: read every
+            collection's metadata, embed the query once per distinct
+            vectorizer, then search every collection. The steps share one
+            deadline. A collection that fails at any step, or misses the
+            deadline, is left out of the merge.
+        """
+        search_profiles = search_profiles or {}
+        lexical_vector: Optional[SparseVector] = self.get_lexical_query(
+            query_string=query_string,
+            retrieval_mode=retrieval_mode
+        )
+        deadline: Optional[float] = get_deadline(deadline_seconds)
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, len(collection_names))
         )
+        try:
+            collection_metadata: Dict[str, dict] = run_before_deadline(
+                executor=executor,
+                calls={
+                    collection_name: partial(
+                        self.find_collection_metadata,
+                        collection_name=collection_name
+                    )
+                    for collection_name in collection_names
+                },
+                deadline=deadline
+            )
+            vectorizer_keys: Dict[str, Tuple[str, str]] = {
+                collection_name: self.get_metadata_vectorizer_key(metadata)
+                for collection_name, metadata in collection_metadata.items()
+                if metadata is not None
+            }
+            query_vectors: Dict[Tuple[str, str], np.array] = (
+                run_before_deadline(
+                    executor=executor,
+                    calls={
+                        vectorizer_key: partial(
+                            self.embed_query,
+                            vectorizer_key=vectorizer_key,
+                            query_string=query_string
+                        )
+                        for vectorizer_key in set(vectorizer_keys.values())
+                    },
+                    deadline=deadline
+                )
+            )
+            hit_lists: Dict[str, List[DbReturnObj]] = run_before_deadline(
+                executor=executor,
+                calls={
+                    collection_name: partial(
+                        self.search_collection,
+                        collection_name=collection_name,
+                        query_vector=query_vectors[vectorizer_key],
+                        metadata=collection_metadata[collection_name],
+                        score_threshold=score_threshold,
+                        top_k=top_k,
+                        mmr_lambda=mmr_lambda,
+                        search_profile=search_profiles.get(collection_name),
+                        lexical_vector=lexical_vector
+                    )
+                    for collection_name, vectorizer_key
+                    in vectorizer_keys.items()
+                    if vectorizer_key in query_vectors
+                },
+                deadline=deadline
+            )
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
-        if len(search_results) <= 0:
-            return DbReturnObj()
-
-        hit: PointStruct = search_results[0]
-
-        file_name: pathlib.Path = hit.payload["file_name"]
-        doc_path: pathlib.Path = hit.payload["doc_path"]
-        hit_text: str = hit.payload["embedded_text"]
-        hit_vector: np.array = np.array(hit.vector)
-        euclidean_dist = euclidean_distance(query_vector, hit_vector)
-        cosine_sim = cosine_similarity(query_vector, hit_vector)
-
-        db_return_obj: DbReturnObj = DbReturnObj(
-            file_name=file_name,
-            doc_path=doc_path,
-            document_string=hit_text,
-            euclidean_distance=euclidean_dist,
-            cosine_similarity=cosine_sim,
-            success=True
+        return merge_hit_lists(
+            hit_lists=hit_lists,
+            top_k=top_k,
+            merge_strategy=merge_strategy
         )
 
-        return db_return_obj
+    async def aquery_collections(
+        self,
+        collection_names: List[str],
+        query_string: str,
+        score_threshold: Optional[float] = None,
+        top_k: int = 3,
+        mmr_lambda: Optional[float] = None,
+        merge_strategy: MergeStrategy = "score",
+        deadline_seconds: Optional[float] = None,
+        search_profiles: Optional[Dict[str, SearchProfile]] = None,
+        retrieval_mode: RetrievalMode = "dense"
+    ) -> List[DbReturnObj]:
+        """
+            Async counterpart of query_collections. Queries are embedded
+            through the vectorizers' async API.
+        """
+        search_profiles = search_profiles or {}
+        lexical_vector: Optional[SparseVector] = self.get_lexical_query(
+            query_string=query_string,
+            retrieval_mode=retrieval_mode
+        )
+        deadline: Optional[float] = get_deadline(deadline_seconds)
+        collection_metadata: Dict[str, dict] = await arun_before_deadline(
+            awaitables={
+                collection_name: asyncio.to_thread(
+                    self.find_collection_metadata,
+                    collection_name=collection_name
+                )
+                for collection_name in collection_names
+            },
+            deadline=deadline
+        )
+        vectorizer_keys: Dict[str, Tuple[str, str]] = {
+            collection_name: self.get_metadata_vectorizer_key(metadata)
+            for collection_name, metadata in collection_metadata.items()
+            if metadata is not None
+        }
+        query_vectors: Dict[Tuple[str, str], np.array] = (
+            await arun_before_deadline(
+                awaitables={
+                    vectorizer_key: self.aembed_query(
+                        vectorizer_key=vectorizer_key,
+                        query_string=query_string
+                    )
+                    for vectorizer_key in set(vectorizer_keys.values())
+                },
+                deadline=deadline
+            )
+        )
+        hit_lists: Dict[str, List[DbReturnObj]] = await arun_before_deadline(
+            awaitables={
+                collection_name: asyncio.to_thread(
+                    self.search_collection,
+                    collection_name=collection_name,
+                    query_vector=query_vectors[vectorizer_key],
+                    metadata=collection_metadata[collection_name],
+                    score_threshold=score_threshold,
+                    top_k=top_k,
+                    mmr_lambda=mmr_lambda,
+                    search_profile=search_profiles.get(collection_name),
+                    lexical_vector=lexical_vector
+                )
+                for collection_name, vectorizer_key in vectorizer_keys.items()
+                if vectorizer_key in query_vectors
+            },
+            deadline=deadline
+        )
+
+        return merge_hit_lists(
+            hit_lists=hit_lists,
+            top_k=top_k,
+            merge_strategy=merge_strategy
+        )
+
+    def search_collection(
+        self,
+        collection_name: str,
+        query_vector: np.array,
+        metadata: dict,
+        score_threshold: Optional[float] = None,
+        top_k: int = 3,
+        mmr_lambda: Optional[float] = None,
+        search_profile: Optional[SearchProfile] = None,
+        lexical_vector: Optional[SparseVector] = None
+    ) -> List[DbReturnObj]:
+        """
+            Runs the search for an already embedded query. metadata is the
+            collection's metadata payload. Hits come back best first.
+            See QdrantBase.get_search_hits for how mmr_lambda is applied,
+            and resolve_search_profile for how search_profile combines
+            with the one saved on the collection.
+
+            With a lexical_vector, collections that have lexical vectors
+            are searched both ways in one batch request, and the two
+            rankings are fused.
+        """
+        search_params = self.get_search_params(
+            storage_profile=metadata.get("storage_profile", "float32"),
+            search_profile=resolve_search_profile(
+                metadata=metadata,
+                search_profile=search_profile
+            )
+        )
+        with_vectors: bool = self.get_with_vectors(mmr_lambda=mmr_lambda)
+        limit: int = self.get_search_limit(top_k=top_k, mmr_lambda=mmr_lambda)
+
+        if not self.is_hybrid_search(
+            metadata=metadata,
+            lexical_vector=lexical_vector
+        ):
+            search_results = self.client.query_points(
+                collection_name=collection_name,
+                query=query_vector,
+                query_filter=self.get_search_filter(),
+                with_vectors=with_vectors,
+                limit=limit,
+                search_params=search_params,
+                score_threshold=score_threshold  # by cosine similarity
+            ).points
+            return self.get_search_hits(
+                query_vector=query_vector,
+                search_results=search_results,
+                top_k=top_k,
+                mmr_lambda=mmr_lambda
+            )
+
+        dense_response, lexical_response = self.client.query_batch_points(
+            collection_name=collection_name,
+            requests=self.get_hybrid_requests(
+                query_vector=query_vector,
+                lexical_vector=lexical_vector,
+                limit=limit,
+                with_vectors=with_vectors,
+                search_params=search_params,
+                score_threshold=score_threshold
+            )
+        )
+        return self.get_hybrid_hits(
+            query_vector=query_vector,
+            dense_points=dense_response.points,
+            lexical_points=lexical_response.points,
+            limit=limit,
+            top_k=top_k,
+            mmr_lambda=mmr_lambda,
+            score_threshold=score_threshold
+        )
 
     def delete_collection(
         self,
@@ -168,7 +497,29 @@ class QdrantDB(VectorDB):
         """
         This removes a collection entirely.
         """
-        return self.client.delete_collection(collection_name=collection_name)
+        try:
+            return self.client.delete_collection(
+                collection_name=collection_name
+            )
+        finally:
+            self.collection_info_cache.invalidate(collection_name)
+
+    def save_search_profile(
+        self,
+        collection_name: str,
+        search_profile: SearchProfile
+    ):
+        """
+            Stores search_profile on the collection's metadata point, where
+            every later search picks it up as the collection's default.
+        """
+        self.client.set_payload(
+            collection_name=collection_name,
+            payload={"search_profile": search_profile.model_dump()},
+            points=[self.metadata_id],
+            wait=True
+        )
+        self.collection_info_cache.invalidate(collection_name)
 
     def add_document(
         self,
@@ -193,57 +544,60 @@ class QdrantDB(VectorDB):
                 f"\tSource file located at: {existing_doc_path}\n"
             )
         else:  # if not, add it
-            vectorizer: Vectorizer = self.get_collection_vectorizer(
+            metadata: dict = self.get_collection_metadata(
                 collection_name=collection_name
             )
-
-            next_id: int = self.get_entry_count(
-                collection_name=collection_name
-            )  # figure out next idx in collection
-
-            points: list[PointStruct] = self.get_document_points(
-                doc_id=doc_hash,
-                doc_path=doc_path,
-                next_id=next_id,
-                subset_id="all",
-                vectorizer=vectorizer
-            )
-
-            self.client.upsert(
+            self.upsert_batches(
                 collection_name=collection_name,
-                points=points,
+                batches=self.iter_upsert_batches(
+                    doc_id=doc_hash,
+                    doc_path=doc_path,
+                    subset_id="all",
+                    vectorizer=self.get_metadata_vectorizer(
+                        metadata=metadata
+                    ),
+                    lexical=bool(metadata.get("lexical_vector"))
+                )
             )
 
-    def get_document_points(
+    def upsert_batches(
         self,
-        doc_id: str,
-        doc_path: pathlib.Path,
-        next_id: int,
-        vectorizer,
-        subset_id: str = "all",
-    ) -> list[PointStruct]:
-        paragraphs, embeddings = vectorizer.chunk_and_embed(doc_path=doc_path)
-
-        points: list[PointStruct] = []
-        idx: int = 0
-        for embedding, paragraph in zip(embeddings, paragraphs):
-            new_point: PointStruct = PointStruct(
-                id=next_id,
-                vector=embedding,
-                payload={
-                    "doc_id": doc_id,
-                    "chunk_id": idx,
-                    "file_name": doc_path.name,
-                    "doc_path": str(doc_path),
-                    "embedded_text": paragraph,
-                    "subset_id": subset_id,
-                }
+        collection_name: str,
+        batches: Iterator[List[PointStruct]],
+    ):
+        """
+            Sends every batch but the last with wait=False, up to
+            upsert_parallelism at a time, so Qdrant acknowledges each one
+            as soon as it's logged and the next batch is embedded in the
+            meantime. Once those are all acknowledged, the last batch is
+            sent with wait=True. Qdrant applies a collection's updates in
+            order, so when it returns, every batch has been applied.
+        """
+        in_flight: List[Future] = []
+        last_batch: Optional[List[PointStruct]] = next(batches, None)
+        with ThreadPoolExecutor(
+            max_workers=self.upsert_parallelism
+        ) as executor:
+            for batch in batches:
+                in_flight.append(executor.submit(
+                    self.client.upsert,
+                    collection_name=collection_name,
+                    points=last_batch,
+                    wait=False
+                ))
+                if len(in_flight) >= self.upsert_parallelism:
+                    in_flight.pop(0).result()
+                last_batch = batch
+
+            for future in in_flight:
+                future.result()
+
+        if last_batch is not None:
+            self.client.upsert(
+                collection_name=collection_name,
+                points=last_batch,
+                wait=True
             )
-            points.append(new_point)
-            idx += 1
-            next_id += 1
-
-        return points
 
     def search_collection_by_doc_id(
         self,
@@ -251,30 +605,16 @@ class QdrantDB(VectorDB):
         collection_name: str
     ) -> Optional[pathlib.Path]:
         """
-        This function takes a doc_hash and checks if any other documents in the
-        collection have the same doc_id.
-
-        It would be nice to have this function return the path to the file if
-        it returns True.
-
-            def search_collection(doc_id: str) -> Optional[pathlib.Path]:
-                if hit:
-                    return hit.path
-                else:
-                    return None
-
+            Returns the path a document with this doc_id was added from,
+            or None if the collection doesn't hold it. doc_id is indexed,
+            so this is a single lookup rather than a scan.
         """
-        filter_condition = Filter(
-            must=[
-                FieldCondition(
-                    key="doc_id",                 # Payload key
-                    match=MatchValue(value=doc_id)  # The value to match
-                )
-            ]
-        )
         points, _ = self.client.scroll(
             collection_name=collection_name,
-            scroll_filter=filter_condition
+            scroll_filter=self.get_doc_id_filter(doc_id=doc_id),
+            limit=1,
+            with_payload=["doc_path"],
+            with_vectors=False
         )
         if points:
             doc_path: pathlib.Path = pathlib.Path(
@@ -287,68 +627,122 @@ class QdrantDB(VectorDB):
     def get_entry_count(self, collection_name):
         return self.client.count(collection_name=collection_name).count
 
-    def get_collection_vectorizer(
+    def get_collection_metadata(
         self,
         collection_name: str
-    ) -> Vectorizer:
+    ) -> dict:
+        """
+            Returns the payload of the collection's metadata point, which
+            records how the collection was built.
+        """
         try:
-            result = self.client.retrieve(
-                collection_name=collection_name,
-                ids=[0]
+            collection_info: CollectionInfo = self.get_collection_info(
+                collection_name=collection_name
             )
-            if result:
-                metadata = result[0].payload
-                vectorizer_class: Type[Vectorizer] = vectorizer_lookup_table[
-                    metadata["vectorizer"]
-                ]
-                vectorizer = vectorizer_class(model_string=metadata["model"])
-                return vectorizer
-            else:
-                print(
-                    "Cannot determine Vectorizer to use for embeddings. "
-                    "No metadata entry in database."
-                )
-                sys.exit(1)
-
         except Exception as e:
-            print(f"Exception encountered while getting vectorizer: {e}")
+            print(f"Exception encountered while getting metadata: {e}")
+            sys.exit(1)
+
+        if collection_info.metadata is None:
+            print(
+                "Cannot determine Vectorizer to use for embeddings. "
+                "No metadata entry in database."
+            )
             sys.exit(1)
 
-    def compute_doc_hash(self, doc_path: pathlib.Path) -> str:
+        return collection_info.metadata
+
+    def find_collection_metadata(
+        self,
+        collection_name: str
+    ) -> Optional[dict]:
         """
-            This is complicated, I know. But basically, we have a situation
-            where when we have a single file, we want to create a hash from
-            the contents of that single file. But when we have a directory
-            with multiple files/directories in it, we want to create a
-            unique hash somehow. I've opted to just take the files in the
-            provided path, sort them, and read them into memory in 64KB
-            chunks one after another and generate a hash of each chunk.
+            Like get_collection_metadata, but returns None rather than
+            exiting, so that one broken collection can't take down a query
+            that spans several.
         """
+        try:
+            collection_info: CollectionInfo = self.get_collection_info(
+                collection_name=collection_name
+            )
+        except Exception as e:
+            logging.warning(
+                f"Couldn't read metadata of collection {collection_name}: {e}"
+            )
+            return None
 
-        # Populated depending on whether doc_path is a dir or a file
-        file_list = []
-        if os.path.isdir(doc_path):
-            # Get all file names in the directory, ignoring subdirectories
-            child_files = [
-                f for f in os.listdir(doc_path)
-                if os.path.isfile(os.path.join(doc_path, f))
-            ]
-
-            # Sort files alphabetically
-            child_files.sort()
-            file_list += child_files
-        else:
-            file_list += [doc_path]
-
-        chunk_size: int = 65536  # 64KB chunks
-        sha = hashlib.sha256()
-        for file_name in file_list:
-            file_path = os.path.join(doc_path, file_name)
-            with open(file_path, "rb") as f:
-                while True:
-                    data = f.read(chunk_size)
-                    if not data:
-                        break
-                    sha.update(data)
-
-        return sha.hexdigest()
+        if collection_info.metadata is None:
+            logging.warning(f"Collection {collection_name} has no metadata.")
+            return None
+
+        return collection_info.metadata
+
+    def get_collection_info(
+        self,
+        collection_name: str
+    ) -> CollectionInfo:
+        """
+            The collection's CollectionInfo, from the cache when it's
+            there. Errors reaching Qdrant are raised and not cached.
+        """
+        collection_info: Optional[CollectionInfo] = (
+            self.collection_info_cache.get(collection_name)
+        )
+        if collection_info is None:
+            if self.client.collection_exists(
+                collection_name=collection_name
+            ):
+                collection_info = self.make_collection_info(
+                    collection=self.client.get_collection(
+                        collection_name=collection_name
+                    ),
+                    metadata_points=self.client.retrieve(
+                        collection_name=collection_name,
+                        ids=[self.metadata_id]
+                    )
+                )
+            else:
+                collection_info = CollectionInfo(exists=False)
+            self.collection_info_cache.put(collection_name, collection_info)
+        return collection_info
+
+    def list_collection_metadata(self) -> Dict[str, dict]:
+        """
+            Returns {collection_name: metadata payload} for every
+            collection that has a metadata point.
+        """
+        collection_metadata: Dict[str, dict] = {}
+        for collection in self.client.get_collections().collections:
+            result = self.client.retrieve(
+                collection_name=collection.name,
+                ids=[self.metadata_id]
+            )
+            if result and result[0].payload.get("type") == "metadata":
+                collection_metadata[collection.name] = result[0].payload
+        return collection_metadata
+
+    def get_metadata_vectorizer(
+        self,
+        metadata: dict
+    ) -> Vectorizer:
+        vectorizer_string, model_string = self.get_metadata_vectorizer_key(
+            metadata=metadata
+        )
+        try:
+            vectorizer: Vectorizer = vectorizer_registry.get_vectorizer(
+                vectorizer_string=vectorizer_string,
+                model_string=model_string
+            )
+            return vectorizer
+        except Exception as e:
+            print(f"Exception encountered while getting vectorizer: {e}")
+            sys.exit(1)
+
+    def get_collection_vectorizer(
+        self,
+        collection_name: str
+    ) -> Vectorizer:
+        metadata: dict = self.get_collection_metadata(
+            collection_name=collection_name
+        )
+        return self.get_metadata_vectorizer(metadata=metadata)
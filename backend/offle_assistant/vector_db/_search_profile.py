@@ -0,0 +1,87 @@
+import logging
+from typing import Dict, List, Optional
+
+from pydantic import Field, ValidationError
+
+from offle_assistant.config import StrictBaseModel
+
+
+class SearchProfile(StrictBaseModel):
+    """
+        How a collection is searched. hnsw_ef is the size of the HNSW
+        candidate list: larger finds more of the true nearest neighbours
+        and costs more time. exact skips the index and compares against
+        every vector, which is the right call for small collections.
+        oversampling only applies to quantized collections, and defaults
+        to the storage profile's.
+
+        The default hnsw_ef is the one every search used before profiles
+        existed. Only a profile saved by the tuner, or given explicitly,
+        lowers it.
+    """
+    hnsw_ef: int = Field(default=512, ge=1)
+    exact: bool = False
+    oversampling: Optional[float] = Field(default=None, ge=1.0)
+
+
+def parse_search_profiles(
+    additional_settings: Optional[Dict[str, str]],
+    collection_names: List[str],
+) -> Dict[str, SearchProfile]:
+    """
+        Reads search profile overrides out of RAGConfig.additional_settings.
+        A key that is just a setting, like "hnsw_ef", applies to every
+        collection. "<collection>.<setting>", like "manuals.exact",
+        applies to that collection only and wins over the former. Keys
+        that aren't search settings are left for whatever else reads
+        additional_settings.
+
+        The returned profiles only count the settings that were given as
+        set, so anything left out still comes from the collection's saved
+        profile. See resolve_search_profile.
+    """
+    if not additional_settings:
+        return {}
+
+    shared: Dict[str, str] = {}
+    per_collection: Dict[str, Dict[str, str]] = {
+        collection_name: {} for collection_name in collection_names
+    }
+    for key, value in additional_settings.items():
+        if key in SearchProfile.model_fields:
+            shared[key] = value
+            continue
+        collection_name, _, setting = key.rpartition(".")
+        if (
+            collection_name in per_collection
+            and setting in SearchProfile.model_fields
+        ):
+            per_collection[collection_name][setting] = value
+
+    search_profiles: Dict[str, SearchProfile] = {}
+    for collection_name, settings in per_collection.items():
+        settings = {**shared, **settings}
+        if not settings:
+            continue
+        try:
+            search_profiles[collection_name] = SearchProfile(**settings)
+        except ValidationError as e:
+            logging.warning(
+                f"Ignoring invalid search settings for {collection_name}: {e}"
+            )
+    return search_profiles
+
+
+def resolve_search_profile(
+    metadata: dict,
+    search_profile: Optional[SearchProfile] = None,
+) -> SearchProfile:
+    """
+        The profile a search runs with: the settings given for this query,
+        on top of the profile saved in the collection's metadata (by
+        'bench --tune_search --save'), on top of the defaults.
+    """
+    settings: dict = dict(metadata.get("search_profile") or {})
+    if search_profile is not None:
+        settings.update(search_profile.model_dump(exclude_unset=True))
+    return SearchProfile(**settings)
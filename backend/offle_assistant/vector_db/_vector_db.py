@@ -1,24 +1,33 @@
 from abc import ABC, abstractmethod
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import pathlib
-from typing import Optional, Type, List
+from typing import Optional, Type, List, Literal, Dict
 
-from offle_assistant.vectorizer import Vectorizer
-from offle_assistant.config import StrictBaseModel
+from offle_assistant.vectorizer import Vectorizer, InferenceMode
+from offle_assistant.models import MergeStrategy, RetrievalMode
+from ._db_return_obj import DbReturnObj
+from ._search_profile import SearchProfile
+from ._fan_out import (
+    get_deadline,
+    run_before_deadline,
+    arun_before_deadline,
+    merge_hit_lists
+)
 
 
-class DbReturnObj(StrictBaseModel):
-    file_name: str = ""
-    doc_path: pathlib.Path = pathlib.Path("")
-    document_string: str = ""
-    euclidean_distance: float = 0
-    cosine_similarity: float = 0
-    success: bool = False
-
-    def get_hit_document_string(self):
-        return self.document_string
-
-    def get_hit_success(self):
-        return self.success
+"""
+    How a collection's vectors are stored. float32 keeps full precision
+    vectors in RAM. int8 and binary keep a quantized copy in RAM for
+    searching and move the full precision originals to disk, where they
+    are only read to rescore the best candidates.
+"""
+StorageProfile = Literal[
+    "float32",
+    "int8",
+    "binary",
+]
 
 
 class VectorDB(ABC):
@@ -27,7 +36,9 @@ class VectorDB(ABC):
         self,
         collection_name: str,
         vectorizer_class: Type[Vectorizer],
-        model_string: Optional[str] = None
+        model_string: Optional[str] = None,
+        storage_profile: StorageProfile = "float32",
+        inference_mode: InferenceMode = "fp32"
     ):
         pass
 
@@ -46,6 +57,10 @@ class VectorDB(ABC):
     ):
         pass
 
+    @abstractmethod
+    def list_collection_metadata(self) -> Dict[str, dict]:
+        pass
+
     @abstractmethod
     def get_collection_vectorizer(
         self,
@@ -57,7 +72,134 @@ class VectorDB(ABC):
     def query_collection(
         self,
         collection_name: str,
-        query_string: List[str],
-        score_threshold: Optional[float]
-    ) -> str:
+        query_string: str,
+        score_threshold: Optional[float],
+        top_k: int = 3,
+        mmr_lambda: Optional[float] = None,
+        search_profile: Optional[SearchProfile] = None,
+        retrieval_mode: RetrievalMode = "dense"
+    ) -> List[DbReturnObj]:
+        """
+            Returns up to top_k hits, best first. When mmr_lambda is set the
+            hits are diversified with maximal marginal relevance.
+            search_profile overrides how the collection's index is searched.
+            With retrieval_mode "hybrid", dense and lexical search results
+            are fused where the collection supports it.
+        """
         pass
+
+    async def aquery_collection(
+        self,
+        collection_name: str,
+        query_string: str,
+        score_threshold: Optional[float],
+        top_k: int = 3,
+        mmr_lambda: Optional[float] = None,
+        search_profile: Optional[SearchProfile] = None,
+        retrieval_mode: RetrievalMode = "dense"
+    ) -> List[DbReturnObj]:
+        """
+            Async counterpart of query_collection. Implementations should
+            override this to embed through Vectorizer.aembed_sentence; the
+            default just moves the blocking call off the event loop.
+        """
+        return await asyncio.to_thread(
+            self.query_collection,
+            collection_name=collection_name,
+            query_string=query_string,
+            score_threshold=score_threshold,
+            top_k=top_k,
+            mmr_lambda=mmr_lambda,
+            search_profile=search_profile,
+            retrieval_mode=retrieval_mode
+        )
+
+    def query_collections(
+        self,
+        collection_names: List[str],
+        query_string: str,
+        score_threshold: Optional[float] = None,
+        top_k: int = 3,
+        mmr_lambda: Optional[float] = None,
+        merge_strategy: MergeStrategy = "score",
+        deadline_seconds: Optional[float] = None,
+        search_profiles: Optional[Dict[str, SearchProfile]] = None,
+        retrieval_mode: RetrievalMode = "dense"
+    ) -> List[DbReturnObj]:
+        """
+            Queries every collection concurrently and merges the hits into
+            one list of at most top_k, best first. Collections that fail,
+            or haven't answered within deadline_seconds, are left out.
+            search_profiles maps collection names to their search_profile.
+            Implementations should override this to embed the query once
+            per distinct vectorizer rather than once per collection.
+        """
+        search_profiles = search_profiles or {}
+        deadline: Optional[float] = get_deadline(deadline_seconds)
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, len(collection_names))
+        )
+        try:
+            hit_lists: Dict[str, List[DbReturnObj]] = run_before_deadline(
+                executor=executor,
+                calls={
+                    collection_name: partial(
+                        self.query_collection,
+                        collection_name=collection_name,
+                        query_string=query_string,
+                        score_threshold=score_threshold,
+                        top_k=top_k,
+                        mmr_lambda=mmr_lambda,
+                        search_profile=search_profiles.get(collection_name),
+                        retrieval_mode=retrieval_mode
+                    )
+                    for collection_name in collection_names
+                },
+                deadline=deadline
+            )
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return merge_hit_lists(
+            hit_lists=hit_lists,
+            top_k=top_k,
+            merge_strategy=merge_strategy
+        )
+
+    async def aquery_collections(
+        self,
+        collection_names: List[str],
+        query_string: str,
+        score_threshold: Optional[float] = None,
+        top_k: int = 3,
+        mmr_lambda: Optional[float] = None,
+        merge_strategy: MergeStrategy = "score",
+        deadline_seconds: Optional[float] = None,
+        search_profiles: Optional[Dict[str, SearchProfile]] = None,
+        retrieval_mode: RetrievalMode = "dense"
+    ) -> List[DbReturnObj]:
+        """
+            Async counterpart of query_collections.
+        """
+        search_profiles = search_profiles or {}
+        hit_lists: Dict[str, List[DbReturnObj]] = await arun_before_deadline(
+            awaitables={
+                collection_name: self.aquery_collection(
+                    collection_name=collection_name,
+                    query_string=query_string,
+                    score_threshold=score_threshold,
+                    top_k=top_k,
+                    mmr_lambda=mmr_lambda,
+                    search_profile=search_profiles.get(collection_name),
+                    retrieval_mode=retrieval_mode
+                )
+                for collection_name in collection_names
+            },
+            deadline=get_deadline(deadline_seconds)
+        )
+
+        return merge_hit_lists(
+            hit_lists=hit_lists,
+            top_k=top_k,
+            merge_strategy=merge_strategy
+        )
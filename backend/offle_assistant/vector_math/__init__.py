@@ -1,6 +1,13 @@
-from ._vector_math import cosine_similarity, euclidean_distance
+from ._vector_math import (
+    cosine_similarity,
+    euclidean_distance,
+    cosine_to_euclidean,
+    maximal_marginal_relevance
+)
 
 __all__ = [
     "cosine_similarity",
-    "euclidean_distance"
+    "euclidean_distance",
+    "cosine_to_euclidean",
+    "maximal_marginal_relevance"
 ]
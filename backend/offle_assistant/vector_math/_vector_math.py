@@ -1,3 +1,5 @@
+from typing import List
+
 import numpy as np
 
 
@@ -22,3 +24,51 @@ def cosine_similarity(A: np.array, B: np.array):
 def euclidean_distance(A: np.array, B: np.array):
     euclidean_distance = np.linalg.norm(A - B)
     return euclidean_distance
+
+
+def cosine_to_euclidean(cosine_similarity: float) -> float:
+    """
+    Euclidean distance between two unit vectors with the given cosine
+    similarity: |a - b|^2 = 2 - 2 * cos(a, b).
+    """
+    return float(np.sqrt(max(0.0, 2.0 - 2.0 * cosine_similarity)))
+
+
+def maximal_marginal_relevance(
+    query_vector: np.array,
+    candidate_vectors: np.array,
+    top_k: int,
+    lambda_mult: float = 0.5,
+) -> List[int]:
+    """
+    Picks up to top_k candidates, one at a time, by
+        lambda_mult * sim(query, candidate)
+        - (1 - lambda_mult) * max sim(candidate, already picked)
+    so that near-duplicates of an earlier pick lose out to something that
+    adds new information. lambda_mult=1 is plain relevance order.
+    Returns indices into candidate_vectors in pick order.
+    """
+    if len(candidate_vectors) == 0:
+        return []
+
+    candidates = np.asarray(candidate_vectors, dtype=np.float32)
+    candidates = candidates / np.linalg.norm(
+        candidates, axis=1, keepdims=True
+    )
+    query = np.asarray(query_vector, dtype=np.float32)
+    query = query / np.linalg.norm(query)
+
+    query_similarity = candidates @ query
+    candidate_similarity = candidates @ candidates.T
+
+    selected: List[int] = [int(np.argmax(query_similarity))]
+    while len(selected) < min(top_k, len(candidates)):
+        redundancy = candidate_similarity[:, selected].max(axis=1)
+        scores = (
+            lambda_mult * query_similarity
+            - (1 - lambda_mult) * redundancy
+        )
+        scores[selected] = -np.inf
+        selected.append(int(np.argmax(scores)))
+
+    return selected
@@ -1,9 +1,80 @@
 from ._sentence_transformer import SentenceTransformerVectorizer
-from ._vectorizer import Vectorizer
-from ._vectorizer_lookup import vectorizer_lookup_table
+from ._hashing import HashingVectorizer
+from ._ollama import (
+    OllamaVectorizer,
+    ollama_server_settings,
+    configure_ollama_server
+)
+from ._vectorizer import Vectorizer, get_default_model_string
+from ._vectorizer_registry import VectorizerRegistry
+from ._embedding_scheduler import EmbeddingScheduler
+from ._embedding_executor import EmbeddingExecutor, get_embedding_executor
+from ._embedding_settings import embedding_settings
+from ._inference import (
+    inference_settings,
+    configure_inference,
+    apply_inference_settings,
+    encode_slot,
+    InferenceMode,
+    check_inference_mode,
+    join_inference_mode,
+    split_inference_mode
+)
+from ._query_embedding_cache import QueryEmbeddingCache
+from ._chunk_embedding_cache import (
+    ChunkEmbeddingCache,
+    get_chunk_embedding_cache
+)
+from ._embedding_pool import (
+    EmbeddingProcessPool,
+    get_embedding_pool,
+    get_ingest_batch_size,
+    shutdown_embedding_pools
+)
+from ._sidecar_vectorizer import SidecarVectorizer
+from ._embedding_sidecar import EmbeddingSidecar, run_embedding_sidecar
+from ._vectorizer_lookup import (
+    vectorizer_lookup_table,
+    vectorizer_registry,
+    query_embedding_cache,
+    get_vectorizer_string,
+    configure_embedding
+)
 
 __all__ = [
     "SentenceTransformerVectorizer",
+    "HashingVectorizer",
+    "OllamaVectorizer",
+    "ollama_server_settings",
+    "configure_ollama_server",
     "Vectorizer",
-    "vectorizer_lookup_table"
+    "VectorizerRegistry",
+    "EmbeddingScheduler",
+    "EmbeddingExecutor",
+    "get_embedding_executor",
+    "embedding_settings",
+    "inference_settings",
+    "configure_inference",
+    "apply_inference_settings",
+    "encode_slot",
+    "InferenceMode",
+    "check_inference_mode",
+    "join_inference_mode",
+    "split_inference_mode",
+    "QueryEmbeddingCache",
+    "ChunkEmbeddingCache",
+    "get_chunk_embedding_cache",
+    "EmbeddingProcessPool",
+    "get_embedding_pool",
+    "get_ingest_batch_size",
+    "shutdown_embedding_pools",
+    "SidecarVectorizer",
+    "EmbeddingSidecar",
+    "run_embedding_sidecar",
+    "vectorizer_lookup_table",
+    "vectorizer_registry",
+    "query_embedding_cache",
+    "get_vectorizer_string",
+    "get_default_model_string",
+    "configure_embedding"
 ]
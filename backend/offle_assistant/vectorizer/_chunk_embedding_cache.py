@@ -0,0 +1,441 @@
+import hashlib
+import os
+import pathlib
+import re
+import sqlite3
+import time
+from typing import Callable, Dict, List, Optional
+
+from filelock import FileLock
+import numpy as np
+
+from offle_assistant.constants import CACHE_DIR
+from ._vectorizer import Vectorizer
+from ._embedding_settings import embedding_settings
+
+
+class ChunkEmbeddingCache:
+    """
+
+        Re-ingesting a document after a small edit should only embed the
+        paragraphs that changed. This is an on-disk cache of chunk
+        embeddings addressed by sha256(vectorizer, model, chunk text).
+
+        Each model gets its own directory under cache_dir holding:
+
+            vectors.f32     raw float32 rows, read through np.memmap
+            index.sqlite3   chunk hash -> row number, plus last use time
+
+        Every read and write happens under a FileLock on that directory,
+        so the CLI and any number of API workers can share one cache.
+        When a model's vectors grow past max_bytes, the least recently
+        used rows are dropped and the file is compacted.
+
+        Compaction writes the kept rows to vectors.<generation>.f32 and
+        commits the new row numbers together with the generation, so the
+        index always names the file its rows point into. A compaction
+        interrupted before that commit leaves the old file in use, and
+        the unfinished one is deleted by the next compaction.
+
+    """
+
+    def __init__(
+        self,
+        cache_dir: pathlib.Path,
+        max_bytes: int = 2 * 1024 * 1024 * 1024,
+    ):
+        self.cache_dir = pathlib.Path(cache_dir).expanduser()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self.hit_count: int = 0
+        self.miss_count: int = 0
+
+    def get_or_embed_chunks(
+        self,
+        vectorizer: Vectorizer,
+        chunks: List[str],
+        embed_missing: Callable[[List[str]], np.array],
+    ) -> np.array:
+        """
+            Returns one embedding row per chunk, in order. Only the chunks
+            that aren't cached yet are passed to embed_missing.
+        """
+        if len(chunks) <= 0:
+            return embed_missing(chunks)
+
+        model_dir: pathlib.Path = self._get_model_dir(vectorizer)
+        chunk_keys: List[str] = [
+            self._hash_chunk(vectorizer, chunk) for chunk in chunks
+        ]
+        cached: Dict[str, np.array] = self._read(model_dir, chunk_keys)
+
+        # A chunk may appear more than once in a document.
+        missing_keys: Dict[str, str] = {}
+        for chunk_key, chunk in zip(chunk_keys, chunks):
+            if chunk_key not in cached:
+                missing_keys.setdefault(chunk_key, chunk)
+
+        self.hit_count += len(chunks) - len(missing_keys)
+        self.miss_count += len(missing_keys)
+
+        if missing_keys:
+            new_embeddings = np.asarray(
+                embed_missing(list(missing_keys.values())),
+                dtype=np.float32
+            )
+            self._write(model_dir, list(missing_keys.keys()), new_embeddings)
+            for chunk_key, embedding in zip(
+                missing_keys.keys(), new_embeddings
+            ):
+                cached[chunk_key] = embedding
+
+        return np.stack([cached[chunk_key] for chunk_key in chunk_keys])
+
+    def prune(
+        self,
+        max_bytes: Optional[int] = None,
+    ):
+        """
+            Shrinks every model directory to at most max_bytes of vectors,
+            keeping the most recently used rows.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        for model_dir in self.cache_dir.iterdir():
+            if model_dir.is_dir():
+                with self._lock(model_dir):
+                    self._prune_locked(model_dir, max_bytes)
+
+    def get_size_bytes(self) -> int:
+        size_bytes: int = 0
+        for model_dir in self.cache_dir.iterdir():
+            if not model_dir.is_dir():
+                continue
+            with self._lock(model_dir):
+                connection = self._connect(model_dir)
+                try:
+                    vectors_path: pathlib.Path = self._get_vectors_path(
+                        model_dir, connection
+                    )
+                finally:
+                    connection.close()
+                if vectors_path.exists():
+                    size_bytes += vectors_path.stat().st_size
+        return size_bytes
+
+    def get_stats(self) -> dict:
+        return {
+            "cache_dir": str(self.cache_dir),
+            "size_bytes": self.get_size_bytes(),
+            "max_bytes": self.max_bytes,
+            "hit_count": self.hit_count,
+            "miss_count": self.miss_count,
+        }
+
+    def _read(
+        self,
+        model_dir: pathlib.Path,
+        chunk_keys: List[str],
+    ) -> Dict[str, np.array]:
+        found: Dict[str, np.array] = {}
+        with self._lock(model_dir):
+            connection = self._connect(model_dir)
+            try:
+                dim: Optional[int] = self._get_dim(connection)
+                if dim is None:
+                    return found
+
+                rows: Dict[str, int] = {}
+                unique_keys: List[str] = list(set(chunk_keys))
+                for start in range(0, len(unique_keys), 500):
+                    key_batch = unique_keys[start:start + 500]
+                    placeholders = ",".join("?" * len(key_batch))
+                    rows.update(connection.execute(
+                        "SELECT key, row FROM embeddings "
+                        f"WHERE key IN ({placeholders})",
+                        key_batch
+                    ).fetchall())
+
+                if not rows:
+                    return found
+
+                vectors = self._open_vectors(
+                    self._get_vectors_path(model_dir, connection), dim
+                )
+                for chunk_key, row in rows.items():
+                    found[chunk_key] = np.array(vectors[row])
+
+                now: float = time.time()
+                with connection:
+                    connection.executemany(
+                        "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                        [(now, chunk_key) for chunk_key in rows]
+                    )
+            finally:
+                connection.close()
+
+        return found
+
+    def _write(
+        self,
+        model_dir: pathlib.Path,
+        chunk_keys: List[str],
+        embeddings: np.array,
+    ):
+        dim: int = embeddings.shape[1]
+
+        with self._lock(model_dir):
+            connection = self._connect(model_dir)
+            try:
+                vectors_path: pathlib.Path = self._get_vectors_path(
+                    model_dir, connection
+                )
+                stored_dim: Optional[int] = self._get_dim(connection)
+                if stored_dim is None:
+                    with connection:
+                        connection.execute(
+                            "INSERT INTO meta (name, value) VALUES (?, ?)",
+                            ("dim", str(dim))
+                        )
+                elif stored_dim != dim:
+                    raise ValueError(
+                        f"Cached embeddings in {model_dir} have dimension "
+                        f"{stored_dim}, not {dim}"
+                    )
+
+                first_row: int = self._get_append_row(
+                    vectors_path, dim, connection
+                )
+                with open(vectors_path, "ab") as f:
+                    # A crashed write may have left bytes past the last
+                    # indexed row. Appending after them would shift every
+                    # new row off the one the index records.
+                    f.truncate(first_row * dim * 4)
+                    f.write(np.ascontiguousarray(embeddings).tobytes())
+
+                now: float = time.time()
+                with connection:
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO embeddings "
+                        "(key, row, last_used) VALUES (?, ?, ?)",
+                        [
+                            (chunk_key, first_row + offset, now)
+                            for offset, chunk_key in enumerate(chunk_keys)
+                        ]
+                    )
+
+                if vectors_path.stat().st_size > self.max_bytes:
+                    # Leave headroom so we don't compact on every write.
+                    self._prune_locked(
+                        model_dir,
+                        max_bytes=int(self.max_bytes * 0.8),
+                        connection=connection
+                    )
+            finally:
+                connection.close()
+
+    def _prune_locked(
+        self,
+        model_dir: pathlib.Path,
+        max_bytes: int,
+        connection: Optional[sqlite3.Connection] = None,
+    ):
+        """ Caller must hold the model_dir lock. """
+        owns_connection: bool = connection is None
+        if owns_connection:
+            connection = self._connect(model_dir)
+
+        try:
+            dim: Optional[int] = self._get_dim(connection)
+            generation: int = self._get_generation(connection)
+            vectors_path: pathlib.Path = self._get_vectors_path(
+                model_dir, connection
+            )
+            self._remove_stale_vectors(model_dir, keep=vectors_path)
+            if dim is None or not vectors_path.exists():
+                return
+
+            keep_count: int = max_bytes // (dim * 4)
+            entries = connection.execute(
+                "SELECT key, row, last_used FROM embeddings "
+                "ORDER BY last_used DESC"
+            ).fetchall()
+            kept = entries[:keep_count]
+            live_rows: int = len(entries)
+            file_rows: int = vectors_path.stat().st_size // (dim * 4)
+            if len(kept) == live_rows and live_rows == file_rows:
+                return  # nothing to drop or compact
+            if file_rows <= 0:
+                return
+
+            vectors = self._open_vectors(vectors_path, dim)
+            compacted_path: pathlib.Path = model_dir / (
+                f"vectors.{generation + 1}.f32"
+            )
+            with open(compacted_path, "wb") as f:
+                for _, row, _ in kept:
+                    f.write(np.ascontiguousarray(vectors[row]).tobytes())
+                # The rows must be on disk before the index points at them.
+                f.flush()
+                os.fsync(f.fileno())
+            del vectors
+
+            with connection:
+                connection.execute("DELETE FROM embeddings")
+                connection.executemany(
+                    "INSERT INTO embeddings (key, row, last_used) "
+                    "VALUES (?, ?, ?)",
+                    [
+                        (chunk_key, new_row, last_used)
+                        for new_row, (chunk_key, _, last_used) in enumerate(
+                            kept
+                        )
+                    ]
+                )
+                connection.execute(
+                    "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+                    ("generation", str(generation + 1))
+                )
+            self._remove_stale_vectors(model_dir, keep=compacted_path)
+        finally:
+            if owns_connection:
+                connection.close()
+
+    def _get_vectors_path(
+        self,
+        model_dir: pathlib.Path,
+        connection: sqlite3.Connection,
+    ) -> pathlib.Path:
+        """
+            The vectors file the index's row numbers point into. Caches
+            that were never compacted use plain vectors.f32.
+        """
+        generation: int = self._get_generation(connection)
+        if generation == 0:
+            return model_dir / "vectors.f32"
+        return model_dir / f"vectors.{generation}.f32"
+
+    def _remove_stale_vectors(
+        self,
+        model_dir: pathlib.Path,
+        keep: pathlib.Path,
+    ):
+        """
+            Deletes the vectors files of finished or interrupted
+            compactions. Caller must hold the model_dir lock.
+        """
+        for vectors_path in model_dir.glob("vectors*.f32*"):
+            if vectors_path != keep:
+                vectors_path.unlink(missing_ok=True)
+
+    def _get_append_row(
+        self,
+        vectors_path: pathlib.Path,
+        dim: int,
+        connection: sqlite3.Connection,
+    ) -> int:
+        """
+            The row new embeddings go at: right after the last row the
+            index points at, or the last whole row in the file if that
+            is shorter.
+        """
+        if not vectors_path.exists():
+            return 0
+        max_row: Optional[int] = connection.execute(
+            "SELECT MAX(row) FROM embeddings"
+        ).fetchone()[0]
+        if max_row is None:
+            return 0
+        return min(vectors_path.stat().st_size // (dim * 4), max_row + 1)
+
+    def _open_vectors(
+        self,
+        vectors_path: pathlib.Path,
+        dim: int,
+    ) -> np.memmap:
+        row_count: int = vectors_path.stat().st_size // (dim * 4)
+        return np.memmap(
+            vectors_path,
+            dtype=np.float32,
+            mode="r",
+            shape=(row_count, dim)
+        )
+
+    def _get_model_dir(self, vectorizer: Vectorizer) -> pathlib.Path:
+        identity: str = (
+            f"{vectorizer.get_vectorizer_string()}__"
+            f"{vectorizer.get_model_string()}"
+        )
+        model_dir: pathlib.Path = (
+            self.cache_dir / re.sub(r"[^A-Za-z0-9_.-]", "_", identity)
+        )
+        model_dir.mkdir(parents=True, exist_ok=True)
+        return model_dir
+
+    def _hash_chunk(self, vectorizer: Vectorizer, chunk: str) -> str:
+        sha = hashlib.sha256()
+        sha.update(vectorizer.get_vectorizer_string().encode())
+        sha.update(b"\0")
+        sha.update(vectorizer.get_model_string().encode())
+        sha.update(b"\0")
+        sha.update(chunk.encode())
+        return sha.hexdigest()
+
+    def _lock(self, model_dir: pathlib.Path) -> FileLock:
+        return FileLock(model_dir / ".lock")
+
+    def _connect(self, model_dir: pathlib.Path) -> sqlite3.Connection:
+        connection = sqlite3.connect(model_dir / "index.sqlite3")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, row INTEGER, last_used REAL)"
+        )
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS meta ("
+            "name TEXT PRIMARY KEY, value TEXT)"
+        )
+        return connection
+
+    def _get_dim(self, connection: sqlite3.Connection) -> Optional[int]:
+        result = connection.execute(
+            "SELECT value FROM meta WHERE name = 'dim'"
+        ).fetchone()
+        return None if result is None else int(result[0])
+
+    def _get_generation(self, connection: sqlite3.Connection) -> int:
+        result = connection.execute(
+            "SELECT value FROM meta WHERE name = 'generation'"
+        ).fetchone()
+        return 0 if result is None else int(result[0])
+
+
+_chunk_embedding_cache: Optional[ChunkEmbeddingCache] = None
+
+
+def get_chunk_embedding_cache() -> Optional[ChunkEmbeddingCache]:
+    """
+        Returns the process-wide chunk cache described by embedding_settings,
+        or None if it is disabled. By default the CLI and the API resolve to
+        the same directory, so they share cached embeddings.
+    """
+    global _chunk_embedding_cache
+
+    if embedding_settings.chunk_cache_enabled is False:
+        return None
+
+    cache_dir: pathlib.Path = (
+        pathlib.Path(embedding_settings.chunk_cache_dir).expanduser()
+        if embedding_settings.chunk_cache_dir is not None else
+        pathlib.Path(CACHE_DIR, "chunk_embeddings")
+    )
+    if (
+        _chunk_embedding_cache is None
+        or _chunk_embedding_cache.cache_dir != cache_dir
+    ):
+        _chunk_embedding_cache = ChunkEmbeddingCache(
+            cache_dir=cache_dir,
+            max_bytes=embedding_settings.chunk_cache_max_bytes
+        )
+    _chunk_embedding_cache.max_bytes = embedding_settings.chunk_cache_max_bytes
+
+    return _chunk_embedding_cache
@@ -0,0 +1,107 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from ._embedding_settings import embedding_settings
+
+
+class EmbeddingExecutor:
+    """
+
+        Embedding is CPU heavy and synchronous, so async callers hand it to
+        this executor instead of running it on the event loop. The pool is
+        dedicated to embedding and capped at max_concurrency threads, so
+        a burst of queries queues here rather than starving the default
+        executor or oversubscribing the CPU.
+
+        Queue time (submit until a thread picks the call up) is tracked so
+        the cap can be tuned.
+
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 2,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="embedding"
+        )
+
+        self._lock = threading.Lock()
+        self.submitted_count: int = 0
+        self.completed_count: int = 0
+        self.in_flight: int = 0
+        self.total_queue_ms: float = 0.0
+        self.max_queue_ms: float = 0.0
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args,
+    ) -> Any:
+        loop = asyncio.get_running_loop()
+        submit_time: float = time.perf_counter()
+        with self._lock:
+            self.submitted_count += 1
+
+        def timed_call():
+            queue_ms: float = (time.perf_counter() - submit_time) * 1000
+            with self._lock:
+                self.in_flight += 1
+                self.total_queue_ms += queue_ms
+                self.max_queue_ms = max(self.max_queue_ms, queue_ms)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.in_flight -= 1
+                    self.completed_count += 1
+
+        return await loop.run_in_executor(self._executor, timed_call)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            started: int = self.completed_count + self.in_flight
+            return {
+                "max_concurrency": self.max_concurrency,
+                "submitted_count": self.submitted_count,
+                "completed_count": self.completed_count,
+                "in_flight": self.in_flight,
+                "queued": self.submitted_count - started,
+                "mean_queue_ms": (
+                    self.total_queue_ms / started if started else 0.0
+                ),
+                "max_queue_ms": self.max_queue_ms,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+_embedding_executor: Optional[EmbeddingExecutor] = None
+_embedding_executor_lock = threading.Lock()
+
+
+def get_embedding_executor() -> EmbeddingExecutor:
+    """
+        Returns the process-wide executor, sized by
+        settings.embedding.async_max_concurrency.
+    """
+    global _embedding_executor
+
+    with _embedding_executor_lock:
+        max_concurrency: int = max(1, embedding_settings.async_max_concurrency)
+        if (
+            _embedding_executor is None
+            or _embedding_executor.max_concurrency != max_concurrency
+        ):
+            if _embedding_executor is not None:
+                _embedding_executor.shutdown()
+            _embedding_executor = EmbeddingExecutor(
+                max_concurrency=max_concurrency
+            )
+        return _embedding_executor
@@ -0,0 +1,253 @@
+import atexit
+import logging
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ._vectorizer import Vectorizer
+from ._embedding_settings import embedding_settings
+from ._inference import inference_settings
+
+
+"""
+    Each worker process holds exactly one Vectorizer, built in
+    _init_worker from the lookup table just like the registry would.
+"""
+_worker_vectorizer = None
+
+
+def _init_worker(
+    vectorizer_string: str,
+    model_string: str,
+    torch_threads: int,
+    inter_op_threads: Optional[int],
+    embedding_snapshot: dict,
+):
+    global _worker_vectorizer
+
+    from offle_assistant.config import EmbeddingConfig, InferenceConfig
+    from ._inference import configure_inference, apply_inference_settings
+    from ._vectorizer_lookup import (
+        configure_embedding,
+        vectorizer_lookup_table
+    )
+
+    # Spawned workers start from default settings, so the parent's
+    # settings.embedding (onnx_model_dir and the rest) is applied before
+    # the model loads.
+    configure_embedding(EmbeddingConfig(**embedding_snapshot))
+
+    # Each worker is single-tenant, so it gets exactly its thread share.
+    configure_inference(InferenceConfig(
+        intra_op_threads=torch_threads,
+        inter_op_threads=inter_op_threads,
+        max_concurrent_encodes=1
+    ))
+    apply_inference_settings()
+
+    # Workers embed in-process and leave caching to the parent.
+    embedding_settings.embedding_workers = 0
+    embedding_settings.chunk_cache_enabled = False
+
+    vectorizer_class = vectorizer_lookup_table[vectorizer_string]
+    _worker_vectorizer = vectorizer_class(model_string=model_string)
+
+
+def _embedding_dim() -> int:
+    return int(np.asarray(_worker_vectorizer.embed_sentence("dim")).shape[0])
+
+
+def _embed_shard(
+    shm_name: str,
+    total_rows: int,
+    dim: int,
+    start_row: int,
+    chunks: List[str],
+) -> int:
+    """
+        Encodes one shard and writes it straight into the parent's shared
+        result buffer, so the only thing pickled back is a row count.
+    """
+    # Spawned workers share the parent's resource tracker, so attaching
+    # here doesn't register a second owner. The parent unlinks the buffer.
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        results = np.ndarray(
+            (total_rows, dim), dtype=np.float32, buffer=shm.buf
+        )
+        embeddings = np.asarray(
+            _worker_vectorizer.embed_chunks(chunks=chunks),
+            dtype=np.float32
+        )
+        results[start_row:start_row + len(chunks)] = embeddings
+        del results
+    finally:
+        shm.close()
+    return len(chunks)
+
+
+class EmbeddingProcessPool:
+    """
+
+        Bulk ingestion spends most of its time in model.encode on a single
+        process. This spreads a chunk list over num_workers processes,
+        each of which loads its own copy of the model once and is capped
+        at torch_threads intra-op threads so the workers don't fight over
+        cores.
+
+        Results come back through a single shared memory buffer that the
+        workers write into by row offset, rather than as pickled arrays.
+
+    """
+
+    def __init__(
+        self,
+        vectorizer_string: str,
+        model_string: str,
+        num_workers: int,
+        torch_threads: int = 1,
+        shard_size: int = 64,
+    ):
+        self.vectorizer_string = vectorizer_string
+        self.model_string = model_string
+        self.num_workers = max(1, num_workers)
+        self.torch_threads = max(1, torch_threads)
+        self.shard_size = max(1, shard_size)
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._dim: Optional[int] = None
+
+    def embed_chunks(
+        self,
+        chunks: List[str],
+    ) -> np.array:
+        executor: ProcessPoolExecutor = self._get_executor()
+        if self._dim is None:
+            self._dim = executor.submit(_embedding_dim).result()
+
+        total_rows: int = len(chunks)
+        if total_rows <= 0:
+            return np.zeros((0, self._dim), dtype=np.float32)
+
+        shm = shared_memory.SharedMemory(
+            create=True, size=total_rows * self._dim * 4
+        )
+        try:
+            futures = [
+                executor.submit(
+                    _embed_shard,
+                    shm.name,
+                    total_rows,
+                    self._dim,
+                    start_row,
+                    chunks[start_row:start_row + self.shard_size]
+                )
+                for start_row in range(0, total_rows, self.shard_size)
+            ]
+            for future in futures:
+                future.result()
+
+            embeddings = np.ndarray(
+                (total_rows, self._dim), dtype=np.float32, buffer=shm.buf
+            ).copy()
+        finally:
+            shm.close()
+            shm.unlink()
+
+        return embeddings
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            logging.info(
+                f"Starting {self.num_workers} embedding workers for "
+                f"{self.vectorizer_string}:{self.model_string}"
+            )
+            # Forking after torch has started its threads can deadlock.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.num_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(
+                    self.vectorizer_string,
+                    self.model_string,
+                    self.torch_threads,
+                    inference_settings.inter_op_threads,
+                    embedding_settings.model_dump(),
+                )
+            )
+        return self._executor
+
+
+_pools: Dict[Tuple[str, str], EmbeddingProcessPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_embedding_pool(
+    vectorizer: Vectorizer,
+) -> Optional[EmbeddingProcessPool]:
+    """
+        Returns the process pool for this vectorizer's model, or None when
+        settings.embedding.embedding_workers is 0 and embedding should
+        stay in-process.
+    """
+    if embedding_settings.embedding_workers <= 0:
+        return None
+
+    key: Tuple[str, str] = (
+        vectorizer.get_vectorizer_string(),
+        vectorizer.get_model_string()
+    )
+    with _pools_lock:
+        pool: Optional[EmbeddingProcessPool] = _pools.get(key)
+        if (
+            pool is None
+            or pool.num_workers != embedding_settings.embedding_workers
+            or pool.torch_threads != embedding_settings.worker_torch_threads
+            or pool.shard_size != embedding_settings.worker_shard_size
+        ):
+            if pool is not None:
+                pool.shutdown()
+            pool = EmbeddingProcessPool(
+                vectorizer_string=key[0],
+                model_string=key[1],
+                num_workers=embedding_settings.embedding_workers,
+                torch_threads=embedding_settings.worker_torch_threads,
+                shard_size=embedding_settings.worker_shard_size
+            )
+            _pools[key] = pool
+    return pool
+
+
+def get_ingest_batch_size() -> int:
+    """
+        The number of chunks to embed and upsert at a time. When the
+        process pool is on, settings.embedding.ingest_batch_size rounds up
+        to a multiple of embedding_workers * worker_shard_size, since a
+        smaller batch would leave some of the workers idle.
+    """
+    batch_size: int = max(1, embedding_settings.ingest_batch_size)
+    if embedding_settings.embedding_workers <= 0:
+        return batch_size
+
+    pool_batch_size: int = (
+        embedding_settings.embedding_workers
+        * max(1, embedding_settings.worker_shard_size)
+    )
+    return -(-batch_size // pool_batch_size) * pool_batch_size
+
+
+@atexit.register
+def shutdown_embedding_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown()
+        _pools.clear()
@@ -0,0 +1,154 @@
+import asyncio
+import time
+from typing import Callable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from ._embedding_executor import get_embedding_executor
+
+
+PendingRequest = Tuple[str, asyncio.Future, float]
+
+
+class EmbeddingScheduler:
+    """
+
+        Concurrent chat requests each want a single query embedded. Encoding
+        them one at a time leaves most of the CPU's matrix throughput on the
+        table, so the scheduler holds each request for at most
+        batch_window_ms, or until max_batch_size requests are waiting, and
+        then encodes them all with a single call to encode_batch. Each
+        caller gets its own row back.
+
+        The scheduler belongs to the event loop it is used from. All of
+        the bookkeeping happens on that loop, so no locking is needed;
+        only encode_batch runs off the loop, on the embedding executor.
+        Used from a new loop, as after a uvicorn reload or a second
+        asyncio.run, it starts over there and drops what was left on the
+        old one.
+
+    """
+
+    def __init__(
+        self,
+        encode_batch: Callable[[List[str]], np.array],
+        batch_window_ms: float = 5.0,
+        max_batch_size: int = 32,
+    ):
+        self.encode_batch = encode_batch
+        self.batch_window_ms = batch_window_ms
+        self.max_batch_size = max(1, max_batch_size)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: List[PendingRequest] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # The loop only keeps weak references to tasks, so running
+        # encodes are held here until they finish.
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.request_count: int = 0
+        self.batch_count: int = 0
+        self.max_queue_depth: int = 0
+        self.max_batch_size_seen: int = 0
+        self.total_wait_ms: float = 0.0
+        self.max_wait_ms: float = 0.0
+
+    async def embed_sentence(
+        self,
+        sentence: str,
+    ) -> np.array:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._pending = []
+            self._flush_handle = None
+            self._tasks = set()
+
+        future: asyncio.Future = loop.create_future()
+        self._pending.append((sentence, future, time.perf_counter()))
+
+        self.request_count += 1
+        self.max_queue_depth = max(self.max_queue_depth, len(self._pending))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush(loop)
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(
+                self.batch_window_ms / 1000,
+                self._flush,
+                loop
+            )
+
+        return await future
+
+    def get_queue_depth(self) -> int:
+        return len(self._pending)
+
+    def get_stats(self) -> dict:
+        return {
+            "queue_depth": self.get_queue_depth(),
+            "max_queue_depth": self.max_queue_depth,
+            "request_count": self.request_count,
+            "batch_count": self.batch_count,
+            "mean_batch_size": (
+                self.request_count / self.batch_count
+                if self.batch_count else 0.0
+            ),
+            "max_batch_size": self.max_batch_size_seen,
+            "mean_wait_ms": (
+                self.total_wait_ms / self.request_count
+                if self.request_count else 0.0
+            ),
+            "max_wait_ms": self.max_wait_ms,
+            "batch_window_ms": self.batch_window_ms,
+        }
+
+    def _flush(self, loop: asyncio.AbstractEventLoop):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch: List[PendingRequest] = self._pending[:self.max_batch_size]
+        self._pending = self._pending[self.max_batch_size:]
+        if not batch:
+            return
+
+        # Anything left over gets its own window.
+        if self._pending:
+            self._flush_handle = loop.call_later(
+                self.batch_window_ms / 1000,
+                self._flush,
+                loop
+            )
+
+        flush_time: float = time.perf_counter()
+        for _, _, enqueue_time in batch:
+            wait_ms: float = (flush_time - enqueue_time) * 1000
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+        self.batch_count += 1
+        self.max_batch_size_seen = max(self.max_batch_size_seen, len(batch))
+
+        task: asyncio.Task = loop.create_task(self._encode(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _encode(
+        self,
+        batch: List[PendingRequest],
+    ):
+        sentences: List[str] = [sentence for sentence, _, _ in batch]
+        try:
+            embeddings = await get_embedding_executor().run(
+                self.encode_batch, sentences
+            )
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), embedding in zip(batch, embeddings):
+            if not future.done():  # The caller may have been cancelled.
+                future.set_result(embedding)
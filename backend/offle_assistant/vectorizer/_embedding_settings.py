@@ -0,0 +1,9 @@
+from offle_assistant.config import EmbeddingConfig
+
+
+"""
+    Process-wide embedding settings. The CLI and the API replace these
+    through configure_embedding at startup; everything in the vectorizer
+    package reads them at the time of use rather than at import.
+"""
+embedding_settings: EmbeddingConfig = EmbeddingConfig()
@@ -0,0 +1,164 @@
+import asyncio
+import logging
+from multiprocessing import shared_memory
+import os
+import pathlib
+import signal
+from typing import Optional
+
+import numpy as np
+
+from ._embedding_settings import embedding_settings
+from ._vectorizer import Vectorizer
+from ._vectorizer_registry import VectorizerRegistry
+from ._sidecar_protocol import read_message, write_message
+
+
+MIN_BUFFER_BYTES: int = 1024 * 1024
+
+
+class EmbeddingSidecar:
+    """
+
+        Serves embedding requests for every API worker on the host over a
+        Unix domain socket, so each model is loaded once per host rather
+        than once per worker. See SidecarVectorizer for the client side.
+
+        Models come from the sidecar's own vectorizer registry. Small
+        requests (queries, mostly) are split into single sentences and go
+        through each model's EmbeddingScheduler, so that queries arriving
+        from different workers at the same time are encoded in one batch.
+        Larger requests are encoded as they are.
+
+    """
+
+    def __init__(
+        self,
+        socket_path: pathlib.Path,
+        vectorizer_registry: VectorizerRegistry,
+    ):
+        self.socket_path = pathlib.Path(socket_path).expanduser()
+        self.vectorizer_registry = vectorizer_registry
+
+        self.connection_count: int = 0
+        self.request_count: int = 0
+        self.error_count: int = 0
+
+    async def serve(self):
+        # The sidecar must never try to hand requests to itself.
+        embedding_settings.sidecar_socket = None
+
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.socket_path.exists():  # Left behind by a previous run.
+            self.socket_path.unlink()
+
+        server = await asyncio.start_unix_server(
+            self.handle_connection,
+            path=str(self.socket_path)
+        )
+        os.chmod(self.socket_path, 0o600)
+        logging.info(f"Embedding sidecar listening on {self.socket_path}")
+
+        # Stop cleanly on SIGTERM too, so that every connection's shared
+        # memory buffer is unlinked on the way out.
+        stopped: asyncio.Event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signal_number in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signal_number, stopped.set)
+
+        try:
+            async with server:
+                await stopped.wait()
+        finally:
+            self.socket_path.unlink(missing_ok=True)
+
+    async def handle_connection(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ):
+        self.connection_count += 1
+        buffer: Optional[shared_memory.SharedMemory] = None
+        try:
+            while True:
+                try:
+                    request: dict = await read_message(reader)
+                except asyncio.IncompleteReadError:
+                    break
+
+                self.request_count += 1
+                try:
+                    embeddings: np.array = await self.embed(request)
+                    buffer = self._ensure_buffer(buffer, embeddings.nbytes)
+                    np.ndarray(
+                        embeddings.shape, dtype=np.float32, buffer=buffer.buf
+                    )[:] = embeddings
+                    response: dict = {
+                        "shm": buffer.name,
+                        "rows": embeddings.shape[0],
+                        "dim": embeddings.shape[1],
+                    }
+                except Exception as e:
+                    self.error_count += 1
+                    logging.error(f"Embedding sidecar request failed: {e}")
+                    response = {"error": str(e)}
+
+                await write_message(writer, response)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            if buffer is not None:
+                buffer.close()
+                buffer.unlink()
+
+    async def embed(self, request: dict) -> np.array:
+        vectorizer: Vectorizer = await asyncio.to_thread(
+            self.vectorizer_registry.get_vectorizer,
+            vectorizer_string=request["vectorizer"],
+            model_string=request["model"]
+        )
+        texts = request["texts"]
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        if len(texts) <= embedding_settings.max_batch_size:
+            rows = await asyncio.gather(
+                *(vectorizer.aembed_sentence(text) for text in texts)
+            )
+            return np.asarray(rows, dtype=np.float32)
+
+        return np.asarray(
+            await vectorizer.aembed_chunks(texts), dtype=np.float32
+        )
+
+    @staticmethod
+    def _ensure_buffer(
+        buffer: Optional[shared_memory.SharedMemory],
+        num_bytes: int,
+    ) -> shared_memory.SharedMemory:
+        if buffer is not None and buffer.size >= num_bytes:
+            return buffer
+
+        if buffer is not None:
+            buffer.close()
+            buffer.unlink()
+
+        # Grow in powers of two so a connection reallocates rarely.
+        size: int = MIN_BUFFER_BYTES
+        while size < num_bytes:
+            size *= 2
+        return shared_memory.SharedMemory(create=True, size=size)
+
+
+def run_embedding_sidecar(socket_path: pathlib.Path):
+    from ._vectorizer_lookup import vectorizer_registry
+
+    sidecar: EmbeddingSidecar = EmbeddingSidecar(
+        socket_path=socket_path,
+        vectorizer_registry=vectorizer_registry
+    )
+    try:
+        asyncio.run(sidecar.serve())
+    except KeyboardInterrupt:
+        pass
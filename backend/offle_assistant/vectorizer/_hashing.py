@@ -0,0 +1,89 @@
+from functools import lru_cache
+import re
+from typing import List, Tuple
+import zlib
+
+import numpy as np
+
+from ._vectorizer import Vectorizer
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+@lru_cache(maxsize=1 << 16)
+def _hash_token(token: str) -> int:
+    return zlib.crc32(token.encode())
+
+
+class HashingVectorizer(Vectorizer):
+    """
+
+        A deterministic, model-free vectorizer for benchmarks and load
+        tests. Each token is feature-hashed into one of `dim` buckets with
+        a hash-derived sign, and the result is L2 normalized. There is
+        nothing to download and it embeds orders of magnitude faster than
+        a transformer, which makes it possible to measure everything around
+        the model (chunking, upserts, search, prompt assembly) on its own.
+
+        The embeddings carry lexical overlap only. Don't use them for real
+        retrieval.
+
+        The model string is "hash-<dim>", e.g. "hash-768".
+
+    """
+
+    def __init__(
+        self,
+        model_string: str = "hash-768",
+    ):
+        self.model_string = model_string
+        self.dim: int = self.parse_dim(model_string)
+
+    @staticmethod
+    def parse_dim(model_string: str) -> int:
+        prefix, _, dim = model_string.rpartition("-")
+        if prefix != "hash" or not dim.isdigit() or int(dim) <= 0:
+            raise ValueError(
+                f"Invalid hashing model string: {model_string}. "
+                "Expected something like 'hash-768'."
+            )
+        return int(dim)
+
+    def embed_sentence(
+        self,
+        sentence: str,
+    ) -> np.array:
+        return self.embed_chunks(chunks=[sentence])[0]
+
+    def embed_chunks(
+        self,
+        chunks: List[str],
+    ) -> np.array:
+        rows: List[int] = []
+        columns: List[int] = []
+        signs: List[float] = []
+        for row, chunk in enumerate(chunks):
+            for token in TOKEN_PATTERN.findall(chunk.lower()):
+                column, sign = self._bucket(token)
+                rows.append(row)
+                columns.append(column)
+                signs.append(sign)
+
+        embeddings = np.zeros((len(chunks), self.dim), dtype=np.float32)
+        np.add.at(embeddings, (rows, columns), signs)
+
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return embeddings / norms
+
+    def _bucket(self, token: str) -> Tuple[int, float]:
+        token_hash: int = _hash_token(token)
+        sign: float = 1.0 if token_hash & 0x80000000 else -1.0
+        return token_hash % self.dim, sign
+
+    def get_vectorizer_string(self):
+        return "hashing"
+
+    def get_model_string(self):
+        return self.model_string
@@ -0,0 +1,159 @@
+from contextlib import contextmanager
+import logging
+import threading
+from typing import Generator, Optional, Tuple, Type, Literal, get_args
+
+import torch
+
+from offle_assistant.config import InferenceConfig
+
+
+"""
+    Process-wide inference settings. Everything that runs a model in this
+    process (vectorizers, rag.compute_embeddings, embedding pool workers)
+    goes through apply_inference_settings and encode_slot, so that several
+    API workers and a CLI ingest on one box don't each let torch claim
+    every core.
+"""
+inference_settings: InferenceConfig = InferenceConfig()
+
+"""
+    How a model is run. fp32 is the model as published. int8 applies
+    torch's dynamic quantization to every Linear layer, and onnx loads an
+    exported ONNX graph through onnxruntime. Both are CPU only and trade a
+    small amount of accuracy for speed; see the inference drift benchmark.
+
+    Anything other than fp32 is appended to the model string as
+    "<model>@<mode>", so that the registry, the embedding caches and the
+    embedding pool workers all treat each mode as a separate model.
+"""
+InferenceMode = Literal["fp32", "int8", "onnx"]
+INFERENCE_MODE_SEPARATOR: str = "@"
+
+_lock = threading.Lock()
+_applied: bool = False
+_encode_semaphore: threading.BoundedSemaphore = threading.BoundedSemaphore(
+    inference_settings.max_concurrent_encodes
+)
+
+
+def configure_inference(inference_config: InferenceConfig):
+    """
+        Replaces the process's inference settings. Thread counts take
+        effect the next time apply_inference_settings runs.
+    """
+    global _applied, _encode_semaphore
+
+    with _lock:
+        for field_name in InferenceConfig.model_fields:
+            setattr(
+                inference_settings,
+                field_name,
+                getattr(inference_config, field_name)
+            )
+        _encode_semaphore = threading.BoundedSemaphore(
+            max(1, inference_settings.max_concurrent_encodes)
+        )
+        _applied = False
+
+
+def apply_inference_settings():
+    """
+        Applies the torch thread settings. Safe to call from every model
+        constructor; only the first call after a configure does anything.
+    """
+    global _applied
+
+    with _lock:
+        if _applied:
+            return
+
+        intra_op_threads: Optional[int] = inference_settings.intra_op_threads
+        if intra_op_threads is not None:
+            torch.set_num_threads(intra_op_threads)
+
+        inter_op_threads: Optional[int] = inference_settings.inter_op_threads
+        if inter_op_threads is not None:
+            try:
+                torch.set_interop_threads(inter_op_threads)
+            except RuntimeError as e:
+                # torch only allows this before any inter-op work has run.
+                logging.warning(f"Could not set inter-op threads: {e}")
+
+        _applied = True
+        logging.info(
+            f"Inference threads: intra-op {torch.get_num_threads()}, "
+            f"inter-op {torch.get_num_interop_threads()}, "
+            f"max concurrent encodes "
+            f"{inference_settings.max_concurrent_encodes}"
+        )
+
+
+@contextmanager
+def encode_slot() -> Generator[None, None, None]:
+    """
+        Wrap every model.encode call in this. At most
+        inference_settings.max_concurrent_encodes encodes run at once in
+        this process; the rest wait here.
+    """
+    semaphore: threading.BoundedSemaphore = _encode_semaphore
+    with semaphore:
+        yield
+
+
+def check_inference_mode(
+    vectorizer_class: Type,
+    inference_mode: InferenceMode,
+):
+    """
+        Raises if vectorizer_class can't run its model in inference_mode.
+        Only the sentence-transformer vectorizer runs the model itself,
+        the rest would pass the suffixed model string on as a model name.
+    """
+    supported_modes: Tuple[str, ...] = getattr(
+        vectorizer_class, "inference_modes", ("fp32",)
+    )
+    if inference_mode not in supported_modes:
+        raise ValueError(
+            f"{vectorizer_class.__name__} doesn't support the "
+            f"'{inference_mode}' inference mode. Supported modes: "
+            f"{', '.join(supported_modes)}"
+        )
+
+
+def join_inference_mode(
+    model_string: str,
+    inference_mode: InferenceMode = "fp32",
+    vectorizer_class: Optional[Type] = None,
+) -> str:
+    """
+        With vectorizer_class given, modes that class doesn't support are
+        rejected too.
+    """
+    if inference_mode not in get_args(InferenceMode):
+        raise ValueError(f"Unknown inference mode: {inference_mode}")
+    if vectorizer_class is not None:
+        check_inference_mode(
+            vectorizer_class=vectorizer_class,
+            inference_mode=inference_mode
+        )
+    if inference_mode == "fp32":
+        return model_string
+    return f"{model_string}{INFERENCE_MODE_SEPARATOR}{inference_mode}"
+
+
+def split_inference_mode(model_string: str) -> Tuple[str, InferenceMode]:
+    """
+        Inverse of join_inference_mode.
+    """
+    model_name, separator, inference_mode = model_string.rpartition(
+        INFERENCE_MODE_SEPARATOR
+    )
+    if not separator:
+        return model_string, "fp32"
+    if inference_mode not in get_args(InferenceMode):
+        raise ValueError(
+            f"Unknown inference mode '{inference_mode}' in model string "
+            f"{model_string}"
+        )
+    return model_name, inference_mode
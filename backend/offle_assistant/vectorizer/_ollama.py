@@ -0,0 +1,174 @@
+import logging
+import time
+from typing import List, Optional
+
+import httpx
+import numpy as np
+import ollama
+
+from offle_assistant.config import LLMServerConfig
+from ._vectorizer import Vectorizer
+from ._embedding_scheduler import EmbeddingScheduler
+from ._embedding_settings import embedding_settings
+from ._chunk_embedding_cache import (
+    ChunkEmbeddingCache,
+    get_chunk_embedding_cache
+)
+
+
+"""
+    The server the ollama vectorizer embeds on. The CLI and the API point
+    this at their LLM server through configure_ollama_server at startup.
+"""
+ollama_server_settings: LLMServerConfig = LLMServerConfig()
+
+"""
+    Server errors worth retrying. Anything else (a missing model, a bad
+    request) fails the same way every time.
+"""
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+def configure_ollama_server(llm_server_config: LLMServerConfig):
+    for field_name in LLMServerConfig.model_fields:
+        setattr(
+            ollama_server_settings,
+            field_name,
+            getattr(llm_server_config, field_name)
+        )
+
+
+def is_transient_error(e: Exception) -> bool:
+    if isinstance(e, ollama.ResponseError):
+        return e.status_code in TRANSIENT_STATUS_CODES
+    # The ollama client turns connect errors into the builtin.
+    return isinstance(e, (httpx.TransportError, ConnectionError))
+
+
+class OllamaVectorizer(Vectorizer):
+    """
+
+        Embeds on the Ollama server instead of in this process, so API
+        workers and CLI invocations don't each hold a copy of the model.
+
+        Chunk lists are sent ollama_batch_size inputs per request over one
+        pooled HTTP client per vectorizer, which the registry shares across
+        the process. Transient failures (connection errors, timeouts, 5xx,
+        429) are retried with exponential backoff; anything else, or running
+        out of retries, raises.
+
+        The model string is the Ollama model name, e.g. "nomic-embed-text".
+
+    """
+
+    def __init__(
+        self,
+        model_string: str = "nomic-embed-text",
+    ):
+        self.model_string = model_string
+        self.server_url: str = (
+            f"http://{ollama_server_settings.hostname}:"
+            f"{ollama_server_settings.port}"
+        )
+        self.client: ollama.Client = ollama.Client(
+            self.server_url,
+            timeout=embedding_settings.ollama_timeout_seconds,
+            limits=httpx.Limits(
+                max_connections=embedding_settings.ollama_max_connections,
+                max_keepalive_connections=(
+                    embedding_settings.ollama_max_connections
+                )
+            )
+        )
+        self.embedding_scheduler: Optional[EmbeddingScheduler] = None
+
+        self.request_count: int = 0
+        self.retry_count: int = 0
+
+    def embed_sentence(
+        self,
+        sentence: str,
+    ) -> np.array:
+        return self._embed_batch(sentences=[sentence])[0]
+
+    async def aembed_sentence(
+        self,
+        sentence: str,
+    ) -> np.array:
+        """
+            Concurrent callers are micro-batched into a single request.
+        """
+        if self.embedding_scheduler is None:
+            self.embedding_scheduler = EmbeddingScheduler(
+                encode_batch=self._embed_batch,
+                batch_window_ms=embedding_settings.batch_window_ms,
+                max_batch_size=embedding_settings.max_batch_size,
+            )
+        return await self.embedding_scheduler.embed_sentence(sentence)
+
+    def embed_chunks(
+        self,
+        chunks: List[str],
+    ) -> np.array:
+        """
+            Chunks that are already in the on-disk chunk cache are not
+            sent to the server again.
+        """
+        chunk_cache: Optional[ChunkEmbeddingCache] = (
+            get_chunk_embedding_cache()
+        )
+        if chunk_cache is None:
+            return self._embed_uncached_chunks(chunks=chunks)
+
+        return chunk_cache.get_or_embed_chunks(
+            vectorizer=self,
+            chunks=chunks,
+            embed_missing=self._embed_uncached_chunks
+        )
+
+    def _embed_uncached_chunks(
+        self,
+        chunks: List[str],
+    ) -> np.array:
+        batch_size: int = max(1, embedding_settings.ollama_batch_size)
+        batches: List[np.array] = [
+            self._embed_batch(sentences=chunks[start:start + batch_size])
+            for start in range(0, len(chunks), batch_size)
+        ]
+        if not batches:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.concatenate(batches)
+
+    def _embed_batch(
+        self,
+        sentences: List[str],
+    ) -> np.array:
+        max_retries: int = embedding_settings.ollama_max_retries
+        for attempt in range(max_retries + 1):
+            self.request_count += 1
+            try:
+                response = self.client.embed(
+                    model=self.model_string,
+                    input=sentences
+                )
+                return np.asarray(response["embeddings"], dtype=np.float32)
+            except Exception as e:
+                if attempt >= max_retries or not is_transient_error(e):
+                    raise
+
+                self.retry_count += 1
+                backoff_seconds: float = (
+                    embedding_settings.ollama_retry_backoff_seconds
+                    * 2 ** attempt
+                )
+                logging.warning(
+                    f"Ollama embed request failed ({e}), retrying in "
+                    f"{backoff_seconds:.2f}s"
+                )
+                time.sleep(backoff_seconds)
+
+    def get_vectorizer_string(self):
+        return "ollama"
+
+    def get_model_string(self):
+        return self.model_string
@@ -0,0 +1,177 @@
+from collections import OrderedDict
+import threading
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+from ._vectorizer import Vectorizer
+
+
+CacheKey = Tuple[str, str, str]
+
+
+class QueryEmbeddingCache:
+    """
+
+        Users ask the same questions over and over. This keeps the
+        embeddings of recent queries, keyed by the normalized query text
+        and the vectorizer/model that produced them, so that a repeat
+        question skips the forward pass entirely.
+
+        The cache is bounded by the bytes held rather than by the number
+        of entries, since an entry's size depends on the model's
+        dimension. Entries older than ttl_seconds are treated as misses.
+
+        Every operation holds a plain threading.Lock for a handful of dict
+        operations only, so the cache can be used directly from the event
+        loop as well as from worker threads.
+
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 3600.0,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[CacheKey, Tuple[np.array, float, int]]" = (
+            OrderedDict()
+        )
+        self.current_bytes: int = 0
+
+        self.hit_count: int = 0
+        self.miss_count: int = 0
+        self.eviction_count: int = 0
+
+    def configure(
+        self,
+        max_bytes: int,
+        ttl_seconds: float,
+    ):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self.ttl_seconds = ttl_seconds
+            self._evict()
+
+    def get(
+        self,
+        vectorizer: Vectorizer,
+        query_string: str,
+    ) -> Optional[np.array]:
+        key: CacheKey = self._make_key(vectorizer, query_string)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.miss_count += 1
+                return None
+
+            embedding, created_at, _ = entry
+            if time.monotonic() - created_at > self.ttl_seconds:
+                self._remove(key)
+                self.miss_count += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hit_count += 1
+            return embedding
+
+    def put(
+        self,
+        vectorizer: Vectorizer,
+        query_string: str,
+        embedding: np.array,
+    ):
+        key: CacheKey = self._make_key(vectorizer, query_string)
+
+        # The same array is handed to every caller, so nobody may modify it.
+        embedding = np.array(embedding, copy=True)
+        embedding.setflags(write=False)
+        entry_bytes: int = embedding.nbytes + len(key[2].encode())
+
+        if entry_bytes > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (embedding, time.monotonic(), entry_bytes)
+            self.current_bytes += entry_bytes
+            self._evict()
+
+    def get_or_embed(
+        self,
+        vectorizer: Vectorizer,
+        query_string: str,
+    ) -> np.array:
+        embedding: Optional[np.array] = self.get(vectorizer, query_string)
+        if embedding is None:
+            embedding = vectorizer.embed_sentence(query_string)
+            self.put(vectorizer, query_string, embedding)
+        return embedding
+
+    async def aget_or_embed(
+        self,
+        vectorizer: Vectorizer,
+        query_string: str,
+    ) -> np.array:
+        embedding: Optional[np.array] = self.get(vectorizer, query_string)
+        if embedding is None:
+            embedding = await vectorizer.aembed_sentence(query_string)
+            self.put(vectorizer, query_string, embedding)
+        return embedding
+
+    def get_hit_ratio(self) -> float:
+        lookups: int = self.hit_count + self.miss_count
+        return self.hit_count / lookups if lookups else 0.0
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "current_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hit_count": self.hit_count,
+                "miss_count": self.miss_count,
+                "eviction_count": self.eviction_count,
+                "hit_ratio": self.get_hit_ratio(),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    @staticmethod
+    def normalize_query(query_string: str) -> str:
+        """
+            Collapses whitespace only. Case is kept, since cased models
+            embed "US" and "us" differently.
+        """
+        return " ".join(query_string.split())
+
+    def _make_key(
+        self,
+        vectorizer: Vectorizer,
+        query_string: str,
+    ) -> CacheKey:
+        return (
+            vectorizer.get_vectorizer_string(),
+            vectorizer.get_model_string(),
+            self.normalize_query(query_string),
+        )
+
+    def _remove(self, key: CacheKey):
+        """ Caller must hold self._lock. """
+        _, _, entry_bytes = self._entries.pop(key)
+        self.current_bytes -= entry_bytes
+
+    def _evict(self):
+        """ Caller must hold self._lock. """
+        while self._entries and self.current_bytes > self.max_bytes:
+            _, (_, _, entry_bytes) = self._entries.popitem(last=False)
+            self.current_bytes -= entry_bytes
+            self.eviction_count += 1
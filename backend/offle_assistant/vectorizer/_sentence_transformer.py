@@ -1,23 +1,81 @@
 import pathlib
-from typing import Union, List
+from typing import Union, List, Optional, Tuple, get_args
 import sys
 
 import numpy as np
 # import pymupdf4llm
 from sentence_transformers import SentenceTransformer
+import torch
 
 from ._vectorizer import Vectorizer
-from offle_assistant.text_processing import split_on_lines, latex_to_md
+from ._embedding_scheduler import EmbeddingScheduler
+from ._embedding_settings import embedding_settings
+from ._inference import (
+    InferenceMode,
+    apply_inference_settings,
+    encode_slot,
+    split_inference_mode
+)
+from ._chunk_embedding_cache import (
+    ChunkEmbeddingCache,
+    get_chunk_embedding_cache
+)
+from ._embedding_pool import EmbeddingProcessPool, get_embedding_pool
 
 
 class SentenceTransformerVectorizer(Vectorizer):
+    """
+
+        The model string may carry an inference mode suffix, e.g.
+        "all-mpnet-base-v2@int8". See InferenceMode.
+
+    """
+
+    inference_modes: Tuple[str, ...] = get_args(InferenceMode)
+
     def __init__(
         self,
         model_string: str = "all-mpnet-base-v2",
     ):
         self.model_string = model_string
-        self.model_path: str = "sentence-transformers/" + self.model_string
-        self.model = SentenceTransformer(self.model_path)
+        self.model_name, self.inference_mode = split_inference_mode(
+            model_string
+        )
+        self.model_path: str = "sentence-transformers/" + self.model_name
+        apply_inference_settings()
+        self.model: SentenceTransformer = self.load_model(
+            inference_mode=self.inference_mode
+        )
+        self.embedding_scheduler: Optional[EmbeddingScheduler] = None
+
+    def load_model(
+        self,
+        inference_mode: InferenceMode,
+    ) -> SentenceTransformer:
+        if inference_mode == "onnx":
+            # Needs the optional optimum[onnxruntime] dependency.
+            onnx_model_dir: Optional[str] = embedding_settings.onnx_model_dir
+            return SentenceTransformer(
+                (
+                    str(pathlib.Path(onnx_model_dir).expanduser()
+                        / self.model_name)
+                    if onnx_model_dir is not None else self.model_path
+                ),
+                backend="onnx",
+                device="cpu"
+            )
+
+        model: SentenceTransformer = SentenceTransformer(self.model_path)
+        if inference_mode == "int8":
+            # Dynamic quantization only has CPU kernels.
+            model.to("cpu")
+            torch.ao.quantization.quantize_dynamic(
+                model,
+                {torch.nn.Linear},
+                dtype=torch.qint8,
+                inplace=True
+            )
+        return model
 
     def embed_chunks(
         self,
@@ -26,31 +84,41 @@ class SentenceTransformerVectorizer(Vectorizer):
         """
             interface for compute_embeddings.
             This is done so that the inputs/outputs are accurate.
-        """
-        return self._compute_embeddings(text=chunks)
 
-    def chunk_and_embed(
-        self,
-        doc_path: pathlib.Path
-    ):
-        try:
-            md_text: str = latex_to_md(root_dir=doc_path)
-        except Exception as e:
-            print(f"Exception encountered while chunking and embedding: {e}")
-            sys.exit(1)
-
-        if len(md_text) <= 0:  # Catch empty md_text variable
-            print(
-                f"An error occurred while converting {doc_path} "
-                "to a digestible format."
-            )
-            sys.exit(1)
+            Chunks that are already in the on-disk chunk cache are not
+            embedded again.
+        """
+        chunk_cache: Optional[ChunkEmbeddingCache] = (
+            get_chunk_embedding_cache()
+        )
+        if chunk_cache is None:
+            return self._embed_uncached_chunks(chunks=chunks)
 
-        paragraphs: List[str] = split_on_lines(text=md_text)
+        return chunk_cache.get_or_embed_chunks(
+            vectorizer=self,
+            chunks=chunks,
+            embed_missing=self._embed_uncached_chunks
+        )
 
-        embeddings = self.embed_chunks(chunks=paragraphs)
+    def _embed_uncached_chunks(
+        self,
+        chunks: List[str],
+    ) -> np.array:
+        """
+            Large chunk lists go to the embedding process pool if one is
+            configured. Anything small enough to fit in one shard isn't
+            worth the round trip.
+        """
+        embedding_pool: Optional[EmbeddingProcessPool] = (
+            get_embedding_pool(vectorizer=self)
+        )
+        if (
+            embedding_pool is not None
+            and len(chunks) > embedding_pool.shard_size
+        ):
+            return embedding_pool.embed_chunks(chunks=chunks)
 
-        return (paragraphs, embeddings)
+        return self._compute_embeddings(text=chunks)
 
     def embed_sentence(
         self,
@@ -62,6 +130,33 @@ class SentenceTransformerVectorizer(Vectorizer):
         """
         return self._compute_embeddings(text=sentence)
 
+    async def aembed_sentence(
+        self,
+        sentence: str,
+    ) -> np.array:
+        """
+            Async counterpart of embed_sentence. Concurrent callers are
+            micro-batched into a single model.encode call.
+        """
+        if self.embedding_scheduler is None:
+            self.embedding_scheduler = EmbeddingScheduler(
+                encode_batch=self._encode_batch,
+                batch_window_ms=embedding_settings.batch_window_ms,
+                max_batch_size=embedding_settings.max_batch_size,
+            )
+        return await self.embedding_scheduler.embed_sentence(sentence)
+
+    def _encode_batch(
+        self,
+        sentences: List[str],
+    ) -> np.array:
+        """
+            Used by the EmbeddingScheduler. Unlike _compute_embeddings this
+            raises on failure, since it runs on behalf of many callers.
+        """
+        with encode_slot():
+            return self.model.encode(sentences)
+
     def _compute_embeddings(
         self,
         text: Union[List[str], str],
@@ -71,12 +166,74 @@ class SentenceTransformerVectorizer(Vectorizer):
             interfaces: embed_chunks or embed_sentence
         """
         try:
-            embeddings = self.model.encode(text)
+            with encode_slot():
+                if (
+                    isinstance(text, list)
+                    and embedding_settings.length_bucketing
+                ):
+                    embeddings = self._encode_length_bucketed(chunks=text)
+                else:
+                    embeddings = self.model.encode(text)
         except Exception as e:
             print(f"Exception encountered while computing embeddings: {e}")
             sys.exit(1)
         return embeddings
 
+    def _encode_length_bucketed(
+        self,
+        chunks: List[str],
+    ) -> np.array:
+        """
+            Paragraphs range from a single line to whole pages, and every
+            batch is padded to its longest member. This sorts chunks by
+            token length and grows each batch only while
+            (batch size * longest member) stays within
+            embedding_settings.encode_token_budget, so short chunks go
+            through in wide batches and long ones in narrow batches.
+            Rows are returned in the original chunk order.
+        """
+        if len(chunks) <= 1:
+            return self.model.encode(chunks)
+
+        token_lengths: List[int] = [
+            len(input_ids) for input_ids in self.model.tokenizer(
+                chunks,
+                truncation=True,
+                max_length=self.model.max_seq_length
+            )["input_ids"]
+        ]
+        order: np.array = np.argsort(token_lengths, kind="stable")
+
+        token_budget: int = embedding_settings.encode_token_budget
+        max_batch_size: int = embedding_settings.encode_max_batch_size
+        embeddings: Optional[np.array] = None
+        start: int = 0
+        while start < len(order):
+            # Lengths are ascending, so the newest member is the longest.
+            end: int = start + 1
+            while (
+                end < len(order)
+                and end - start < max_batch_size
+                and token_lengths[order[end]] * (end - start + 1)
+                <= token_budget
+            ):
+                end += 1
+
+            batch_indices: np.array = order[start:end]
+            batch_embeddings: np.array = self.model.encode(
+                [chunks[i] for i in batch_indices],
+                batch_size=len(batch_indices)
+            )
+            if embeddings is None:
+                embeddings = np.empty(
+                    (len(chunks), batch_embeddings.shape[1]),
+                    dtype=batch_embeddings.dtype
+                )
+            embeddings[batch_indices] = batch_embeddings
+            start = end
+
+        return embeddings
+
     def get_vectorizer_string(self):
         return "sentence-transformer"
 
@@ -0,0 +1,78 @@
+import asyncio
+import json
+from multiprocessing import resource_tracker, shared_memory
+import socket
+import struct
+
+
+"""
+    Wire format between the sidecar and its clients. Every message is a
+    4 byte big-endian length followed by that many bytes of JSON.
+
+        request:  {"vectorizer": str, "model": str, "texts": [str]}
+        response: {"shm": str, "rows": int, "dim": int}
+                  or {"error": str}
+
+    Embeddings never go over the socket. The sidecar keeps one shared
+    memory buffer per connection, writes each result into it as float32
+    rows, and the response names the buffer. A client copies the rows out
+    before sending its next request on that connection.
+"""
+MESSAGE_HEADER = struct.Struct("!I")
+
+
+def send_message(
+    sock: socket.socket,
+    message: dict,
+):
+    data: bytes = json.dumps(message).encode()
+    sock.sendall(MESSAGE_HEADER.pack(len(data)) + data)
+
+
+def _recv_exactly(
+    sock: socket.socket,
+    num_bytes: int,
+) -> bytes:
+    data: bytearray = bytearray()
+    while len(data) < num_bytes:
+        received: bytes = sock.recv(num_bytes - len(data))
+        if not received:
+            raise ConnectionError("Embedding sidecar closed the connection")
+        data += received
+    return bytes(data)
+
+
+def recv_message(sock: socket.socket) -> dict:
+    (length,) = MESSAGE_HEADER.unpack(
+        _recv_exactly(sock, MESSAGE_HEADER.size)
+    )
+    return json.loads(_recv_exactly(sock, length))
+
+
+async def read_message(reader: asyncio.StreamReader) -> dict:
+    (length,) = MESSAGE_HEADER.unpack(
+        await reader.readexactly(MESSAGE_HEADER.size)
+    )
+    return json.loads(await reader.readexactly(length))
+
+
+async def write_message(
+    writer: asyncio.StreamWriter,
+    message: dict,
+):
+    data: bytes = json.dumps(message).encode()
+    writer.write(MESSAGE_HEADER.pack(len(data)) + data)
+    await writer.drain()
+
+
+def attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+        Attaches to a buffer owned by another process without letting this
+        process's resource tracker unlink it at exit.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # track was added in Python 3.13
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
@@ -0,0 +1,198 @@
+import logging
+from multiprocessing import shared_memory
+import socket
+import threading
+import time
+from typing import List, Optional, Type
+
+import numpy as np
+
+from ._vectorizer import Vectorizer
+from ._embedding_scheduler import EmbeddingScheduler
+from ._embedding_settings import embedding_settings
+from ._sidecar_protocol import (
+    attach_shared_memory,
+    recv_message,
+    send_message
+)
+
+
+class SidecarVectorizer(Vectorizer):
+    """
+
+        Stands in for a vectorizer whose model lives in the embedding
+        sidecar. The registry hands these out instead of loading models
+        when settings.embedding.sidecar_socket is set. They report the
+        vectorizer and model strings of the vectorizer they stand in for,
+        so caches and collection metadata can't tell the difference.
+
+        Each thread keeps its own connection to the sidecar. If the sidecar
+        can't be reached, the real vectorizer is loaded in this process and
+        used until sidecar_retry_seconds have passed, after which the
+        sidecar is tried again. Attributes this class doesn't have (the
+        model, say) are looked up on that local vectorizer, loading it if
+        needed.
+
+    """
+
+    def __init__(
+        self,
+        vectorizer_class: Type[Vectorizer],
+        vectorizer_string: str,
+        model_string: str,
+        socket_path: str,
+    ):
+        self.vectorizer_class = vectorizer_class
+        self.vectorizer_string = vectorizer_string
+        self.model_string = model_string
+        self.socket_path = socket_path
+        self.embedding_scheduler: Optional[EmbeddingScheduler] = None
+
+        self._thread_state = threading.local()
+        self._local_vectorizer: Optional[Vectorizer] = None
+        self._local_vectorizer_lock = threading.Lock()
+        self._unavailable_until: float = 0.0
+
+        self.remote_count: int = 0
+        self.fallback_count: int = 0
+
+    def __getattr__(self, name: str):
+        # Only reached for attributes this instance doesn't have.
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.get_local_vectorizer(), name)
+
+    def embed_sentence(
+        self,
+        sentence: str,
+    ) -> np.array:
+        return self.embed_chunks(chunks=[sentence])[0]
+
+    async def aembed_sentence(
+        self,
+        sentence: str,
+    ) -> np.array:
+        """
+            Concurrent callers in this worker are batched into one request.
+            The sidecar batches again across workers.
+        """
+        if self.embedding_scheduler is None:
+            self.embedding_scheduler = EmbeddingScheduler(
+                encode_batch=self.embed_chunks,
+                batch_window_ms=embedding_settings.batch_window_ms,
+                max_batch_size=embedding_settings.max_batch_size,
+            )
+        return await self.embedding_scheduler.embed_sentence(sentence)
+
+    def embed_chunks(
+        self,
+        chunks: List[str],
+    ) -> np.array:
+        if time.monotonic() >= self._unavailable_until:
+            try:
+                embeddings: np.array = self._embed_remote(chunks=chunks)
+                self.remote_count += 1
+                return embeddings
+            except OSError as e:
+                self._unavailable_until = (
+                    time.monotonic()
+                    + embedding_settings.sidecar_retry_seconds
+                )
+                logging.warning(
+                    f"Embedding sidecar at {self.socket_path} is "
+                    f"unavailable ({e}). Embedding in-process."
+                )
+
+        self.fallback_count += 1
+        return self.get_local_vectorizer().embed_chunks(chunks=chunks)
+
+    def get_local_vectorizer(self) -> Vectorizer:
+        with self._local_vectorizer_lock:
+            if self._local_vectorizer is None:
+                logging.info(
+                    f"Loading {self.vectorizer_string}:{self.model_string} "
+                    "in-process"
+                )
+                self._local_vectorizer = self.vectorizer_class(
+                    model_string=self.model_string
+                )
+            return self._local_vectorizer
+
+    def _embed_remote(
+        self,
+        chunks: List[str],
+    ) -> np.array:
+        connection: socket.socket = self._get_connection()
+        try:
+            send_message(connection, {
+                "vectorizer": self.vectorizer_string,
+                "model": self.model_string,
+                "texts": chunks,
+            })
+            response: dict = recv_message(connection)
+        except OSError:
+            self._close_connection()
+            raise
+
+        if "error" in response:
+            raise RuntimeError(
+                f"Embedding sidecar error: {response['error']}"
+            )
+
+        rows: int = response["rows"]
+        dim: int = response["dim"]
+        buffer: shared_memory.SharedMemory = self._get_buffer(response["shm"])
+        return np.ndarray(
+            (rows, dim), dtype=np.float32, buffer=buffer.buf
+        ).copy()
+
+    def _get_connection(self) -> socket.socket:
+        connection: Optional[socket.socket] = getattr(
+            self._thread_state, "connection", None
+        )
+        if connection is None:
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.settimeout(embedding_settings.sidecar_timeout_seconds)
+            try:
+                connection.connect(self.socket_path)
+            except OSError:
+                connection.close()
+                raise
+            self._thread_state.connection = connection
+        return connection
+
+    def _close_connection(self):
+        connection: Optional[socket.socket] = getattr(
+            self._thread_state, "connection", None
+        )
+        if connection is not None:
+            connection.close()
+            self._thread_state.connection = None
+
+        buffer: Optional[shared_memory.SharedMemory] = getattr(
+            self._thread_state, "buffer", None
+        )
+        if buffer is not None:
+            buffer.close()
+            self._thread_state.buffer = None
+
+    def _get_buffer(self, name: str) -> shared_memory.SharedMemory:
+        """
+            The sidecar reuses a connection's buffer until a result doesn't
+            fit, so this only attaches again when the name changes.
+        """
+        buffer: Optional[shared_memory.SharedMemory] = getattr(
+            self._thread_state, "buffer", None
+        )
+        if buffer is None or buffer.name != name:
+            if buffer is not None:
+                buffer.close()
+            buffer = attach_shared_memory(name)
+            self._thread_state.buffer = buffer
+        return buffer
+
+    def get_vectorizer_string(self):
+        return self.vectorizer_string
+
+    def get_model_string(self):
+        return self.model_string
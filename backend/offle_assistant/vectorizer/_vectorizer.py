@@ -1,10 +1,19 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+import inspect
+import pathlib
+from typing import List, Dict, Optional, Generator, Tuple, Type
+import sys
 
 import numpy as np
 
+from ._embedding_executor import get_embedding_executor
+from offle_assistant.text_processing import split_on_lines, latex_to_md
+
 
 class Vectorizer(ABC):
+    # The inference modes the model string may carry, see InferenceMode.
+    inference_modes: Tuple[str, ...] = ("fp32",)
+
     def __init__(
         self,
         model_string: str
@@ -29,6 +38,88 @@ class Vectorizer(ABC):
         """
         pass
 
+    def chunk_and_embed(
+        self,
+        doc_path: pathlib.Path
+    ):
+        paragraphs: List[str] = self.load_paragraphs(doc_path=doc_path)
+
+        embeddings = self.embed_chunks(chunks=paragraphs)
+
+        return (paragraphs, embeddings)
+
+    def chunk_and_embed_batches(
+        self,
+        doc_path: pathlib.Path,
+        batch_size: int = 256
+    ) -> Generator[Tuple[List[str], np.array], None, None]:
+        """
+            Streaming variant of chunk_and_embed. Yields (paragraph batch,
+            embedding batch) pairs so that peak memory is bounded by the
+            batch size, not the document.
+        """
+        paragraphs: List[str] = self.load_paragraphs(doc_path=doc_path)
+
+        yield from self.iter_chunk_embeddings(
+            chunks=paragraphs,
+            batch_size=batch_size
+        )
+
+    def load_paragraphs(
+        self,
+        doc_path: pathlib.Path
+    ) -> List[str]:
+        try:
+            md_text: str = latex_to_md(root_dir=doc_path)
+        except Exception as e:
+            print(f"Exception encountered while chunking and embedding: {e}")
+            sys.exit(1)
+
+        if md_text is None or len(md_text) <= 0:  # Catch empty md_text
+            print(
+                f"An error occurred while converting {doc_path} "
+                "to a digestible format."
+            )
+            sys.exit(1)
+
+        return split_on_lines(text=md_text)
+
+    def iter_chunk_embeddings(
+        self,
+        chunks: List[str],
+        batch_size: int = 256
+    ) -> Generator[Tuple[List[str], np.array], None, None]:
+        """
+            Yields (chunk batch, embedding batch) pairs so callers can
+            consume embeddings as they are produced instead of holding
+            every embedding of a large document at once.
+        """
+        for start in range(0, len(chunks), batch_size):
+            chunk_batch: List[str] = chunks[start:start + batch_size]
+            yield chunk_batch, self.embed_chunks(chunks=chunk_batch)
+
+    async def aembed_sentence(
+        self,
+        sentence: str
+    ) -> np.array:
+        """
+            Async counterpart of embed_sentence. By default this runs
+            embed_sentence on the bounded embedding executor so that it
+            never blocks the event loop.
+        """
+        return await get_embedding_executor().run(
+            self.embed_sentence, sentence
+        )
+
+    async def aembed_chunks(
+        self,
+        chunks: List[str]
+    ) -> List[np.array]:
+        """
+            Async counterpart of embed_chunks. See aembed_sentence.
+        """
+        return await get_embedding_executor().run(self.embed_chunks, chunks)
+
     @abstractmethod
     def get_vectorizer_string(self) -> str:
         """
@@ -49,3 +140,12 @@ class Vectorizer(ABC):
             of Vectorizer with the correct one at runtime.
         """
         pass
+
+
+def get_default_model_string(vectorizer_class: Type[Vectorizer]) -> str:
+    """
+        The model a vectorizer class loads when no model string is given.
+    """
+    return inspect.signature(vectorizer_class).parameters[
+        "model_string"
+    ].default
@@ -1,4 +1,13 @@
+from typing import Type
+
+from offle_assistant.config import EmbeddingConfig
+from ._embedding_settings import embedding_settings
 from ._sentence_transformer import SentenceTransformerVectorizer
+from ._hashing import HashingVectorizer
+from ._ollama import OllamaVectorizer
+from ._vectorizer import Vectorizer, get_default_model_string
+from ._vectorizer_registry import VectorizerRegistry
+from ._query_embedding_cache import QueryEmbeddingCache
 
 
 """
@@ -6,5 +15,57 @@ from ._sentence_transformer import SentenceTransformerVectorizer
     in the collection's metadata.
 """
 vectorizer_lookup_table: dict = {
-    "sentence-transformer": SentenceTransformerVectorizer
+    "sentence-transformer": SentenceTransformerVectorizer,
+    "hashing": HashingVectorizer,
+    "ollama": OllamaVectorizer,
 }
+
+
+"""
+    Every vectorizer used at runtime should come from this registry rather
+    than from instantiating a class out of the lookup table directly, so
+    that each model is only loaded once per process.
+"""
+vectorizer_registry: VectorizerRegistry = VectorizerRegistry(
+    lookup_table=vectorizer_lookup_table
+)
+
+
+"""
+    Shared between the event loop and worker threads. Sized by
+    configure_embedding.
+"""
+query_embedding_cache: QueryEmbeddingCache = QueryEmbeddingCache(
+    max_bytes=embedding_settings.query_cache_max_bytes,
+    ttl_seconds=embedding_settings.query_cache_ttl_seconds
+)
+
+
+def get_vectorizer_string(vectorizer_class: Type[Vectorizer]) -> str:
+    """
+        Reverse lookup of vectorizer_lookup_table. Lets callers that only
+        hold a Vectorizer class go through the registry.
+    """
+    for vectorizer_string, table_class in vectorizer_lookup_table.items():
+        if table_class is vectorizer_class:
+            return vectorizer_string
+    raise KeyError(
+        f"{vectorizer_class.__name__} is not in vectorizer_lookup_table"
+    )
+
+
+def configure_embedding(embedding_config: EmbeddingConfig):
+    """
+        Applies the settings.embedding block of the config to this process.
+    """
+    for field_name in EmbeddingConfig.model_fields:
+        setattr(
+            embedding_settings,
+            field_name,
+            getattr(embedding_config, field_name)
+        )
+    vectorizer_registry.set_max_models(embedding_config.max_resident_models)
+    query_embedding_cache.configure(
+        max_bytes=embedding_config.query_cache_max_bytes,
+        ttl_seconds=embedding_config.query_cache_ttl_seconds
+    )
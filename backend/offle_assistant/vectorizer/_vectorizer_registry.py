@@ -0,0 +1,192 @@
+from collections import OrderedDict
+import logging
+import threading
+from typing import Dict, Optional, Tuple, Type
+
+from ._vectorizer import Vectorizer, get_default_model_string
+from ._embedding_settings import embedding_settings
+from ._sidecar_vectorizer import SidecarVectorizer
+from ._inference import check_inference_mode, split_inference_mode
+
+
+RegistryKey = Tuple[str, str]
+
+
+class VectorizerRegistry:
+    """
+
+        Loading a Vectorizer means loading model weights from disk, which
+        takes seconds and hundreds of MB. The registry keeps one instance
+        per (vectorizer string, model string) for the whole process, so
+        every query and ingest against a collection shares the same model.
+
+        Models are evicted least-recently-used once more than max_models
+        are resident. Loads happen outside the registry lock, so a slow
+        load of one model never blocks lookups of another, and concurrent
+        requests for the same model wait for a single load.
+
+    """
+
+    def __init__(
+        self,
+        lookup_table: Dict[str, Type[Vectorizer]],
+        max_models: int = 2,
+    ):
+        self.lookup_table = lookup_table
+        self.max_models = max(1, max_models)
+
+        self._lock = threading.Lock()
+        self._vectorizers: "OrderedDict[RegistryKey, Vectorizer]" = (
+            OrderedDict()
+        )
+        self._loading: Dict[RegistryKey, threading.Event] = {}
+
+        # Resolves a model_string of None to the class's default model.
+        self._default_models: Dict[str, str] = {}
+
+        self.load_count: int = 0
+        self.hit_count: int = 0
+        self.eviction_count: int = 0
+
+    def set_max_models(self, max_models: int):
+        with self._lock:
+            self.max_models = max(1, max_models)
+            self._evict()
+
+    def get_vectorizer(
+        self,
+        vectorizer_string: str,
+        model_string: Optional[str] = None,
+    ) -> Vectorizer:
+        """
+            Returns the shared Vectorizer for this vectorizer/model pair,
+            loading it on first use. A model_string of None means the
+            vectorizer class's default model.
+        """
+        if vectorizer_string not in self.lookup_table:
+            raise KeyError(f"Unknown vectorizer: {vectorizer_string}")
+        if model_string is not None:
+            check_inference_mode(
+                vectorizer_class=self.lookup_table[vectorizer_string],
+                inference_mode=split_inference_mode(model_string)[1]
+            )
+
+        while True:
+            with self._lock:
+                if model_string is None:
+                    model_string = self._default_models.get(vectorizer_string)
+
+                key: Optional[RegistryKey] = (
+                    None if model_string is None else
+                    (vectorizer_string, model_string)
+                )
+
+                if key is not None and key in self._vectorizers:
+                    self._vectorizers.move_to_end(key)
+                    self.hit_count += 1
+                    return self._vectorizers[key]
+
+                pending: Optional[threading.Event] = self._loading.get(key)
+                if pending is None:
+                    pending = threading.Event()
+                    self._loading[key] = pending
+                    break
+
+            # Another thread is loading this model, wait and look again.
+            pending.wait()
+
+        try:
+            vectorizer: Vectorizer = self._load(
+                vectorizer_string=vectorizer_string,
+                model_string=model_string
+            )
+        except BaseException:
+            with self._lock:
+                del self._loading[key]
+            pending.set()
+            raise
+
+        # The vectorizer is stored before the loading marker is cleared,
+        # so threads woken by pending find it instead of loading again.
+        with self._lock:
+            resolved_key: RegistryKey = (
+                vectorizer_string, vectorizer.get_model_string()
+            )
+            if model_string is None:
+                self._default_models[vectorizer_string] = resolved_key[1]
+            self._vectorizers[resolved_key] = vectorizer
+            self._vectorizers.move_to_end(resolved_key)
+            self.load_count += 1
+            self._evict()
+            del self._loading[key]
+        pending.set()
+
+        return vectorizer
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            scheduler_stats: dict = {}
+            for (vectorizer_string, model_string), vectorizer in (
+                self._vectorizers.items()
+            ):
+                scheduler = getattr(vectorizer, "embedding_scheduler", None)
+                if scheduler is not None:
+                    scheduler_stats[f"{vectorizer_string}:{model_string}"] = (
+                        scheduler.get_stats()
+                    )
+
+            return {
+                "resident_models": [
+                    f"{vectorizer}:{model}"
+                    for vectorizer, model in self._vectorizers.keys()
+                ],
+                "schedulers": scheduler_stats,
+                "max_models": self.max_models,
+                "load_count": self.load_count,
+                "hit_count": self.hit_count,
+                "eviction_count": self.eviction_count,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._vectorizers.clear()
+            self._default_models.clear()
+
+    def _load(
+        self,
+        vectorizer_string: str,
+        model_string: Optional[str],
+    ) -> Vectorizer:
+        vectorizer_class: Type[Vectorizer] = self.lookup_table[
+            vectorizer_string
+        ]
+        sidecar_socket: Optional[str] = embedding_settings.sidecar_socket
+        if sidecar_socket is not None:
+            return SidecarVectorizer(
+                vectorizer_class=vectorizer_class,
+                vectorizer_string=vectorizer_string,
+                model_string=(
+                    model_string or get_default_model_string(vectorizer_class)
+                ),
+                socket_path=sidecar_socket
+            )
+
+        logging.info(
+            f"Loading vectorizer {vectorizer_string}:"
+            f"{model_string or 'default'}"
+        )
+        return (
+            vectorizer_class() if model_string is None else
+            vectorizer_class(model_string=model_string)
+        )
+
+    def _evict(self):
+        """ Caller must hold self._lock. """
+        while len(self._vectorizers) > self.max_models:
+            (vectorizer_string, model_string), _ = (
+                self._vectorizers.popitem(last=False)
+            )
+            self.eviction_count += 1
+            logging.info(
+                f"Evicted vectorizer {vectorizer_string}:{model_string}"
+            )
@@ -0,0 +1,13 @@
+from ._warmup import (
+    WarmupState,
+    WarmupStatus,
+    warm_up,
+    warm_up_vectorizer
+)
+
+__all__ = [
+    "WarmupState",
+    "WarmupStatus",
+    "warm_up",
+    "warm_up_vectorizer"
+]
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Literal, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from offle_assistant.config import StrictBaseModel
+from offle_assistant.llm_client import LLMClient
+from offle_assistant.vector_db import AsyncVectorDB
+from offle_assistant.vectorizer import (
+    Vectorizer,
+    vectorizer_registry,
+    join_inference_mode
+)
+import offle_assistant.database as database
+
+
+WarmupStatus = Literal[
+    "pending",
+    "warming",
+    "ready",
+]
+
+
+class WarmupState(StrictBaseModel):
+    """
+        Progress of the startup warm-up, as reported by /ready. Failed
+        steps are recorded in errors but don't hold the worker back from
+        becoming ready; a cold model is better than no worker.
+    """
+    status: WarmupStatus = "pending"
+    total_steps: int = 0
+    completed_steps: int = 0
+    vectorizers: List[str] = []
+    language_models: List[str] = []
+    errors: Dict[str, str] = {}
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def is_ready(self) -> bool:
+        return self.status == "ready"
+
+
+async def warm_up_vectorizer(
+    vectorizer_string: str,
+    model_string: str,
+):
+    """
+        Loads the vectorizer into the registry and runs one dummy encode,
+        so the model weights, the tokenizer and the first-inference setup
+        are all paid for before real traffic arrives. The encode goes
+        through aembed_sentence, the query path, which has no chunk cache
+        that could answer it without touching the model.
+    """
+    vectorizer: Vectorizer = await asyncio.to_thread(
+        vectorizer_registry.get_vectorizer,
+        vectorizer_string=vectorizer_string,
+        model_string=model_string
+    )
+    await vectorizer.aembed_sentence("this is a warm up sentence.")
+
+
+async def warm_up(
+    state: WarmupState,
+    vector_db: AsyncVectorDB,
+    llm_client: LLMClient,
+    db: AsyncIOMotorDatabase,
+):
+    state.status = "warming"
+    state.started_at = time.time()
+
+    vectorizer_keys: List[Tuple[str, str]] = []
+    try:
+        collection_metadata: Dict[str, dict] = (
+            await vector_db.alist_collection_metadata()
+        )
+        vectorizer_keys = sorted({
+            (
+                metadata["vectorizer"],
+                join_inference_mode(
+                    model_string=metadata["model"],
+                    inference_mode=metadata.get("inference_mode", "fp32")
+                )
+            )
+            for metadata in collection_metadata.values()
+        })
+    except Exception as e:
+        logging.error(f"Warm-up could not list collections: {e}")
+        state.errors["vector_db"] = str(e)
+
+    language_models: List[str] = []
+    try:
+        language_models = sorted(
+            model for model in
+            await database.get_persona_language_models(db=db)
+            if model
+        )
+    except Exception as e:
+        logging.error(f"Warm-up could not list persona models: {e}")
+        state.errors["personas"] = str(e)
+
+    state.total_steps = len(vectorizer_keys) + len(language_models)
+
+    for vectorizer_string, model_string in vectorizer_keys:
+        step_name: str = f"{vectorizer_string}:{model_string}"
+        logging.info(f"Warming up vectorizer {step_name}")
+        try:
+            await warm_up_vectorizer(
+                vectorizer_string=vectorizer_string,
+                model_string=model_string
+            )
+            state.vectorizers.append(step_name)
+        except Exception as e:
+            logging.error(f"Failed to warm up {step_name}: {e}")
+            state.errors[step_name] = str(e)
+        state.completed_steps += 1
+
+    for language_model in language_models:
+        logging.info(f"Preloading language model {language_model}")
+        try:
+            await asyncio.to_thread(llm_client.preload_model, language_model)
+            state.language_models.append(language_model)
+        except Exception as e:
+            logging.error(f"Failed to preload {language_model}: {e}")
+            state.errors[language_model] = str(e)
+        state.completed_steps += 1
+
+    state.status = "ready"
+    state.finished_at = time.time()
+    logging.info(
+        f"Warm-up finished in {state.finished_at - state.started_at:.1f}s "
+        f"with {len(state.errors)} error(s)"
+    )
@@ -0,0 +1,55 @@
+import json
+
+from offle_assistant.benchmarks import run_embedding_benchmark
+from offle_assistant.benchmarks._embedding import synthetic_corpus
+from offle_assistant.vectorizer import embedding_settings
+
+
+def test_synthetic_corpus_is_deterministic():
+    assert synthetic_corpus(chunks_per_length=4) == synthetic_corpus(
+        chunks_per_length=4
+    )
+    assert set(synthetic_corpus(chunks_per_length=1)) == {
+        "short", "medium", "long"
+    }
+
+
+def test_benchmark_reports_every_corpus_and_batch_size(tmp_path):
+    corpus = tmp_path / "corpus.md"
+    corpus.write_text("# Title\n\nFirst paragraph.\n\nSecond paragraph.\n")
+
+    results = run_embedding_benchmark(
+        vectorizer_string="hashing",
+        model_string="hash-32",
+        corpus_path=corpus,
+        batch_sizes=(1, 16),
+        thread_counts=(None, 1),
+        latency_queries=20,
+    )
+
+    json.dumps(results)
+    assert results["vectorizer"] == "hashing"
+    assert results["model"] == "hash-32"
+    assert len(results["runs"]) == 2
+    assert results["runs"][1]["threads"] == 1
+
+    throughput = results["runs"][0]["throughput"]
+    assert set(throughput) == {
+        "synthetic_short", "synthetic_medium", "synthetic_long", "markdown"
+    }
+    assert [run["batch_size"] for run in throughput["markdown"]] == [1, 16]
+    assert all(run["sentences_per_second"] > 0 for run in throughput["markdown"])
+
+    latency = results["runs"][0]["latency"]
+    assert latency["p50_ms"] <= latency["p95_ms"] <= latency["p99_ms"]
+    assert results["peak_rss_mb"] > 0
+
+
+def test_benchmark_restores_chunk_cache_setting():
+    embedding_settings.chunk_cache_enabled = True
+    run_embedding_benchmark(
+        vectorizer_string="hashing",
+        batch_sizes=(32,),
+        latency_queries=5,
+    )
+    assert embedding_settings.chunk_cache_enabled
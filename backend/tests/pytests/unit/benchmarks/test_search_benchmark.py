@@ -0,0 +1,19 @@
+from offle_assistant.benchmarks import benchmark_search
+
+
+def test_lean_search_transfers_fewer_bytes(hashing_qdrant_db):
+    results = benchmark_search(
+        vector_db=hashing_qdrant_db,
+        collection_name="docs",
+        queries=["reset password", "printer badge"],
+        top_k=2,
+        repeats=2,
+    )
+
+    assert results["queries"] == 2
+    assert (
+        results["lean"]["mean_response_bytes"]
+        < results["with_vectors"]["mean_response_bytes"]
+    )
+    assert results["response_bytes_saved"] > 0
+    assert hashing_qdrant_db.debug_vectors is False
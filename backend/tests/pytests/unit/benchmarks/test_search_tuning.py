@@ -0,0 +1,117 @@
+import pathlib
+
+from offle_assistant.benchmarks import tune_search_profile
+from offle_assistant.vector_db import SearchProfile
+from offle_assistant.vectorizer import HashingVectorizer
+
+
+def test_smallest_ef_meeting_the_target_is_picked(hashing_qdrant_db):
+    results = tune_search_profile(
+        vector_db=hashing_qdrant_db,
+        collection_name="docs",
+        top_k=2,
+        ef_candidates=(64, 16, 32),
+        repeats=1,
+    )
+
+    # The queries default to the collection's own five chunks.
+    assert results["queries"] == 5
+    assert list(results["hnsw_ef"]) == ["16", "32", "64"]
+    # In memory Qdrant always searches exactly, so every ef has full recall.
+    assert all(
+        result["recall"] == 1.0 for result in results["hnsw_ef"].values()
+    )
+    assert results["search_profile"] == SearchProfile(hnsw_ef=16).model_dump()
+    assert results["meets_target"] is True
+
+
+def test_quantized_collections_are_measured_against_full_precision(
+    hashing_qdrant_db,
+    indexed_paragraphs,
+    monkeypatch
+):
+    hashing_qdrant_db.add_collection(
+        collection_name="quantized",
+        vectorizer_class=HashingVectorizer,
+        model_string="hash-256",
+        storage_profile="int8"
+    )
+    hashing_qdrant_db.add_document(
+        doc_path=pathlib.Path(__file__),
+        collection_name="quantized"
+    )
+    search_params = []
+    query_points = hashing_qdrant_db.client.query_points
+
+    def recording_query_points(**kwargs):
+        search_params.append(kwargs["search_params"])
+        return query_points(**kwargs)
+
+    monkeypatch.setattr(
+        hashing_qdrant_db.client, "query_points", recording_query_points
+    )
+
+    results = tune_search_profile(
+        vector_db=hashing_qdrant_db,
+        collection_name="quantized",
+        queries=indexed_paragraphs,
+        ef_candidates=(16,),
+        repeats=1,
+    )
+
+    reference, exact, ef_16 = (
+        search_params[i * len(indexed_paragraphs)] for i in range(3)
+    )
+    assert reference.exact is True
+    assert reference.quantization.ignore is True
+    # The measured searches run the way the collection really is searched.
+    assert exact.exact is True
+    assert exact.quantization.ignore is not True
+    assert ef_16.hnsw_ef == 16
+    assert ef_16.quantization.rescore is True
+    assert results["exact"]["recall"] == 1.0
+
+
+def test_nothing_fits_an_impossible_budget(hashing_qdrant_db):
+    results = tune_search_profile(
+        vector_db=hashing_qdrant_db,
+        collection_name="docs",
+        queries=["reset password"],
+        latency_budget_ms=0,
+        ef_candidates=(16, 32),
+        repeats=1,
+    )
+
+    assert results["meets_target"] is False
+    assert results["search_profile"]["exact"] is False
+
+
+def test_saved_profiles_are_used_by_later_searches(
+    hashing_qdrant_db,
+    monkeypatch
+):
+    search_params = []
+    query_points = hashing_qdrant_db.client.query_points
+
+    def recording_query_points(**kwargs):
+        search_params.append(kwargs["search_params"])
+        return query_points(**kwargs)
+
+    monkeypatch.setattr(
+        hashing_qdrant_db.client, "query_points", recording_query_points
+    )
+    hashing_qdrant_db.save_search_profile(
+        collection_name="docs",
+        search_profile=SearchProfile(hnsw_ef=24)
+    )
+
+    for search_profile in (None, SearchProfile(exact=True)):
+        hashing_qdrant_db.query_collection(
+            collection_name="docs",
+            query_string="reset password",
+            search_profile=search_profile
+        )
+
+    assert [(p.hnsw_ef, p.exact) for p in search_params] == [
+        (24, False), (24, True)
+    ]
@@ -0,0 +1,57 @@
+import pathlib
+
+import pytest
+from qdrant_client import QdrantClient
+
+from offle_assistant.config import VectorDbServerConfig
+from offle_assistant.vector_db import QdrantDB
+from offle_assistant.vectorizer import (
+    HashingVectorizer,
+    embedding_settings,
+    query_embedding_cache,
+)
+
+
+PARAGRAPHS = [
+    "How to reset your password from the login page.",
+    "How to reset your password from the login page!",
+    "Resetting a forgotten password requires your email address.",
+    "The cafeteria opens at eight in the morning.",
+    "Printers on the second floor need a badge to release jobs.",
+]
+
+
+@pytest.fixture
+def indexed_paragraphs():
+    return list(PARAGRAPHS)
+
+
+@pytest.fixture
+def hashing_qdrant_db(monkeypatch):
+    """
+        A QdrantDB on an in-memory client, holding PARAGRAPHS in the
+        collection "docs", embedded with the hashing vectorizer.
+    """
+    monkeypatch.setattr(embedding_settings, "chunk_cache_enabled", False)
+    query_embedding_cache.clear()
+
+    qdrant_db = QdrantDB(VectorDbServerConfig())
+    qdrant_db.client = QdrantClient(":memory:")
+    qdrant_db.add_collection(
+        collection_name="docs",
+        vectorizer_class=HashingVectorizer,
+        model_string="hash-256",
+    )
+
+    vectorizer = qdrant_db.get_collection_vectorizer(collection_name="docs")
+    monkeypatch.setattr(
+        type(vectorizer),
+        "load_paragraphs",
+        lambda self, doc_path: PARAGRAPHS,
+        raising=False
+    )
+    qdrant_db.add_document(
+        doc_path=pathlib.Path(__file__),
+        collection_name="docs"
+    )
+    return qdrant_db
@@ -0,0 +1,57 @@
+import argparse
+
+from qdrant_client import QdrantClient
+
+from offle_assistant.cli._rag_command import rag_command
+from offle_assistant.config import OffleConfig
+from offle_assistant.vector_db import QdrantDB
+from offle_assistant.vectorizer import HashingVectorizer, embedding_settings
+
+
+def test_add_uses_the_configured_vector_db(
+    indexed_paragraphs,
+    monkeypatch,
+    tmp_path
+):
+    monkeypatch.setattr(embedding_settings, "chunk_cache_enabled", False)
+    monkeypatch.setattr(
+        "offle_assistant.vector_db._qdrant_db.QdrantClient",
+        lambda host, port: QdrantClient(":memory:")
+    )
+    monkeypatch.setattr(
+        HashingVectorizer,
+        "load_paragraphs",
+        lambda self, doc_path: indexed_paragraphs,
+        raising=False
+    )
+    batch_sizes = []
+    upsert_batches = QdrantDB.upsert_batches
+
+    def recording_upsert_batches(self, collection_name, batches):
+        batches = list(batches)
+        batch_sizes.extend(len(batch) for batch in batches)
+        return upsert_batches(self, collection_name, iter(batches))
+
+    monkeypatch.setattr(QdrantDB, "upsert_batches", recording_upsert_batches)
+
+    doc_path = tmp_path / "doc.md"
+    doc_path.write_text("\n\n".join(indexed_paragraphs))
+    config = OffleConfig(
+        personas={},
+        settings={"vector_db_server": {"upsert_batch_size": 2}}
+    )
+    args = argparse.Namespace(
+        add=str(doc_path),
+        collection="docs",
+        delete=False,
+        vectorizer="hashing",
+        model="hash-64",
+        storage_profile="float32",
+        inference_mode="fp32",
+        workers=None,
+        torch_threads=None
+    )
+
+    rag_command(args, config)
+
+    assert batch_sizes == [2, 2, 1]
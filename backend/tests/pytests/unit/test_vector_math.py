@@ -0,0 +1,28 @@
+import numpy as np
+
+from offle_assistant.vector_math import maximal_marginal_relevance
+
+
+def test_mmr_with_lambda_one_is_relevance_order():
+    query = np.array([1.0, 0.0])
+    candidates = np.array([[0.6, 0.8], [1.0, 0.0], [0.8, 0.6]])
+
+    assert maximal_marginal_relevance(query, candidates, top_k=3,
+                                      lambda_mult=1.0) == [1, 2, 0]
+
+
+def test_mmr_skips_duplicates():
+    query = np.array([1.0, 0.2])
+    candidates = np.array([[1.0, 0.1], [1.0, 0.1], [0.5, 1.0]])
+
+    assert maximal_marginal_relevance(query, candidates, top_k=2,
+                                      lambda_mult=0.5) == [0, 2]
+
+
+def test_mmr_handles_fewer_candidates_than_top_k():
+    assert maximal_marginal_relevance(
+        np.ones(2), np.empty((0, 2)), top_k=3
+    ) == []
+    assert maximal_marginal_relevance(
+        np.ones(2), np.ones((1, 2)), top_k=3
+    ) == [0]
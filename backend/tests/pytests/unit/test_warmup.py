@@ -0,0 +1,154 @@
+import numpy as np
+import pytest
+
+from offle_assistant.vectorizer import (
+    Vectorizer,
+    embedding_settings,
+    get_chunk_embedding_cache,
+    vectorizer_lookup_table,
+    vectorizer_registry,
+)
+from offle_assistant.warmup import WarmupState, warm_up
+import offle_assistant.database as database
+
+
+class WarmupVectorizer(Vectorizer):
+    encoded = []
+
+    def __init__(self, model_string: str = "warm-model"):
+        self.model_string = model_string
+
+    def encode(self, sentences):
+        WarmupVectorizer.encoded.append(self.model_string)
+        return np.ones((len(sentences), 4))
+
+    def embed_sentence(self, sentence):
+        return self.encode([sentence])[0]
+
+    def embed_chunks(self, chunks):
+        chunk_cache = get_chunk_embedding_cache()
+        if chunk_cache is None:
+            return self.encode(chunks)
+        return chunk_cache.get_or_embed_chunks(
+            vectorizer=self, chunks=chunks, embed_missing=self.encode
+        )
+
+    def get_vectorizer_string(self):
+        return "warmup-stub"
+
+    def get_model_string(self):
+        return self.model_string
+
+
+class FakeVectorDB:
+    async def alist_collection_metadata(self):
+        return {
+            "docs": {"vectorizer": "warmup-stub", "model": "model-a"},
+            "manuals": {"vectorizer": "warmup-stub", "model": "model-a"},
+            "papers": {"vectorizer": "warmup-stub", "model": "model-b"},
+        }
+
+
+class FakeLLMClient:
+    def __init__(self, failing_model=None):
+        self.preloaded = []
+        self.failing_model = failing_model
+
+    def preload_model(self, model):
+        if model == self.failing_model:
+            raise ConnectionError("ollama unreachable")
+        self.preloaded.append(model)
+
+
+@pytest.fixture
+def stub_vectorizer(monkeypatch):
+    monkeypatch.setitem(
+        vectorizer_lookup_table, "warmup-stub", WarmupVectorizer
+    )
+    WarmupVectorizer.encoded = []
+    yield
+    vectorizer_registry.clear()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_loads_each_vectorizer_once(
+    stub_vectorizer,
+    monkeypatch
+):
+    async def fake_persona_models(db):
+        return ["llama3.2", "mistral"]
+
+    monkeypatch.setattr(
+        database, "get_persona_language_models", fake_persona_models
+    )
+    llm_client = FakeLLMClient()
+    state = WarmupState()
+
+    await warm_up(
+        state=state,
+        vector_db=FakeVectorDB(),
+        llm_client=llm_client,
+        db=None
+    )
+
+    assert state.is_ready()
+    assert state.total_steps == 4
+    assert state.completed_steps == 4
+    assert sorted(WarmupVectorizer.encoded) == ["model-a", "model-b"]
+    assert llm_client.preloaded == ["llama3.2", "mistral"]
+    assert state.errors == {}
+
+
+@pytest.mark.asyncio
+async def test_warm_up_failures_are_reported_not_fatal(
+    stub_vectorizer,
+    monkeypatch
+):
+    async def fake_persona_models(db):
+        return ["llama3.2"]
+
+    monkeypatch.setattr(
+        database, "get_persona_language_models", fake_persona_models
+    )
+    state = WarmupState()
+
+    await warm_up(
+        state=state,
+        vector_db=FakeVectorDB(),
+        llm_client=FakeLLMClient(failing_model="llama3.2"),
+        db=None
+    )
+
+    assert state.is_ready()
+    assert "llama3.2" in state.errors
+    assert state.language_models == []
+
+
+@pytest.mark.asyncio
+async def test_every_start_encodes_with_the_model(
+    stub_vectorizer,
+    monkeypatch,
+    tmp_path
+):
+    async def fake_persona_models(db):
+        return []
+
+    monkeypatch.setattr(
+        database, "get_persona_language_models", fake_persona_models
+    )
+    monkeypatch.setattr(embedding_settings, "chunk_cache_enabled", True)
+    monkeypatch.setattr(embedding_settings, "chunk_cache_dir", str(tmp_path))
+
+    for _ in range(2):
+        vectorizer_registry.clear()  # As if the worker had restarted.
+        await warm_up(
+            state=WarmupState(),
+            vector_db=FakeVectorDB(),
+            llm_client=FakeLLMClient(),
+            db=None
+        )
+
+    # The chunk cache persists across starts, but mustn't answer warm-up.
+    assert sorted(WarmupVectorizer.encoded) == [
+        "model-a", "model-a", "model-b", "model-b"
+    ]
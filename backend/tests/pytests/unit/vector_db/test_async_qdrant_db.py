@@ -0,0 +1,91 @@
+import pathlib
+
+import pytest
+from qdrant_client import AsyncQdrantClient
+
+from offle_assistant.config import VectorDbServerConfig
+from offle_assistant.vector_db import AsyncQdrantDB
+from offle_assistant.vectorizer import HashingVectorizer
+
+
+async def make_async_db(monkeypatch, paragraphs):
+    monkeypatch.setattr(
+        HashingVectorizer,
+        "load_paragraphs",
+        lambda self, doc_path: paragraphs,
+        raising=False
+    )
+    async_db = AsyncQdrantDB(VectorDbServerConfig())
+    await async_db.aclose()
+    async_db.client = AsyncQdrantClient(":memory:")
+    await async_db.aadd_collection(
+        collection_name="docs",
+        vectorizer_class=HashingVectorizer,
+        model_string="hash-256",
+    )
+    await async_db.aadd_document(
+        doc_path=pathlib.Path(__file__),
+        collection_name="docs"
+    )
+    return async_db
+
+
+@pytest.mark.asyncio
+async def test_async_db_matches_sync_db(
+    hashing_qdrant_db,
+    indexed_paragraphs,
+    monkeypatch
+):
+    async_db = await make_async_db(monkeypatch, indexed_paragraphs)
+
+    for kwargs in (
+        dict(query_string="reset password", top_k=3),
+        dict(query_string="reset password login page", mmr_lambda=0.3),
+        dict(query_string="printer badge", retrieval_mode="hybrid"),
+        dict(
+            query_string="your cafeteria",
+            top_k=2,
+            score_threshold=0.2,
+            retrieval_mode="hybrid"
+        ),
+    ):
+        sync_hits = hashing_qdrant_db.query_collection(
+            collection_name="docs", **kwargs
+        )
+        async_hits = await async_db.aquery_collection(
+            collection_name="docs", **kwargs
+        )
+        assert [hit.document_string for hit in async_hits] == [
+            hit.document_string for hit in sync_hits
+        ]
+        assert [hit.score for hit in async_hits] == pytest.approx(
+            [hit.score for hit in sync_hits]
+        )
+
+    await async_db.aclose()
+
+
+@pytest.mark.asyncio
+async def test_documents_are_added_once(indexed_paragraphs, monkeypatch):
+    async_db = await make_async_db(monkeypatch, indexed_paragraphs)
+    await async_db.aadd_document(
+        doc_path=pathlib.Path(__file__),
+        collection_name="docs"
+    )
+
+    # The paragraphs plus the metadata point.
+    count = await async_db.aget_entry_count(collection_name="docs")
+    assert count == len(indexed_paragraphs) + 1
+
+    metadata = await async_db.alist_collection_metadata()
+    assert metadata["docs"]["model"] == "hash-256"
+
+    await async_db.adelete_collection(collection_name="docs")
+    assert await async_db.alist_collection_metadata() == {}
+    with pytest.raises(ValueError):
+        await async_db.aquery_collection(
+            collection_name="docs",
+            query_string="reset password"
+        )
+
+    await async_db.aclose()
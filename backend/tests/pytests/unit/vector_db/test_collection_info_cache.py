@@ -0,0 +1,84 @@
+import time
+
+from offle_assistant.vector_db import CollectionInfoCache, CollectionInfo
+from offle_assistant.vectorizer import HashingVectorizer
+
+
+def count_calls(monkeypatch, client, method_name):
+    calls = []
+    method = getattr(client, method_name)
+
+    def counting(*args, **kwargs):
+        calls.append(kwargs.get("collection_name"))
+        return method(*args, **kwargs)
+
+    monkeypatch.setattr(client, method_name, counting)
+    return calls
+
+
+def test_queries_reuse_cached_collection_info(hashing_qdrant_db, monkeypatch):
+    retrieve_calls = count_calls(
+        monkeypatch, hashing_qdrant_db.client, "retrieve"
+    )
+    for _ in range(3):
+        hashing_qdrant_db.query_collection(
+            query_string="reset password",
+            collection_name="docs",
+        )
+
+    assert retrieve_calls == []
+    collection_info = hashing_qdrant_db.get_collection_info("docs")
+    assert collection_info.vector_dim == 256
+    assert collection_info.distance == "Cosine"
+    assert collection_info.metadata["model"] == "hash-256"
+    assert hashing_qdrant_db.collection_info_cache.hit_count >= 3
+
+
+def test_create_and_delete_invalidate_at_once(hashing_qdrant_db):
+    assert hashing_qdrant_db.get_collection_info("other").exists is False
+
+    hashing_qdrant_db.add_collection(
+        collection_name="other",
+        vectorizer_class=HashingVectorizer,
+        model_string="hash-512",
+    )
+    assert hashing_qdrant_db.get_collection_info("other").vector_dim == 512
+
+    hashing_qdrant_db.delete_collection(collection_name="other")
+    assert hashing_qdrant_db.get_collection_info("other").exists is False
+    assert hashing_qdrant_db.find_collection_metadata("other") is None
+
+
+def test_adding_an_existing_collection_is_one_lookup(
+    hashing_qdrant_db,
+    monkeypatch,
+):
+    hashing_qdrant_db.get_collection_info("docs")
+    exists_calls = count_calls(
+        monkeypatch, hashing_qdrant_db.client, "collection_exists"
+    )
+    get_calls = count_calls(
+        monkeypatch, hashing_qdrant_db.client, "get_collection"
+    )
+
+    hashing_qdrant_db.add_collection(
+        collection_name="docs",
+        vectorizer_class=HashingVectorizer,
+        model_string="hash-256",
+    )
+
+    assert exists_calls == ["docs"]
+    assert get_calls == []
+    # Nothing changed, so the cached info is still good.
+    assert hashing_qdrant_db.collection_info_cache.get("docs") is not None
+
+
+def test_entries_expire():
+    cache = CollectionInfoCache(ttl_seconds=0.01)
+    cache.put("docs", CollectionInfo(exists=True))
+
+    assert cache.get("docs").exists is True
+    time.sleep(0.02)
+    assert cache.get("docs") is None
+    assert cache.get_stats()["hit_count"] == 1
+    assert cache.get_stats()["miss_count"] == 1
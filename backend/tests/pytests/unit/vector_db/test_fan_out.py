@@ -0,0 +1,174 @@
+import pathlib
+import time
+
+import pytest
+
+from offle_assistant.vector_db import DbReturnObj, merge_hit_lists, RRF_K
+from offle_assistant.vectorizer import HashingVectorizer
+
+
+NOTES = [
+    "Password resets are handled by the IT help desk.",
+    "The parking garage closes at midnight.",
+]
+
+
+def make_hits(name, scores):
+    return [
+        DbReturnObj(
+            file_name=name,
+            doc_path=pathlib.Path(name),
+            document_string=f"{name} {i}",
+            score=score,
+            cosine_similarity=score,
+            success=True
+        )
+        for i, score in enumerate(scores)
+    ]
+
+
+@pytest.fixture
+def two_collection_db(hashing_qdrant_db, monkeypatch, tmp_path):
+    """
+        hashing_qdrant_db plus "notes", embedded with the same vectorizer
+        as "docs", and "wide", embedded with a different one.
+    """
+    notes_path = tmp_path / "notes.md"
+    notes_path.write_text("\n\n".join(NOTES))
+    monkeypatch.setattr(
+        HashingVectorizer,
+        "load_paragraphs",
+        lambda self, doc_path: NOTES,
+        raising=False
+    )
+    for collection_name, model_string in (
+        ("notes", "hash-256"), ("wide", "hash-512")
+    ):
+        hashing_qdrant_db.add_collection(
+            collection_name=collection_name,
+            vectorizer_class=HashingVectorizer,
+            model_string=model_string,
+        )
+        hashing_qdrant_db.add_document(
+            doc_path=notes_path,
+            collection_name=collection_name
+        )
+
+    embedded = []
+    embed_query = hashing_qdrant_db.embed_query
+    monkeypatch.setattr(
+        hashing_qdrant_db,
+        "embed_query",
+        lambda vectorizer_key, query_string: (
+            embedded.append(vectorizer_key)
+            or embed_query(vectorizer_key, query_string)
+        )
+    )
+    hashing_qdrant_db.embedded = embedded
+    return hashing_qdrant_db
+
+
+def test_score_merge_keeps_weak_collections_behind():
+    merged = merge_hit_lists(
+        hit_lists={
+            "a": make_hits("a", [0.9, 0.8, 0.7]),
+            "b": make_hits("b", [0.3, 0.1]),
+        },
+        top_k=3,
+    )
+
+    # b's best hit is the best b has, but still a far worse match.
+    assert [hit.document_string for hit in merged] == ["a 0", "a 1", "a 2"]
+    assert [hit.fused_score for hit in merged] == [0.9, 0.8, 0.7]
+
+
+def test_score_merge_interleaves_by_similarity():
+    merged = merge_hit_lists(
+        hit_lists={
+            "a": make_hits("a", [0.9, 0.4]),
+            "b": make_hits("b", [0.6, 0.5]),
+        },
+        top_k=3,
+    )
+
+    assert [hit.document_string for hit in merged] == ["a 0", "b 0", "b 1"]
+    assert merged[1].collection_name == "b"
+
+
+def test_rrf_adds_up_duplicate_hits():
+    shared = make_hits("shared", [0.5])[0]
+    merged = merge_hit_lists(
+        hit_lists={
+            "a": make_hits("a", [0.9]) + [shared],
+            "b": make_hits("b", [0.9]) + [shared],
+        },
+        top_k=5,
+        merge_strategy="rrf",
+    )
+
+    assert merged[0].document_string == "shared 0"
+    assert merged[0].fused_score == pytest.approx(2 / (RRF_K + 2))
+    assert len(merged) == 3
+
+
+def test_embeds_once_per_distinct_vectorizer(two_collection_db):
+    hits = two_collection_db.query_collections(
+        collection_names=["docs", "notes", "wide"],
+        query_string="reset password",
+        top_k=6,
+    )
+
+    assert sorted(two_collection_db.embedded) == [
+        ("hashing", "hash-256"), ("hashing", "hash-512")
+    ]
+    # notes and wide hold the same document, so its paragraphs come back
+    # once each.
+    documents = [hit.document_string for hit in hits]
+    assert len(documents) == len(set(documents))
+    assert NOTES[0] in documents
+    assert "docs" in {hit.collection_name for hit in hits}
+    fused_scores = [hit.fused_score for hit in hits]
+    assert fused_scores == sorted(fused_scores, reverse=True)
+
+
+def test_broken_and_late_collections_are_left_out(
+    two_collection_db,
+    monkeypatch
+):
+    search_collection = two_collection_db.search_collection
+
+    def slow_search(collection_name, **kwargs):
+        if collection_name == "wide":
+            time.sleep(1)
+        return search_collection(collection_name=collection_name, **kwargs)
+
+    monkeypatch.setattr(two_collection_db, "search_collection", slow_search)
+
+    start = time.perf_counter()
+    hits = two_collection_db.query_collections(
+        collection_names=["missing", "docs", "wide"],
+        query_string="reset password",
+        deadline_seconds=0.5,
+    )
+
+    assert time.perf_counter() - start < 0.9
+    assert hits
+    assert {hit.collection_name for hit in hits} == {"docs"}
+
+
+@pytest.mark.asyncio
+async def test_async_fan_out_matches_sync(two_collection_db):
+    kwargs = dict(
+        collection_names=["docs", "notes", "wide"],
+        query_string="reset password",
+        top_k=4,
+        merge_strategy="rrf",
+    )
+    sync_hits = two_collection_db.query_collections(**kwargs)
+    async_hits = await two_collection_db.aquery_collections(**kwargs)
+
+    assert [
+        (hit.collection_name, hit.document_string) for hit in async_hits
+    ] == [
+        (hit.collection_name, hit.document_string) for hit in sync_hits
+    ]
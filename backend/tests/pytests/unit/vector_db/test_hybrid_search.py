@@ -0,0 +1,148 @@
+import math
+
+import pytest
+
+from offle_assistant.vector_db import LexicalEncoder, RRF_K
+
+
+def test_identifiers_are_kept_whole_and_split():
+    encoder = LexicalEncoder()
+
+    assert encoder.tokenize(r"\ref{ssl-timeout} ERR_CONN_42") == [
+        "ref", "ssl-timeout", "ssl", "timeout", "err_conn_42"
+    ]
+
+
+def test_repeated_terms_saturate():
+    encoder = LexicalEncoder()
+    once = encoder.encode_document("timeout")
+    thrice = encoder.encode_document("timeout timeout timeout")
+
+    assert once.indices == thrice.indices
+    assert once.values[0] < thrice.values[0] < 3 * once.values[0]
+    assert encoder.encode_query("Timeout timeout retry").values == [1.0, 1.0]
+
+
+def test_hybrid_search_is_one_fused_batch(
+    hashing_qdrant_db,
+    indexed_paragraphs,
+    monkeypatch
+):
+    batches = []
+    query_batch_points = hashing_qdrant_db.client.query_batch_points
+
+    def recording_query_batch_points(collection_name, requests):
+        batches.append(requests)
+        return query_batch_points(
+            collection_name=collection_name, requests=requests
+        )
+
+    monkeypatch.setattr(
+        hashing_qdrant_db.client,
+        "query_batch_points",
+        recording_query_batch_points
+    )
+    dense_hits = hashing_qdrant_db.query_collection(
+        collection_name="docs",
+        query_string="printer badge",
+        top_k=2
+    )
+    hybrid_hits = hashing_qdrant_db.query_collection(
+        collection_name="docs",
+        query_string="printer badge",
+        top_k=2,
+        retrieval_mode="hybrid"
+    )
+
+    assert [len(requests) for requests in batches] == [2]
+    assert hybrid_hits[0].document_string == indexed_paragraphs[4]
+    # First in both rankings.
+    assert hybrid_hits[0].score == pytest.approx(2 / (RRF_K + 1))
+    assert hybrid_hits[0].cosine_similarity == pytest.approx(
+        dense_hits[0].cosine_similarity
+    )
+
+
+def test_lexical_only_hits_carry_their_dense_similarity(
+    hashing_qdrant_db,
+    indexed_paragraphs
+):
+    kwargs = dict(collection_name="docs", query_string="your cafeteria")
+    dense_similarities = {
+        hit.document_string: hit.cosine_similarity
+        for hit in hashing_qdrant_db.query_collection(top_k=5, **kwargs)
+    }
+
+    hits = hashing_qdrant_db.query_collection(
+        top_k=2, retrieval_mode="hybrid", **kwargs
+    )
+    lexical_only = [hit for hit in hits if hit.lexical_only]
+    # Too far down the dense ranking for top_k=2.
+    assert [hit.document_string for hit in lexical_only] == [
+        indexed_paragraphs[3]
+    ]
+    for hit in hits:
+        assert hit.cosine_similarity == pytest.approx(
+            dense_similarities[hit.document_string]
+        )
+    assert lexical_only[0].cosine_similarity > 0
+    assert lexical_only[0].euclidean_distance == pytest.approx(
+        math.sqrt(2 - 2 * lexical_only[0].cosine_similarity)
+    )
+
+
+def test_score_threshold_applies_after_fusion(
+    hashing_qdrant_db,
+    indexed_paragraphs
+):
+    kwargs = dict(
+        collection_name="docs",
+        query_string="your cafeteria",
+        top_k=2,
+        retrieval_mode="hybrid"
+    )
+    similarity = next(
+        hit.cosine_similarity
+        for hit in hashing_qdrant_db.query_collection(**kwargs)
+        if hit.lexical_only
+    )
+
+    kept = hashing_qdrant_db.query_collection(
+        score_threshold=similarity - 0.01, **kwargs
+    )
+    dropped = hashing_qdrant_db.query_collection(
+        score_threshold=similarity + 0.01, **kwargs
+    )
+
+    assert indexed_paragraphs[3] in [hit.document_string for hit in kept]
+    assert indexed_paragraphs[3] not in [
+        hit.document_string for hit in dropped
+    ]
+    assert all(
+        hit.cosine_similarity >= similarity + 0.01 for hit in dropped
+    )
+
+
+def test_collections_without_lexical_vectors_stay_dense(
+    hashing_qdrant_db,
+    monkeypatch
+):
+    hashing_qdrant_db.client.delete_payload(
+        collection_name="docs",
+        keys=["lexical_vector"],
+        points=[hashing_qdrant_db.metadata_id]
+    )
+    hashing_qdrant_db.collection_info_cache.invalidate("docs")
+    monkeypatch.setattr(
+        hashing_qdrant_db.client, "query_batch_points", None
+    )
+
+    hits = hashing_qdrant_db.query_collection(
+        collection_name="docs",
+        query_string="reset password",
+        retrieval_mode="hybrid"
+    )
+    assert hits == hashing_qdrant_db.query_collection(
+        collection_name="docs",
+        query_string="reset password"
+    )
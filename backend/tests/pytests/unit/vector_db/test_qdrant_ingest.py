@@ -0,0 +1,118 @@
+import pathlib
+import uuid
+
+from qdrant_client.models import (
+    FieldCondition,
+    Filter,
+    MatchValue,
+    PayloadSchemaType,
+)
+
+from offle_assistant.vector_db import PAYLOAD_INDEX_FIELDS
+from offle_assistant.vectorizer import HashingVectorizer
+
+
+def get_document_points(qdrant_db):
+    points, _ = qdrant_db.client.scroll(
+        collection_name="docs",
+        scroll_filter=Filter(must_not=[
+            FieldCondition(key="type", match=MatchValue(value="metadata"))
+        ]),
+        limit=100
+    )
+    return points
+
+
+def test_point_ids_come_from_doc_hash_and_chunk(
+    hashing_qdrant_db,
+    indexed_paragraphs
+):
+    points = get_document_points(hashing_qdrant_db)
+    doc_id = points[0].payload["doc_id"]
+
+    assert len(points) == len(indexed_paragraphs)
+    assert {point.id for point in points} == {
+        hashing_qdrant_db.get_point_id(doc_id=doc_id, chunk_id=chunk_id)
+        for chunk_id in range(len(indexed_paragraphs))
+    }
+    assert all(uuid.UUID(point.id).version == 5 for point in points)
+    assert [
+        point.payload["chunk_id"] for point in points
+        if point.payload["last_chunk"]
+    ] == [len(indexed_paragraphs) - 1]
+
+
+def test_retrying_a_partial_ingest_adds_no_duplicates(
+    hashing_qdrant_db,
+    indexed_paragraphs
+):
+    points = get_document_points(hashing_qdrant_db)
+    last_point = next(p for p in points if p.payload["last_chunk"])
+    # As if the ingest had failed before its final batch was written.
+    hashing_qdrant_db.client.delete(
+        collection_name="docs",
+        points_selector=[last_point.id]
+    )
+
+    hashing_qdrant_db.add_document(
+        doc_path=pathlib.Path(__file__).parent.parent / "conftest.py",
+        collection_name="docs"
+    )
+
+    assert len(get_document_points(hashing_qdrant_db)) == len(
+        indexed_paragraphs
+    )
+
+
+def test_only_the_final_batch_waits(hashing_qdrant_db, monkeypatch):
+    calls = []
+    upsert = hashing_qdrant_db.client.upsert
+
+    def recording_upsert(collection_name, points, wait=True):
+        calls.append((len(points), wait))
+        return upsert(
+            collection_name=collection_name, points=points, wait=wait
+        )
+
+    monkeypatch.setattr(hashing_qdrant_db, "upsert_batch_size", 2)
+    monkeypatch.setattr(hashing_qdrant_db.client, "upsert", recording_upsert)
+    hashing_qdrant_db.add_collection(
+        collection_name="batched",
+        vectorizer_class=HashingVectorizer,
+        model_string="hash-256",
+    )
+    calls.clear()  # The metadata point.
+
+    hashing_qdrant_db.add_document(
+        doc_path=pathlib.Path(__file__),
+        collection_name="batched"
+    )
+
+    # Five paragraphs: two batches in flight, then the final barrier.
+    assert sorted(calls[:-1]) == [(2, False), (2, False)]
+    assert calls[-1] == (1, True)
+
+
+def test_new_collections_get_payload_indexes(hashing_qdrant_db, monkeypatch):
+    indexed = []
+    monkeypatch.setattr(
+        hashing_qdrant_db.client,
+        "create_payload_index",
+        lambda collection_name, field_name, field_schema, wait: (
+            indexed.append((collection_name, field_name, field_schema))
+        )
+    )
+    hashing_qdrant_db.add_collection(
+        collection_name="indexed",
+        vectorizer_class=HashingVectorizer,
+        model_string="hash-256",
+    )
+
+    assert indexed == [
+        ("indexed", field_name, PayloadSchemaType.KEYWORD)
+        for field_name in PAYLOAD_INDEX_FIELDS
+    ]
+    # Indexes a collection already has are left alone.
+    assert hashing_qdrant_db.get_missing_payload_indexes(
+        payload_schema={"doc_id": None, "type": None}
+    ) == ["file_name", "subset_id"]
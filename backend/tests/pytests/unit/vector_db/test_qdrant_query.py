@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+
+def test_returns_top_k_hits_best_first(hashing_qdrant_db):
+    hits = hashing_qdrant_db.query_collection(
+        query_string="reset password",
+        collection_name="docs",
+        top_k=3,
+    )
+
+    assert len(hits) == 3
+    assert all(hit.success for hit in hits)
+    scores = [hit.score for hit in hits]
+    assert scores == sorted(scores, reverse=True)
+    assert "password" in hits[0].document_string
+    # The metadata point is never returned as a hit.
+    assert all(hit.file_name for hit in hits)
+
+
+def test_score_threshold_limits_hits(hashing_qdrant_db):
+    hits = hashing_qdrant_db.query_collection(
+        query_string="reset password",
+        collection_name="docs",
+        score_threshold=0.99,
+        top_k=5,
+    )
+
+    assert hits == []
+
+
+def test_mmr_drops_near_duplicates(hashing_qdrant_db, indexed_paragraphs):
+    plain = hashing_qdrant_db.query_collection(
+        query_string="reset password login page",
+        collection_name="docs",
+        top_k=2,
+    )
+    diversified = hashing_qdrant_db.query_collection(
+        query_string="reset password login page",
+        collection_name="docs",
+        top_k=2,
+        mmr_lambda=0.3,
+    )
+
+    assert np.isclose(plain[0].cosine_similarity, plain[1].cosine_similarity)
+    assert diversified[0].document_string == plain[0].document_string
+    assert diversified[1].document_string not in indexed_paragraphs[:2]
+
+
+@pytest.mark.asyncio
+async def test_async_query_matches_sync(hashing_qdrant_db):
+    sync_hits = hashing_qdrant_db.query_collection(
+        query_string="printer badge",
+        collection_name="docs",
+        top_k=2,
+    )
+    async_hits = await hashing_qdrant_db.aquery_collection(
+        query_string="printer badge",
+        collection_name="docs",
+        top_k=2,
+    )
+
+    assert [hit.document_string for hit in async_hits] == [
+        hit.document_string for hit in sync_hits
+    ]
+
+
+def test_lean_search_derives_distances_from_the_score(hashing_qdrant_db):
+    lean_hits = hashing_qdrant_db.query_collection(
+        query_string="reset password",
+        collection_name="docs",
+    )
+    hashing_qdrant_db.debug_vectors = True
+    debug_hits = hashing_qdrant_db.query_collection(
+        query_string="reset password",
+        collection_name="docs",
+    )
+
+    assert all(hit.vector is None for hit in lean_hits)
+    assert all(len(hit.vector) == 256 for hit in debug_hits)
+    for lean_hit, debug_hit in zip(lean_hits, debug_hits):
+        assert lean_hit.document_string == debug_hit.document_string
+        assert np.isclose(
+            lean_hit.cosine_similarity, debug_hit.cosine_similarity,
+            atol=1e-5
+        )
+        assert np.isclose(
+            lean_hit.euclidean_distance, debug_hit.euclidean_distance,
+            atol=1e-4
+        )
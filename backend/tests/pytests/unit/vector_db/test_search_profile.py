@@ -0,0 +1,49 @@
+from offle_assistant.vector_db import (
+    SearchProfile,
+    parse_search_profiles,
+    resolve_search_profile,
+)
+
+
+def test_collection_settings_win_over_shared_ones():
+    search_profiles = parse_search_profiles(
+        additional_settings={
+            "hnsw_ef": "64",
+            "manuals.hnsw_ef": "256",
+            "tickets.exact": "true",
+            "unrelated": "kept for someone else",
+            "other.hnsw_ef": "999",
+        },
+        collection_names=["manuals", "tickets", "notes"],
+    )
+
+    assert search_profiles["manuals"].hnsw_ef == 256
+    assert search_profiles["tickets"].hnsw_ef == 64
+    assert search_profiles["tickets"].exact is True
+    assert search_profiles["notes"] == SearchProfile(hnsw_ef=64)
+    assert "other" not in search_profiles
+
+
+def test_invalid_settings_are_skipped():
+    search_profiles = parse_search_profiles(
+        additional_settings={"manuals.hnsw_ef": "0", "notes.exact": "yes"},
+        collection_names=["manuals", "notes"],
+    )
+
+    assert list(search_profiles) == ["notes"]
+    assert parse_search_profiles(None, ["manuals"]) == {}
+
+
+def test_query_settings_override_the_saved_profile():
+    metadata = {"search_profile": {"hnsw_ef": 32, "oversampling": 3.0}}
+
+    assert resolve_search_profile(metadata={}) == SearchProfile()
+    assert SearchProfile().hnsw_ef == 512
+    assert resolve_search_profile(metadata=metadata) == SearchProfile(
+        hnsw_ef=32, oversampling=3.0
+    )
+    # Only the settings given for the query replace the saved ones.
+    assert resolve_search_profile(
+        metadata=metadata,
+        search_profile=SearchProfile(exact=True)
+    ) == SearchProfile(hnsw_ef=32, exact=True, oversampling=3.0)
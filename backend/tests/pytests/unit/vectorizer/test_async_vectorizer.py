@@ -0,0 +1,68 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from offle_assistant.vectorizer import (
+    Vectorizer,
+    EmbeddingExecutor,
+    get_embedding_executor,
+)
+
+
+class ThreadRecordingVectorizer(Vectorizer):
+    def __init__(self, model_string: str = "stub-model"):
+        self.model_string = model_string
+        self.threads = set()
+
+    def embed_sentence(self, sentence):
+        self.threads.add(threading.current_thread().name)
+        return np.ones(4)
+
+    def embed_chunks(self, chunks):
+        self.threads.add(threading.current_thread().name)
+        return np.ones((len(chunks), 4))
+
+    def get_vectorizer_string(self):
+        return "stub"
+
+    def get_model_string(self):
+        return self.model_string
+
+
+@pytest.mark.asyncio
+async def test_default_async_api_runs_off_the_event_loop():
+    vectorizer = ThreadRecordingVectorizer()
+
+    sentence_embedding = await vectorizer.aembed_sentence("query")
+    chunk_embeddings = await vectorizer.aembed_chunks(["a", "b"])
+
+    assert sentence_embedding.shape == (4,)
+    assert chunk_embeddings.shape == (2, 4)
+    assert vectorizer.threads
+    assert threading.current_thread().name not in vectorizer.threads
+    assert get_embedding_executor().get_stats()["completed_count"] >= 2
+
+
+@pytest.mark.asyncio
+async def test_executor_caps_concurrency():
+    executor = EmbeddingExecutor(max_concurrency=2)
+    lock = threading.Lock()
+    running = {"now": 0, "peak": 0}
+
+    def slow_call():
+        with lock:
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+        threading.Event().wait(0.02)
+        with lock:
+            running["now"] -= 1
+
+    await asyncio.gather(*[executor.run(slow_call) for _ in range(6)])
+
+    stats = executor.get_stats()
+    assert running["peak"] == 2
+    assert stats["completed_count"] == 6
+    assert stats["max_queue_ms"] > 0
+    executor.shutdown()
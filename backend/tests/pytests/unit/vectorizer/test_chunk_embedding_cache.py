@@ -0,0 +1,165 @@
+import os
+
+import numpy as np
+import pytest
+
+from offle_assistant.vectorizer import Vectorizer, ChunkEmbeddingCache
+
+
+class StubVectorizer(Vectorizer):
+    def __init__(self, model_string: str = "stub-model"):
+        self.model_string = model_string
+        self.embedded = []
+
+    def embed_sentence(self, sentence):
+        return self.embed_chunks([sentence])[0]
+
+    def embed_chunks(self, chunks):
+        self.embedded.extend(chunks)
+        return np.array(
+            [[len(chunk), float(i), 1.0, 2.0] for i, chunk in
+             enumerate(chunks)],
+            dtype=np.float32
+        )
+
+    def get_vectorizer_string(self):
+        return "stub"
+
+    def get_model_string(self):
+        return self.model_string
+
+
+def test_only_unseen_chunks_are_embedded(tmp_path):
+    cache = ChunkEmbeddingCache(cache_dir=tmp_path)
+    vectorizer = StubVectorizer()
+
+    first = cache.get_or_embed_chunks(
+        vectorizer, ["alpha", "beta"], vectorizer.embed_chunks
+    )
+    vectorizer.embedded.clear()
+
+    second = cache.get_or_embed_chunks(
+        vectorizer, ["alpha", "gamma!", "beta"], vectorizer.embed_chunks
+    )
+
+    assert vectorizer.embedded == ["gamma!"]
+    assert np.array_equal(second[0], first[0])
+    assert np.array_equal(second[2], first[1])
+    assert second.shape == (3, 4)
+    assert second.dtype == np.float32
+
+
+def test_cache_is_shared_across_instances(tmp_path):
+    vectorizer = StubVectorizer()
+    ChunkEmbeddingCache(cache_dir=tmp_path).get_or_embed_chunks(
+        vectorizer, ["alpha"], vectorizer.embed_chunks
+    )
+    vectorizer.embedded.clear()
+
+    ChunkEmbeddingCache(cache_dir=tmp_path).get_or_embed_chunks(
+        vectorizer, ["alpha"], vectorizer.embed_chunks
+    )
+
+    assert vectorizer.embedded == []
+
+
+def test_models_do_not_share_entries(tmp_path):
+    cache = ChunkEmbeddingCache(cache_dir=tmp_path)
+    vectorizer_a = StubVectorizer(model_string="model-a")
+    vectorizer_b = StubVectorizer(model_string="model-b")
+
+    cache.get_or_embed_chunks(
+        vectorizer_a, ["alpha"], vectorizer_a.embed_chunks
+    )
+    cache.get_or_embed_chunks(
+        vectorizer_b, ["alpha"], vectorizer_b.embed_chunks
+    )
+
+    assert vectorizer_b.embedded == ["alpha"]
+
+
+def test_prune_keeps_most_recently_used(tmp_path):
+    cache = ChunkEmbeddingCache(cache_dir=tmp_path)
+    vectorizer = StubVectorizer()
+    row_bytes = 4 * 4
+
+    cache.get_or_embed_chunks(
+        vectorizer, ["a", "b", "c"], vectorizer.embed_chunks
+    )
+    cache.get_or_embed_chunks(vectorizer, ["c"], vectorizer.embed_chunks)
+
+    cache.prune(max_bytes=row_bytes)
+    assert cache.get_size_bytes() == row_bytes
+
+    vectorizer.embedded.clear()
+    cache.get_or_embed_chunks(
+        vectorizer, ["a", "b", "c"], vectorizer.embed_chunks
+    )
+    assert vectorizer.embedded == ["a", "b"]
+
+
+def test_interrupted_compaction_keeps_serving_the_old_rows(
+    tmp_path,
+    monkeypatch
+):
+    cache = ChunkEmbeddingCache(cache_dir=tmp_path)
+    vectorizer = StubVectorizer()
+    first = cache.get_or_embed_chunks(
+        vectorizer, ["a", "bb", "ccc"], vectorizer.embed_chunks
+    )
+    cache.get_or_embed_chunks(vectorizer, ["ccc"], vectorizer.embed_chunks)
+
+    def crash(fd):
+        raise OSError("crashed before the index was rewritten")
+
+    # The compacted file is written, but the index never points at it.
+    with monkeypatch.context() as patch:
+        patch.setattr(os, "fsync", crash)
+        with pytest.raises(OSError):
+            cache.prune(max_bytes=4 * 4)
+
+    vectorizer.embedded.clear()
+    second = cache.get_or_embed_chunks(
+        vectorizer, ["a", "bb", "ccc"], vectorizer.embed_chunks
+    )
+    assert vectorizer.embedded == []
+    assert np.array_equal(second, first)
+
+    cache.get_or_embed_chunks(vectorizer, ["ccc"], vectorizer.embed_chunks)
+    cache.prune(max_bytes=4 * 4)
+    model_dir = next(tmp_path.iterdir())
+    assert [path.name for path in model_dir.glob("vectors*")] == [
+        "vectors.1.f32"
+    ]
+    assert np.array_equal(
+        cache.get_or_embed_chunks(
+            vectorizer, ["ccc"], vectorizer.embed_chunks
+        )[0],
+        first[2]
+    )
+
+
+def test_a_partial_row_left_by_a_crash_is_overwritten(tmp_path):
+    cache = ChunkEmbeddingCache(cache_dir=tmp_path)
+    vectorizer = StubVectorizer()
+    first = cache.get_or_embed_chunks(
+        vectorizer, ["a", "bb"], vectorizer.embed_chunks
+    )
+
+    # A write that crashed halfway through its first row.
+    vectors_path = next(next(tmp_path.iterdir()).glob("vectors*"))
+    with open(vectors_path, "ab") as f:
+        f.write(b"\x00" * 6)
+
+    second = cache.get_or_embed_chunks(
+        vectorizer, ["ccc", "dddd"], vectorizer.embed_chunks
+    )
+    vectorizer.embedded.clear()
+    assert np.array_equal(
+        cache.get_or_embed_chunks(
+            vectorizer, ["a", "bb", "ccc", "dddd"], vectorizer.embed_chunks
+        ),
+        np.concatenate([first, second])
+    )
+    assert vectorizer.embedded == []
+    assert vectors_path.stat().st_size == 4 * 4 * 4
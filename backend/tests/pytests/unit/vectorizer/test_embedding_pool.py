@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from offle_assistant.vectorizer import (
+    EmbeddingProcessPool,
+    HashingVectorizer,
+    embedding_settings,
+    get_ingest_batch_size
+)
+
+
+@pytest.mark.parametrize(
+    "workers, shard_size, ingest_batch_size, expected",
+    [
+        (0, 64, 256, 256),
+        (4, 64, 256, 256),
+        (16, 64, 256, 1024),
+        (3, 64, 256, 384),
+        (2, 10, 5, 20),
+    ]
+)
+def test_ingest_batches_cover_every_worker(
+    monkeypatch,
+    workers,
+    shard_size,
+    ingest_batch_size,
+    expected,
+):
+    monkeypatch.setattr(embedding_settings, "embedding_workers", workers)
+    monkeypatch.setattr(embedding_settings, "worker_shard_size", shard_size)
+    monkeypatch.setattr(
+        embedding_settings, "ingest_batch_size", ingest_batch_size
+    )
+    assert get_ingest_batch_size() == expected
+
+
+def test_pool_matches_in_process_embeddings(monkeypatch):
+    monkeypatch.setattr(embedding_settings, "chunk_cache_enabled", False)
+    chunks = [f"chunk number {index}" for index in range(10)]
+    pool = EmbeddingProcessPool(
+        vectorizer_string="hashing",
+        model_string="hash-64",
+        num_workers=2,
+        shard_size=3
+    )
+    try:
+        embeddings = pool.embed_chunks(chunks=chunks)
+    finally:
+        pool.shutdown()
+
+    expected = np.asarray(
+        HashingVectorizer(model_string="hash-64").embed_chunks(chunks=chunks)
+    )
+    assert embeddings.shape == (10, 64)
+    np.testing.assert_allclose(embeddings, expected, rtol=1e-6)
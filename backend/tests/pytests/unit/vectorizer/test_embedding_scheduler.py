@@ -0,0 +1,92 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from offle_assistant.vectorizer import EmbeddingScheduler
+
+
+class FakeEncoder:
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, sentences):
+        self.batches.append(list(sentences))
+        return np.array([[len(sentence), 0.0] for sentence in sentences])
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_batch():
+    encoder = FakeEncoder()
+    scheduler = EmbeddingScheduler(
+        encode_batch=encoder,
+        batch_window_ms=20,
+        max_batch_size=32
+    )
+
+    sentences = ["a" * n for n in range(1, 11)]
+    embeddings = await asyncio.gather(
+        *[scheduler.embed_sentence(sentence) for sentence in sentences]
+    )
+
+    assert len(encoder.batches) == 1
+    assert [embedding[0] for embedding in embeddings] == list(range(1, 11))
+
+    stats = scheduler.get_stats()
+    assert stats["batch_count"] == 1
+    assert stats["max_batch_size"] == 10
+    assert stats["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_max_batch_size_splits_batches():
+    encoder = FakeEncoder()
+    scheduler = EmbeddingScheduler(
+        encode_batch=encoder,
+        batch_window_ms=20,
+        max_batch_size=4
+    )
+
+    await asyncio.gather(
+        *[scheduler.embed_sentence(str(n)) for n in range(10)]
+    )
+
+    assert [len(batch) for batch in encoder.batches] == [4, 4, 2]
+
+
+@pytest.mark.asyncio
+async def test_encode_failure_reaches_every_caller():
+    def failing_encoder(sentences):
+        raise RuntimeError("encode failed")
+
+    scheduler = EmbeddingScheduler(encode_batch=failing_encoder)
+    results = await asyncio.gather(
+        scheduler.embed_sentence("a"),
+        scheduler.embed_sentence("b"),
+        return_exceptions=True
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_a_new_event_loop_starts_over():
+    encoder = FakeEncoder()
+    scheduler = EmbeddingScheduler(
+        encode_batch=encoder,
+        batch_window_ms=50,
+        max_batch_size=32
+    )
+
+    async def abandon():
+        # Leaves a request and its flush timer behind on a closed loop.
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(scheduler.embed_sentence("a"), 0.001)
+
+    async def embed():
+        return await asyncio.wait_for(scheduler.embed_sentence("bb"), 1.0)
+
+    asyncio.run(abandon())
+    embedding = asyncio.run(embed())
+
+    assert embedding[0] == 2
+    assert encoder.batches == [["bb"]]
@@ -0,0 +1,122 @@
+import asyncio
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pytest
+
+from offle_assistant.vectorizer import (
+    HashingVectorizer,
+    SidecarVectorizer,
+    VectorizerRegistry,
+    embedding_settings,
+    vectorizer_lookup_table,
+)
+
+
+@pytest.fixture(scope="module")
+def sidecar_socket(tmp_path_factory):
+    socket_path = tmp_path_factory.mktemp("sidecar") / "embed.sock"
+    process = subprocess.Popen([
+        sys.executable, "-c",
+        "from offle_assistant.vectorizer import run_embedding_sidecar; "
+        f"run_embedding_sidecar({str(socket_path)!r})"
+    ])
+
+    deadline = time.monotonic() + 60
+    while not socket_path.exists():
+        assert process.poll() is None, "sidecar exited"
+        assert time.monotonic() < deadline, "sidecar did not start"
+        time.sleep(0.1)
+
+    yield str(socket_path)
+
+    process.terminate()
+    process.wait(timeout=10)
+
+
+def make_vectorizer(socket_path, model_string="hash-32"):
+    return SidecarVectorizer(
+        vectorizer_class=HashingVectorizer,
+        vectorizer_string="hashing",
+        model_string=model_string,
+        socket_path=socket_path,
+    )
+
+
+def test_embeddings_match_in_process(sidecar_socket):
+    vectorizer = make_vectorizer(sidecar_socket)
+    local = HashingVectorizer(model_string="hash-32")
+    chunks = [f"paragraph number {i} about embeddings" for i in range(100)]
+
+    assert np.allclose(
+        vectorizer.embed_chunks(chunks), local.embed_chunks(chunks)
+    )
+    assert np.allclose(
+        vectorizer.embed_sentence("a query"), local.embed_sentence("a query")
+    )
+    assert vectorizer.remote_count == 2
+    assert vectorizer.fallback_count == 0
+    assert vectorizer._local_vectorizer is None
+
+
+def test_buffer_grows_for_large_results(sidecar_socket):
+    vectorizer = make_vectorizer(sidecar_socket, model_string="hash-4096")
+    chunks = [f"chunk {i}" for i in range(200)]
+
+    small = vectorizer.embed_chunks(chunks[:2])
+    large = vectorizer.embed_chunks(chunks)
+
+    assert small.shape == (2, 4096)
+    assert large.shape == (200, 4096)
+    assert np.allclose(large[:2], small)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_queries(sidecar_socket):
+    vectorizer = make_vectorizer(sidecar_socket)
+    local = HashingVectorizer(model_string="hash-32")
+    queries = [f"question {i}" for i in range(20)]
+
+    embeddings = await asyncio.gather(
+        *(vectorizer.aembed_sentence(query) for query in queries)
+    )
+
+    assert np.allclose(np.stack(embeddings), local.embed_chunks(queries))
+
+
+def test_sidecar_errors_are_raised(sidecar_socket):
+    vectorizer = make_vectorizer(sidecar_socket, model_string="not-a-hash")
+
+    with pytest.raises(RuntimeError):
+        vectorizer.embed_sentence("hello")
+
+
+def test_falls_back_in_process_when_unavailable(tmp_path):
+    vectorizer = make_vectorizer(str(tmp_path / "missing.sock"))
+
+    embedding = vectorizer.embed_sentence("hello")
+
+    assert np.allclose(
+        embedding, HashingVectorizer(model_string="hash-32").embed_sentence(
+            "hello"
+        )
+    )
+    assert vectorizer.fallback_count == 1
+    # Attributes of the real vectorizer are reachable through the proxy.
+    assert vectorizer.dim == 32
+
+
+def test_registry_hands_out_sidecar_vectorizers(tmp_path):
+    previous_socket = embedding_settings.sidecar_socket
+    embedding_settings.sidecar_socket = str(tmp_path / "embed.sock")
+    try:
+        registry = VectorizerRegistry(lookup_table=vectorizer_lookup_table)
+        vectorizer = registry.get_vectorizer(vectorizer_string="hashing")
+    finally:
+        embedding_settings.sidecar_socket = previous_socket
+
+    assert isinstance(vectorizer, SidecarVectorizer)
+    assert vectorizer.get_vectorizer_string() == "hashing"
+    assert vectorizer.get_model_string() == "hash-768"
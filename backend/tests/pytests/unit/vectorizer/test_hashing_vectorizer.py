@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from offle_assistant.vectorizer import (
+    HashingVectorizer,
+    vectorizer_lookup_table,
+)
+
+
+def test_embeddings_are_deterministic_and_normalized():
+    vectorizer = HashingVectorizer(model_string="hash-64")
+
+    first = vectorizer.embed_chunks(["reset my password", "error E1042"])
+    second = HashingVectorizer(model_string="hash-64").embed_chunks(
+        ["reset my password", "error E1042"]
+    )
+
+    assert first.shape == (2, 64)
+    assert first.dtype == np.float32
+    assert np.array_equal(first, second)
+    assert np.allclose(np.linalg.norm(first, axis=1), 1.0)
+
+
+def test_sentence_matches_chunk_embedding():
+    vectorizer = HashingVectorizer()
+    sentence = "How do I reset my password?"
+
+    assert np.array_equal(
+        vectorizer.embed_sentence(sentence),
+        vectorizer.embed_chunks([sentence])[0]
+    )
+    assert vectorizer.embed_sentence(sentence).shape == (768,)
+
+
+def test_lexical_overlap_scores_higher():
+    vectorizer = HashingVectorizer()
+    query, related, unrelated = vectorizer.embed_chunks([
+        "reset the admin password",
+        "to reset a password open the admin panel",
+        "qdrant stores vectors in collections",
+    ])
+
+    assert np.dot(query, related) > np.dot(query, unrelated)
+
+
+def test_empty_text_embeds_to_zero_vector():
+    embedding = HashingVectorizer(model_string="hash-16").embed_sentence("")
+    assert not embedding.any()
+
+
+def test_registered_in_lookup_table():
+    assert vectorizer_lookup_table["hashing"] is HashingVectorizer
+    assert HashingVectorizer().get_vectorizer_string() == "hashing"
+
+
+def test_rejects_bad_model_string():
+    with pytest.raises(ValueError):
+        HashingVectorizer(model_string="all-mpnet-base-v2")
@@ -0,0 +1,85 @@
+import pytest
+
+from offle_assistant.vectorizer import (
+    HashingVectorizer,
+    OllamaVectorizer,
+    SentenceTransformerVectorizer,
+    VectorizerRegistry,
+    get_default_model_string,
+    join_inference_mode,
+    split_inference_mode,
+)
+
+
+def test_fp32_leaves_model_string_alone():
+    assert join_inference_mode("all-mpnet-base-v2") == "all-mpnet-base-v2"
+    assert split_inference_mode("all-mpnet-base-v2") == (
+        "all-mpnet-base-v2", "fp32"
+    )
+
+
+@pytest.mark.parametrize("inference_mode", ["int8", "onnx"])
+def test_round_trip(inference_mode):
+    model_string = join_inference_mode("all-mpnet-base-v2", inference_mode)
+
+    assert model_string == f"all-mpnet-base-v2@{inference_mode}"
+    assert split_inference_mode(model_string) == (
+        "all-mpnet-base-v2", inference_mode
+    )
+
+
+def test_unknown_modes_are_rejected():
+    with pytest.raises(ValueError):
+        join_inference_mode("all-mpnet-base-v2", "fp16")
+    with pytest.raises(ValueError):
+        split_inference_mode("all-mpnet-base-v2@fp16")
+
+
+def test_default_model_string():
+    assert get_default_model_string(SentenceTransformerVectorizer) == (
+        "all-mpnet-base-v2"
+    )
+    assert get_default_model_string(HashingVectorizer) == "hash-768"
+
+
+@pytest.mark.parametrize("vectorizer_class", [
+    HashingVectorizer,
+    OllamaVectorizer,
+])
+@pytest.mark.parametrize("inference_mode", ["int8", "onnx"])
+def test_modes_are_rejected_for_vectorizers_without_them(
+    vectorizer_class,
+    inference_mode,
+):
+    with pytest.raises(ValueError, match="doesn't support"):
+        join_inference_mode(
+            get_default_model_string(vectorizer_class),
+            inference_mode,
+            vectorizer_class=vectorizer_class
+        )
+
+
+def test_supported_modes_are_joined():
+    assert join_inference_mode(
+        "all-mpnet-base-v2",
+        "int8",
+        vectorizer_class=SentenceTransformerVectorizer
+    ) == "all-mpnet-base-v2@int8"
+    assert join_inference_mode(
+        "hash-768",
+        "fp32",
+        vectorizer_class=HashingVectorizer
+    ) == "hash-768"
+
+
+def test_registry_rejects_unsupported_modes_before_loading():
+    registry = VectorizerRegistry(
+        lookup_table={"hashing": HashingVectorizer}
+    )
+
+    with pytest.raises(ValueError, match="doesn't support"):
+        registry.get_vectorizer(
+            vectorizer_string="hashing",
+            model_string="hash-768@int8"
+        )
+    assert registry.load_count == 0
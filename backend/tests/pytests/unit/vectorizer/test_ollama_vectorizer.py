@@ -0,0 +1,158 @@
+import asyncio
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+
+import numpy as np
+import ollama
+import pytest
+
+from offle_assistant.config import LLMServerConfig
+from offle_assistant.vectorizer import (
+    OllamaVectorizer,
+    configure_ollama_server,
+    embedding_settings,
+    ollama_server_settings,
+    vectorizer_lookup_table,
+)
+
+
+class StubOllamaServer(ThreadingHTTPServer):
+    """
+        Answers /api/embed with [len(input), index in request, 1.0], and
+        fails the first `failures` requests with `failure_status`.
+    """
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubOllamaHandler)
+        self.requests = []
+        self.failures = 0
+        self.failure_status = 503
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append(body)
+
+        if self.server.failures > 0:
+            self.server.failures -= 1
+            self._respond(self.server.failure_status, {"error": "busy"})
+            return
+
+        self._respond(200, {
+            "model": body["model"],
+            "embeddings": [
+                [float(len(text)), float(i), 1.0]
+                for i, text in enumerate(body["input"])
+            ],
+        })
+
+    def _respond(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = StubOllamaServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    previous_server = LLMServerConfig(**ollama_server_settings.model_dump())
+    previous_embedding = embedding_settings.model_dump()
+    configure_ollama_server(
+        LLMServerConfig(hostname="127.0.0.1", port=server.server_address[1])
+    )
+    embedding_settings.chunk_cache_enabled = False
+    embedding_settings.ollama_retry_backoff_seconds = 0.0
+    embedding_settings.ollama_batch_size = 2
+
+    yield server
+
+    configure_ollama_server(previous_server)
+    for field_name, value in previous_embedding.items():
+        setattr(embedding_settings, field_name, value)
+    server.shutdown()
+    server.server_close()
+
+
+def test_registered_in_lookup_table():
+    assert vectorizer_lookup_table["ollama"] is OllamaVectorizer
+
+
+def test_chunks_are_batched_per_request(stub_server):
+    vectorizer = OllamaVectorizer(model_string="stub-embed")
+
+    embeddings = vectorizer.embed_chunks(["a", "bb", "ccc", "dddd", "eeeee"])
+
+    assert [len(request["input"]) for request in stub_server.requests] == [
+        2, 2, 1
+    ]
+    assert all(
+        request["model"] == "stub-embed" for request in stub_server.requests
+    )
+    assert embeddings.dtype == np.float32
+    assert embeddings[:, 0].tolist() == [1, 2, 3, 4, 5]
+
+
+def test_sentence_embedding(stub_server):
+    vectorizer = OllamaVectorizer()
+
+    embedding = vectorizer.embed_sentence("hello")
+
+    assert embedding.tolist() == [5.0, 0.0, 1.0]
+    assert stub_server.requests[0]["model"] == "nomic-embed-text"
+
+
+def test_transient_failures_are_retried(stub_server):
+    stub_server.failures = 2
+    vectorizer = OllamaVectorizer()
+
+    embedding = vectorizer.embed_sentence("hello")
+
+    assert embedding[0] == 5.0
+    assert vectorizer.retry_count == 2
+    assert len(stub_server.requests) == 3
+
+
+def test_retries_are_bounded(stub_server):
+    stub_server.failures = 10
+    embedding_settings.ollama_max_retries = 1
+    vectorizer = OllamaVectorizer()
+
+    with pytest.raises(ollama.ResponseError):
+        vectorizer.embed_sentence("hello")
+    assert len(stub_server.requests) == 2
+
+
+def test_client_errors_are_not_retried(stub_server):
+    stub_server.failures = 1
+    stub_server.failure_status = 404
+    vectorizer = OllamaVectorizer()
+
+    with pytest.raises(ollama.ResponseError):
+        vectorizer.embed_sentence("hello")
+    assert vectorizer.retry_count == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_share_a_request(stub_server):
+    embedding_settings.batch_window_ms = 50.0
+    vectorizer = OllamaVectorizer()
+
+    embeddings = await asyncio.gather(
+        *(vectorizer.aembed_sentence("x" * n) for n in range(1, 5))
+    )
+
+    assert [embedding[0] for embedding in embeddings] == [1, 2, 3, 4]
+    assert len(stub_server.requests) == 1
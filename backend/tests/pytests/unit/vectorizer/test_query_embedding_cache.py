@@ -0,0 +1,93 @@
+import numpy as np
+
+from offle_assistant.vectorizer import Vectorizer, QueryEmbeddingCache
+
+
+class StubVectorizer(Vectorizer):
+    def __init__(self, model_string: str = "stub-model", dim: int = 8):
+        self.model_string = model_string
+        self.dim = dim
+        self.calls = 0
+
+    def embed_sentence(self, sentence):
+        self.calls += 1
+        return np.full(self.dim, len(sentence), dtype=np.float32)
+
+    def embed_chunks(self, chunks):
+        return np.stack([self.embed_sentence(chunk) for chunk in chunks])
+
+    def get_vectorizer_string(self):
+        return "stub"
+
+    def get_model_string(self):
+        return self.model_string
+
+
+def test_repeat_query_is_served_from_cache():
+    cache = QueryEmbeddingCache()
+    vectorizer = StubVectorizer()
+
+    first = cache.get_or_embed(vectorizer, "How do I reset my password")
+    second = cache.get_or_embed(vectorizer, "  How do I  reset my password ")
+
+    assert vectorizer.calls == 1
+    assert np.array_equal(first, second)
+    assert cache.get_hit_ratio() == 0.5
+
+
+def test_case_is_part_of_the_key():
+    cache = QueryEmbeddingCache()
+    vectorizer = StubVectorizer()
+
+    cache.get_or_embed(vectorizer, "Apple stock")
+    cache.get_or_embed(vectorizer, "apple stock")
+
+    assert vectorizer.calls == 2
+
+
+def test_entries_are_keyed_by_model():
+    cache = QueryEmbeddingCache()
+    vectorizer_a = StubVectorizer(model_string="model-a")
+    vectorizer_b = StubVectorizer(model_string="model-b")
+
+    cache.get_or_embed(vectorizer_a, "query")
+    cache.get_or_embed(vectorizer_b, "query")
+
+    assert vectorizer_a.calls == 1
+    assert vectorizer_b.calls == 1
+
+
+def test_byte_limit_evicts_least_recently_used():
+    vectorizer = StubVectorizer(dim=64)  # 256 bytes per embedding
+    cache = QueryEmbeddingCache(max_bytes=600)
+
+    cache.get_or_embed(vectorizer, "first")
+    cache.get_or_embed(vectorizer, "second")
+    cache.get_or_embed(vectorizer, "first")
+    cache.get_or_embed(vectorizer, "third")  # evicts "second"
+
+    assert cache.current_bytes <= 600
+    assert cache.get(vectorizer, "first") is not None
+    assert cache.get(vectorizer, "second") is None
+    assert cache.eviction_count == 1
+
+
+def test_expired_entries_are_misses():
+    cache = QueryEmbeddingCache(ttl_seconds=0)
+    vectorizer = StubVectorizer()
+
+    cache.get_or_embed(vectorizer, "query")
+    cache.get_or_embed(vectorizer, "query")
+
+    assert vectorizer.calls == 2
+
+
+def test_cached_embeddings_are_read_only():
+    cache = QueryEmbeddingCache()
+    vectorizer = StubVectorizer()
+
+    embedding = cache.get_or_embed(vectorizer, "query")
+    cached = cache.get(vectorizer, "query")
+
+    assert not cached.flags.writeable
+    assert np.array_equal(embedding, cached)
@@ -0,0 +1,120 @@
+import threading
+import time
+
+import numpy as np
+
+from offle_assistant.vectorizer import Vectorizer, VectorizerRegistry
+
+
+class CountingVectorizer(Vectorizer):
+    instances = 0
+
+    def __init__(self, model_string: str = "default-model"):
+        CountingVectorizer.instances += 1
+        self.model_string = model_string
+
+    def embed_sentence(self, sentence):
+        return np.zeros(4)
+
+    def embed_chunks(self, chunks):
+        return np.zeros((len(chunks), 4))
+
+    def get_vectorizer_string(self):
+        return "counting"
+
+    def get_model_string(self):
+        return self.model_string
+
+
+def make_registry(max_models: int = 2) -> VectorizerRegistry:
+    CountingVectorizer.instances = 0
+    return VectorizerRegistry(
+        lookup_table={"counting": CountingVectorizer},
+        max_models=max_models
+    )
+
+
+def test_model_is_loaded_once():
+    registry = make_registry()
+    first = registry.get_vectorizer("counting", "model-a")
+    second = registry.get_vectorizer("counting", "model-a")
+
+    assert first is second
+    assert CountingVectorizer.instances == 1
+    assert registry.load_count == 1
+    assert registry.hit_count == 1
+
+
+def test_default_model_shares_entry():
+    registry = make_registry()
+    default = registry.get_vectorizer("counting")
+    explicit = registry.get_vectorizer("counting", "default-model")
+
+    assert default is explicit
+    assert registry.load_count == 1
+
+
+def test_lru_eviction():
+    registry = make_registry(max_models=2)
+    model_a = registry.get_vectorizer("counting", "model-a")
+    registry.get_vectorizer("counting", "model-b")
+    registry.get_vectorizer("counting", "model-a")  # a is now most recent
+    registry.get_vectorizer("counting", "model-c")  # evicts b
+
+    stats = registry.get_stats()
+    assert stats["resident_models"] == ["counting:model-a", "counting:model-c"]
+    assert stats["eviction_count"] == 1
+    assert registry.get_vectorizer("counting", "model-a") is model_a
+
+
+def test_concurrent_requests_load_once():
+    registry = make_registry()
+    results = []
+
+    def worker():
+        results.append(registry.get_vectorizer("counting", "model-a"))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert CountingVectorizer.instances == 1
+    assert all(result is results[0] for result in results)
+
+
+class SlowVectorizer(CountingVectorizer):
+    def __init__(self, model_string: str = "default-model"):
+        time.sleep(0.2)
+        super().__init__(model_string=model_string)
+
+
+class YieldingEvent(threading.Event):
+    def set(self):
+        super().set()
+        # Lets the woken callers look for the model before the loading
+        # thread carries on.
+        time.sleep(0.05)
+
+
+def test_callers_waiting_on_a_slow_load_share_it(monkeypatch):
+    monkeypatch.setattr(threading, "Event", YieldingEvent)
+    CountingVectorizer.instances = 0
+    registry = VectorizerRegistry(lookup_table={"counting": SlowVectorizer})
+    start = threading.Barrier(6)
+    results = []
+
+    def worker():
+        start.wait()
+        results.append(registry.get_vectorizer("counting", "model-a"))
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert CountingVectorizer.instances == 1
+    assert registry.load_count == 1
+    assert all(result is results[0] for result in results)